@@ -5,21 +5,29 @@ Implements a real-time voice AI agent using:
 - Soniox STT for streaming speech-to-text
 - Groq LLM (llama-3.3-70b-versatile) for conversation and tool calling
 - ElevenLabs TTS for high-quality text-to-speech
+
+Microphone audio reaches STT through a silence gate (silence_gate.py), so
+only speech plus padding is streamed to (and billed by) Soniox.
 """
 
 import asyncio
 import os
-from typing import Optional, Callable, Dict, Any
+import time
+from typing import Optional, Callable, Dict, Any, AsyncIterable
 import structlog
 
 from livekit import agents, rtc
-from livekit.agents import AgentSession, Agent, RoomInputOptions
+from livekit.agents import AgentSession, Agent, MetricsCollectedEvent, ModelSettings, RoomInputOptions, stt
+from livekit.agents.metrics import LLMMetrics, STTMetrics, TTSMetrics
 from livekit.agents.voice import AgentOutput
-from livekit.plugins import soniox, groq, elevenlabs, silero
 
 from .cost_tracker import CostTracker
 from .latency_tracker import LatencyTracker
+from .provider_pool import provider_pool
+from .providers import ProviderSet
+from .silence_gate import SilenceGate, create_silence_gate
 from .tools import AudioPlaybackTool, get_tool_definitions
+from .vad import VoiceActivityDetector
 
 logger = structlog.get_logger()
 
@@ -40,44 +48,59 @@ class VoiceAgent:
         cost_tracker: CostTracker,
         latency_tracker: LatencyTracker,
         on_audio_playback: Optional[Callable] = None,
+        providers: Optional[ProviderSet] = None,
     ):
         self.session_id = session_id
         self.cost_tracker = cost_tracker
         self.latency_tracker = latency_tracker
         self.audio_tool = AudioPlaybackTool(on_audio_playback)
         
-        # Track token counts for cost estimation
-        self._current_input_tokens = 0
-        self._current_output_tokens = 0
-        self._current_audio_duration = 0.0
-        self._current_tts_chars = 0
+        # Set by the agent's STT node once audio arrives
+        self.silence_gate: Optional[SilenceGate] = None
         
         # Initialize providers
-        self._init_providers()
+        self._init_providers(providers)
 
-    def _init_providers(self) -> None:
-        """Initialize STT, LLM, and TTS providers."""
-        # Soniox STT
-        self.stt = soniox.STT(
-            api_key=os.getenv("SONIOX_API_KEY"),
-        )
-        
-        # Groq LLM with llama-3.3-70b-versatile
-        self.llm = groq.LLM(
-            model="llama-3.3-70b-versatile",
-            api_key=os.getenv("GROQ_API_KEY"),
-            temperature=0.7,
-        )
+    def _init_providers(self, providers: Optional[ProviderSet]) -> None:
+        """
+        Initialize STT, LLM, TTS and VAD from the provider set.
         
-        # ElevenLabs TTS
-        self.tts = elevenlabs.TTS(
-            api_key=os.getenv("ELEVEN_API_KEY"),
-            voice_id=os.getenv("ELEVEN_VOICE_ID", "21m00Tcm4TlvDq8ikWAM"),  # Rachel
-            model="eleven_turbo_v2_5",  # Fastest model for low latency
-        )
+        Unless a provider set is passed in, it is borrowed from the
+        process-wide pool, so the VAD model and provider HTTP clients are
+        loaded once per process rather than once per session.
+        """
+        self._provider_lease = None
+        if providers is None:
+            self._provider_lease = provider_pool.acquire("livekit")
+            providers = self._provider_lease.providers
+        self.providers = providers
+        self.stt, self.llm, self.tts, self.vad = self.providers.livekit_plugins()
+
+    async def warm_connections(self) -> None:
+        """
+        Open keep-alive connections to the providers ahead of the first turn.
         
-        # Voice Activity Detection
-        self.vad = silero.VAD.load()
+        Uses the plugins' own prewarm hooks where available; failures are
+        logged and otherwise ignored, the first request then connects.
+        """
+        for plugin in (self.stt, self.llm, self.tts):
+            prewarm = getattr(plugin, "prewarm", None)
+            if prewarm is None:
+                continue
+            try:
+                result = prewarm()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.warning("provider_prewarm_failed",
+                               provider=type(plugin).__name__,
+                               error=str(e))
+
+    def close(self) -> None:
+        """Return borrowed providers to the pool."""
+        if self._provider_lease is not None:
+            self._provider_lease.release()
+            self._provider_lease = None
 
     def get_system_prompt(self) -> str:
         """Return the system prompt for the agent."""
@@ -96,6 +119,10 @@ Guidelines:
 
 You have access to a play_audio tool that can play audio files from URLs."""
 
+    def create_agent(self) -> Agent:
+        """Create the LiveKit Agent for this session (STT input is silence-gated)."""
+        return SilenceGatedAgent(self, instructions=self.get_system_prompt())
+
     async def create_agent_session(self, room: rtc.Room) -> AgentSession:
         """
         Create and configure an agent session for a room.
@@ -127,7 +154,6 @@ You have access to a play_audio tool that can play audio files from URLs."""
         def on_user_started_speaking():
             logger.debug("user_started_speaking", session_id=self.session_id)
             self.latency_tracker.start_stt()
-            self._current_audio_duration = 0.0
 
         @session.on("user_stopped_speaking")
         def on_user_stopped_speaking():
@@ -139,10 +165,25 @@ You have access to a play_audio tool that can play audio files from URLs."""
                        session_id=self.session_id, 
                        text=text[:100] if text else "")
             self.latency_tracker.end_stt()
-            # Estimate audio duration based on speech (rough: ~150 words/min)
-            word_count = len(text.split()) if text else 0
-            self._current_audio_duration = (word_count / 150) * 60  # seconds
-            self.cost_tracker.add_stt_cost(self._current_audio_duration)
+            self.latency_tracker.attach_stt()
+            # Streamed (billed) audio is reported by the STT metrics below
+            if self.silence_gate is not None:
+                raw, _ = self.silence_gate.take_turn_audio()
+                self.cost_tracker.ledger.record_raw_audio(raw)
+
+        @session.on("metrics_collected")
+        def on_metrics_collected(event: MetricsCollectedEvent):
+            # Usage as measured by the plugins: audio the STT stream was
+            # sent, provider-reported tokens, characters synthesized
+            metrics = event.metrics
+            if isinstance(metrics, STTMetrics):
+                # With a silence gate the raw audio is recorded per turn above
+                raw = 0.0 if self.silence_gate is not None else None
+                self.cost_tracker.add_stt_cost(metrics.audio_duration, raw_audio_seconds=raw)
+            elif isinstance(metrics, LLMMetrics):
+                self.cost_tracker.add_llm_cost(metrics.prompt_tokens, metrics.completion_tokens)
+            elif isinstance(metrics, TTSMetrics):
+                self.cost_tracker.add_tts_cost(metrics.characters_count)
 
         @session.on("agent_started_speaking")  
         def on_agent_started_speaking():
@@ -194,6 +235,77 @@ You have access to a play_audio tool that can play audio files from URLs."""
         return result
 
 
+class SilenceGatedAgent(Agent):
+    """
+    Agent whose STT node only receives speech.
+
+    Room audio is passed through a SilenceGate (driven by the NumPy VAD at
+    the frame sample rate) before the default STT node; timestamps in the
+    resulting speech events are mapped back from streamed-audio time to
+    stream time. Turn detection still sees all audio through the session's
+    own VAD.
+    """
+
+    def __init__(self, voice_agent: VoiceAgent, **kwargs):
+        super().__init__(**kwargs)
+        self._voice_agent = voice_agent
+
+    async def stt_node(
+        self,
+        audio: AsyncIterable[rtc.AudioFrame],
+        model_settings: ModelSettings,
+    ) -> AsyncIterable[stt.SpeechEvent]:
+        gate: Optional[SilenceGate] = None
+
+        async def gated_audio() -> AsyncIterable[rtc.AudioFrame]:
+            nonlocal gate
+            created = False
+            async for frame in audio:
+                if not created:
+                    # Sized for the first frame's format; None when disabled
+                    created = True
+                    if frame.num_channels == 1:
+                        gate = create_silence_gate(
+                            VoiceActivityDetector(sample_rate=frame.sample_rate),
+                            sample_rate=frame.sample_rate,
+                        )
+                        self._voice_agent.silence_gate = gate
+                if gate is None or frame.num_channels != 1:
+                    yield frame
+                    continue
+                _, pieces = gate.process(frame.data)
+                for piece in pieces:
+                    yield rtc.AudioFrame(
+                        data=piece,
+                        sample_rate=frame.sample_rate,
+                        num_channels=1,
+                        samples_per_channel=len(piece) // 2,
+                    )
+
+        async for event in Agent.default.stt_node(self, gated_audio(), model_settings):
+            if gate is not None and isinstance(event, stt.SpeechEvent):
+                for alternative in event.alternatives:
+                    alternative.start_time = gate.stream_time(alternative.start_time)
+                    alternative.end_time = gate.stream_time(alternative.end_time)
+            yield event
+
+
+def prewarm(proc: agents.JobProcess) -> None:
+    """
+    Prepare a worker process before any job is assigned to it.
+    
+    Loads the VAD model and provider clients into the process-wide pool,
+    so the first job on a fresh process (e.g. after an autoscale event)
+    only takes a lease on them. Provider connections are opened per job
+    (see VoiceAgent.warm_connections), on the job's own event loop.
+    """
+    start = time.perf_counter()
+    provider_pool.load("livekit")
+    
+    logger.info("worker_prewarmed",
+               prewarm_ms=round((time.perf_counter() - start) * 1000, 2))
+
+
 async def run_agent(ctx: agents.JobContext) -> None:
     """
     Entry point for the LiveKit agent worker.
@@ -208,20 +320,28 @@ async def run_agent(ctx: agents.JobContext) -> None:
     cost_tracker = CostTracker(session_id)
     latency_tracker = LatencyTracker(session_id)
     
-    # Create the voice agent
+    # Providers are borrowed from the pool loaded by prewarm()
     agent = VoiceAgent(
         session_id=session_id,
         cost_tracker=cost_tracker,
         latency_tracker=latency_tracker,
     )
     
+    # Open provider connections while the room connects
+    warm_task = asyncio.create_task(agent.warm_connections())
+    
+    async def release_providers() -> None:
+        agent.close()
+    
+    ctx.add_shutdown_callback(release_providers)
+    
     # Create agent session
     session = await agent.create_agent_session(ctx.room)
     
     # Start the agent
     await session.start(
         room=ctx.room,
-        agent=Agent(instructions=agent.get_system_prompt()),
+        agent=agent.create_agent(),
         room_input_options=RoomInputOptions(
             # Process audio from all participants
         ),
@@ -229,6 +349,7 @@ async def run_agent(ctx: agents.JobContext) -> None:
     
     # Keep running until the context is done
     await ctx.connect()
+    await warm_task
     
     logger.info("agent_job_completed",
                room_name=ctx.room.name,
@@ -236,8 +357,10 @@ async def run_agent(ctx: agents.JobContext) -> None:
                turn_count=latency_tracker.turn_count)
 
 
-def create_worker() -> agents.Worker:
+def create_worker() -> agents.WorkerOptions:
     """Create and configure the LiveKit agents worker."""
-    return agents.Worker(
-        request_handler=run_agent,
+    return agents.WorkerOptions(
+        entrypoint_fnc=run_agent,
+        prewarm_fnc=prewarm,
+        num_idle_processes=int(os.getenv("AGENT_IDLE_PROCESSES", "1")),
     )
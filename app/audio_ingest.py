@@ -0,0 +1,371 @@
+"""
+Audio Ingest Engine for Voice AI Agent
+
+Buffers inbound PCM audio (16-bit, 16kHz, mono) per session with:
+- A preallocated ring buffer (no per-frame buffer allocations in steady state)
+- Zero-copy fixed-size chunk views handed to the STT consumer
+- Backpressure on the producer when the consumer falls behind
+"""
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional, Protocol
+import structlog
+
+logger = structlog.get_logger()
+
+# Inbound audio format expected on /ws/talk
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # bytes (PCM 16-bit)
+CHANNELS = 1
+BYTES_PER_SECOND = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+
+
+def ms_to_bytes(milliseconds: int) -> int:
+    """Convert a duration in ms to a whole number of PCM samples in bytes."""
+    samples = SAMPLE_RATE * milliseconds // 1000
+    return samples * SAMPLE_WIDTH * CHANNELS
+
+
+class AudioChunkConsumer(Protocol):
+    """
+    Consumer of fixed-size audio chunks (e.g. a streaming STT backend).
+
+    The chunk passed to `consume` is a view into the ring buffer and is only
+    valid until `consume` returns; consumers that need to keep the audio
+    must copy it.
+    """
+
+    async def consume(self, chunk: memoryview) -> None:
+        ...
+
+    async def flush(self) -> None:
+        ...
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity byte ring buffer partitioned into equal-sized chunk slots.
+
+    The capacity is a whole number of chunks and reads always advance by a
+    whole chunk, so every readable chunk is contiguous and can be exposed as
+    one of the memoryviews created up front.
+
+    Usage:
+        ring = AudioRingBuffer(chunk_bytes=3200, chunk_count=20)
+        ring.write(frame)
+        ring.pad_to_chunk()  # only at end of utterance
+        while ring.has_chunk:
+            stt.send(ring.peek_chunk())
+            ring.advance()
+    """
+
+    def __init__(self, chunk_bytes: int, chunk_count: int):
+        if chunk_bytes <= 0 or chunk_count <= 0:
+            raise ValueError("chunk_bytes and chunk_count must be positive")
+        self.chunk_bytes = chunk_bytes
+        self.chunk_count = chunk_count
+        self.capacity = chunk_bytes * chunk_count
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        self._chunks = tuple(
+            self._view[i * chunk_bytes:(i + 1) * chunk_bytes]
+            for i in range(chunk_count)
+        )
+        self._silence = memoryview(bytes(chunk_bytes))
+        # Positions are absolute byte offsets; the slot is position % capacity
+        self._write_pos = 0
+        self._read_pos = 0
+
+    @property
+    def readable(self) -> int:
+        """Bytes written but not yet consumed."""
+        return self._write_pos - self._read_pos
+
+    @property
+    def free(self) -> int:
+        """Bytes that can be written without overwriting unread audio."""
+        return self.capacity - (self._write_pos - self._read_pos)
+
+    @property
+    def has_chunk(self) -> bool:
+        return self._write_pos - self._read_pos >= self.chunk_bytes
+
+    def write(self, frame) -> int:
+        """
+        Copy as much of `frame` as fits into the buffer.
+
+        Returns the number of bytes written, which is less than len(frame)
+        only when the buffer is full.
+        """
+        size = len(frame)
+        free = self.free
+        if size > free:
+            size = free
+        if size == 0:
+            return 0
+
+        start = self._write_pos % self.capacity
+        end = start + size
+        if size == len(frame) and end <= self.capacity:
+            # Fast path: whole frame, no wrap-around
+            self._buffer[start:end] = frame
+        else:
+            src = memoryview(frame)
+            first = min(size, self.capacity - start)
+            self._view[start:start + first] = src[:first]
+            if size > first:
+                self._view[0:size - first] = src[first:size]
+        self._write_pos += size
+        return size
+
+    def peek_chunk(self) -> memoryview:
+        """Zero-copy view of the oldest full chunk. Check `has_chunk` first."""
+        return self._chunks[(self._read_pos % self.capacity) // self.chunk_bytes]
+
+    def advance(self) -> None:
+        """Mark the oldest chunk as consumed."""
+        if not self.has_chunk:
+            raise ValueError("cannot advance past written data")
+        self._read_pos += self.chunk_bytes
+
+    def pad_to_chunk(self) -> int:
+        """
+        Fill the partially written chunk with silence so it can be read.
+
+        Keeps reads chunk-aligned when a trailing partial chunk has to be
+        handed to the consumer (end of utterance, close). Returns the
+        number of padding bytes written.
+        """
+        pad = -self._write_pos % self.chunk_bytes
+        if pad:
+            start = self._write_pos % self.capacity
+            self._view[start:start + pad] = self._silence[:pad]
+            self._write_pos += pad
+        return pad
+
+    @property
+    def write_position(self) -> int:
+        """Absolute number of bytes ever written (including padding)."""
+        return self._write_pos
+
+    @property
+    def read_position(self) -> int:
+        """Absolute number of bytes ever consumed."""
+        return self._read_pos
+
+    def reset(self) -> None:
+        """Discard all buffered audio."""
+        self._read_pos = self._write_pos = 0
+
+
+class AudioIngest:
+    """
+    Per-session audio ingest engine.
+
+    The WebSocket receive loop pushes raw PCM frames; a single consumer task
+    drains fixed-size chunks into an `AudioChunkConsumer`. When the buffer is
+    full, `push` waits for the consumer (propagating backpressure to the
+    client's socket) and drops the frame only if the consumer stays stalled
+    past `backpressure_timeout`.
+
+    Usage:
+        ingest = AudioIngest(session_id)
+        ingest.start(stt_consumer)
+        await ingest.push(frame)
+        ingest.commit()  # end of utterance: flush the consumer
+        ...
+        await ingest.close()
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        chunk_ms: int = 100,
+        buffer_ms: int = 2000,
+        backpressure_timeout: float = 0.5,
+    ):
+        chunk_bytes = ms_to_bytes(chunk_ms)
+        chunk_count = max(1, -(-buffer_ms // chunk_ms))
+        self.session_id = session_id
+        self.backpressure_timeout = backpressure_timeout
+        self.ring = AudioRingBuffer(chunk_bytes, chunk_count)
+
+        self._data_available = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+        self.consumer: Optional[AudioChunkConsumer] = None
+        self._commit_positions: Deque[int] = deque()
+        self._committed_at = 0
+        # Silence padding per padded chunk, by the chunk's end position
+        self._padding: Dict[int, int] = {}
+
+        # Counters for metrics
+        self.bytes_received = 0
+        self.bytes_dropped = 0
+        self.backpressure_waits = 0
+        self.bytes_padded = 0
+        # Audio handed to the consumer, excluding silence padding
+        self.bytes_consumed = 0
+
+    @property
+    def seconds_received(self) -> float:
+        return self.bytes_received / BYTES_PER_SECOND
+
+    @property
+    def buffered_ms(self) -> float:
+        return self.ring.readable * 1000 / BYTES_PER_SECOND
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def uncommitted(self) -> bool:
+        """Whether audio has been pushed since the last commit."""
+        return self.ring.write_position != self._committed_at
+
+    async def push(self, frame) -> int:
+        """
+        Append a PCM frame to the ring buffer.
+
+        Returns the number of bytes accepted.
+        """
+        if self._closed:
+            return 0
+
+        size = len(frame)
+        self.bytes_received += size
+        written = self.ring.write(frame)
+
+        if written < size:
+            self.backpressure_waits += 1
+            remaining = memoryview(frame)[written:]
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.backpressure_timeout
+            while remaining and not self._closed:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                self._space_available.clear()
+                self._data_available.set()
+                try:
+                    await asyncio.wait_for(self._space_available.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                n = self.ring.write(remaining)
+                written += n
+                remaining = remaining[n:]
+
+            if written < size:
+                self.bytes_dropped += size - written
+                logger.warning("audio_ingest_frame_dropped",
+                               session_id=self.session_id,
+                               dropped_bytes=size - written,
+                               buffered_ms=round(self.buffered_ms, 1))
+
+        if self.ring.has_chunk:
+            self._data_available.set()
+        return written
+
+    def commit(self) -> None:
+        """
+        Mark the end of an utterance.
+
+        The trailing partial chunk is padded with silence, and the consumer
+        is flushed once it has consumed everything written so far.
+        """
+        if self._closed or self.ring.write_position in self._commit_positions:
+            return
+        self._pad()
+        self._committed_at = self.ring.write_position
+        self._commit_positions.append(self._committed_at)
+        self._data_available.set()
+
+    def _pad(self) -> None:
+        pad = self.ring.pad_to_chunk()
+        if pad:
+            self.bytes_padded += pad
+            self._padding[self.ring.write_position] = pad
+
+    async def run(self, consumer: AudioChunkConsumer) -> None:
+        """
+        Drain chunks into `consumer` until the ingest is closed.
+
+        Each chunk view is valid only until `consume` returns.
+        """
+        ring = self.ring
+        commits = self._commit_positions
+        flushed_at = 0
+        try:
+            while True:
+                while ring.has_chunk or (commits and ring.read_position >= commits[0]):
+                    if commits and ring.read_position >= commits[0]:
+                        commits.popleft()
+                        flushed_at = ring.read_position
+                        await consumer.flush()
+                        continue
+                    chunk_end = ring.read_position + ring.chunk_bytes
+                    self.bytes_consumed += ring.chunk_bytes - self._padding.pop(chunk_end, 0)
+                    await consumer.consume(ring.peek_chunk())
+                    ring.advance()
+                    self._space_available.set()
+
+                if self._closed:
+                    if ring.readable:
+                        self._pad()
+                        continue
+                    break
+
+                self._data_available.clear()
+                await self._data_available.wait()
+
+            if ring.read_position != flushed_at:
+                await consumer.flush()
+        finally:
+            logger.info("audio_ingest_stopped",
+                        session_id=self.session_id,
+                        seconds_received=round(self.seconds_received, 3),
+                        bytes_dropped=self.bytes_dropped,
+                        backpressure_waits=self.backpressure_waits)
+
+    def start(self, consumer: AudioChunkConsumer) -> asyncio.Task:
+        """Start the background task draining chunks into `consumer`."""
+        if self._task is not None:
+            raise RuntimeError("audio ingest already started")
+        self.consumer = consumer
+        self._task = asyncio.create_task(self.run(consumer))
+        return self._task
+
+    async def close(self) -> None:
+        """Stop accepting audio and wait for the consumer to drain the buffer."""
+        self._closed = True
+        self._data_available.set()
+        self._space_available.set()
+        if self._task is not None:
+            await self._task
+
+    def get_stats(self) -> dict:
+        """Get ingest counters for metrics."""
+        return {
+            "seconds_received": round(self.seconds_received, 3),
+            "buffered_ms": round(self.buffered_ms, 1),
+            "seconds_consumed": round(self.bytes_consumed / BYTES_PER_SECOND, 3),
+            "bytes_dropped": self.bytes_dropped,
+            "bytes_padded": self.bytes_padded,
+            "backpressure_waits": self.backpressure_waits,
+        }
+
+
+class DiscardingConsumer:
+    """Consumer that counts and discards audio; used when no STT backend is wired."""
+
+    def __init__(self):
+        self.bytes_consumed = 0
+
+    async def consume(self, chunk: memoryview) -> None:
+        self.bytes_consumed += len(chunk)
+
+    async def flush(self) -> None:
+        pass
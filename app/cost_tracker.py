@@ -3,34 +3,87 @@ Cost Tracker for Voice AI Agent
 
 Tracks and estimates costs for STT, LLM, and TTS usage per turn and conversation.
 
-Pricing (as of 2025):
-- Soniox STT: ~$0.002/minute (token-based: $2/1M audio tokens + $4/1M output tokens)
-- Groq LLM (llama-3.3-70b-versatile): $0.59/1M input tokens, $0.79/1M output tokens
-- ElevenLabs TTS: ~$0.24/1K characters (Pro tier)
+Costs are accounted in integer nano-dollars so per-turn and aggregate totals
+are exact regardless of summation order; USD floats are derived for display.
+Prices come from the pricing table (see pricing.py), resolved once when the
+tracker is created, and are applied to the measured quantities recorded in
+the session's usage ledger (see usage.py).
 """
 
+from collections import deque
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Deque, Dict, Optional, Set
+import os
 import time
 
+from .prometheus import voice_metrics
+from .pricing import SessionPricing, get_pricing_table, nanos_to_dollars
+from .stats import RollingStats
+from .usage import Usage, UsageLedger
 
-@dataclass
+# Completed turns kept verbatim per session (0 = unbounded)
+MAX_TURN_HISTORY = int(os.getenv("MAX_TURN_HISTORY", "100"))
+
+# (tracker, turn) a turn task records into; set by CostTracker.bind_task()
+_task_turn: ContextVar[Optional[tuple]] = ContextVar("cost_task_turn", default=None)
+
+
+def new_turn_cost_stats() -> RollingStats:
+    """Per-turn cost distribution in nano-dollars (one layout, so they merge)."""
+    return RollingStats(min_value=1, max_value=1e12)
+
+
+def turn_cost_summary(stats: RollingStats) -> Dict:
+    """Per-turn cost distribution in USD."""
+    def usd(q: Optional[float]) -> Optional[float]:
+        return round(nanos_to_dollars(q), 6) if q is not None else None
+
+    return {
+        "min": usd(stats.min),
+        "max": usd(stats.max),
+        "p50": usd(stats.quantile(0.5)),
+        "p90": usd(stats.quantile(0.9)),
+        "p99": usd(stats.quantile(0.99)),
+    }
+
+
+@dataclass(slots=True)
 class TurnCost:
     """Cost breakdown for a single turn."""
     turn_id: int
-    stt_cost: float = 0.0
-    llm_input_cost: float = 0.0
-    llm_output_cost: float = 0.0
-    tts_cost: float = 0.0
+    stt_nanos: int = 0
+    llm_input_nanos: int = 0
+    llm_output_nanos: int = 0
+    tts_nanos: int = 0
+    # Measured quantities the costs were computed from
+    usage: Usage = field(default_factory=Usage)
     timestamp: float = field(default_factory=time.time)
+    interrupted: bool = False
+
+    @property
+    def llm_nanos(self) -> int:
+        return self.llm_input_nanos + self.llm_output_nanos
+
+    @property
+    def total_nanos(self) -> int:
+        return self.stt_nanos + self.llm_nanos + self.tts_nanos
+
+    @property
+    def stt_cost(self) -> float:
+        return nanos_to_dollars(self.stt_nanos)
 
     @property
     def llm_cost(self) -> float:
-        return self.llm_input_cost + self.llm_output_cost
+        return nanos_to_dollars(self.llm_nanos)
+
+    @property
+    def tts_cost(self) -> float:
+        return nanos_to_dollars(self.tts_nanos)
 
     @property
     def total(self) -> float:
-        return self.stt_cost + self.llm_cost + self.tts_cost
+        return nanos_to_dollars(self.total_nanos)
 
     def to_dict(self) -> Dict:
         return {
@@ -39,6 +92,9 @@ class TurnCost:
             "llm_cost": round(self.llm_cost, 6),
             "tts_cost": round(self.tts_cost, 6),
             "total": round(self.total, 6),
+            "total_nanos": self.total_nanos,
+            "usage": self.usage.to_dict(),
+            "interrupted": self.interrupted,
         }
 
 
@@ -54,70 +110,200 @@ class CostTracker:
         tracker.finish_turn()
     """
 
-    # Pricing constants (USD)
-    # Soniox: ~$0.12/hour = $0.002/minute
-    SONIOX_COST_PER_MINUTE = 0.002
-    
-    # Groq: llama-3.3-70b-versatile
-    GROQ_INPUT_COST_PER_MILLION = 0.59
-    GROQ_OUTPUT_COST_PER_MILLION = 0.79
-    
-    # ElevenLabs: Pro tier
-    ELEVENLABS_COST_PER_1K_CHARS = 0.24
-
-    def __init__(self, session_id: str = "default"):
+    def __init__(
+        self,
+        session_id: str = "default",
+        pricing: Optional[SessionPricing] = None,
+        max_turn_history: int = MAX_TURN_HISTORY,
+        aggregate=None,
+    ):
         self.session_id = session_id
-        self.turns: List[TurnCost] = []
-        self._current_turn: TurnCost = TurnCost(turn_id=0)
+        # Cross-session aggregate told about every recorded turn (optional;
+        # see session_aggregator.TurnAggregate)
+        self.aggregate = aggregate
+        self.pricing = pricing or get_pricing_table().resolve_session()
+        self.turns: Deque[TurnCost] = deque(maxlen=max_turn_history or None)
+        self.ledger = UsageLedger()
+        self._current_turn: TurnCost = TurnCost(turn_id=0, usage=self.ledger.current)
         self._turn_counter = 0
+        self._interrupted_turn_count = 0
+        self._interrupted_nanos = 0
+        # Ids of turns handed to a task still unwinding after cancellation
+        self._detached: Set[int] = set()
+        self._closed = False
+
+        # Running nano-dollar totals over completed turns, folded in by
+        # finish_turn(); integer sums are exact so they equal summing self.turns
+        self._completed_stt_nanos = 0
+        self._completed_llm_nanos = 0
+        self._completed_tts_nanos = 0
+
+        # Per-turn cost distribution (nano-dollars) over every completed turn
+        self.turn_cost_stats = new_turn_cost_stats()
+
+    def _turn(self) -> TurnCost:
+        """The calling turn task's own turn (see bind_task), else the current turn."""
+        bound = _task_turn.get()
+        if bound is not None and bound[0] is self:
+            return bound[1]
+        return self._current_turn
+
+    def bind_task(self) -> None:
+        """
+        Pin the calling task, and the tasks it creates, to the current turn.
 
-    def add_stt_cost(self, audio_duration_seconds: float) -> None:
-        """Add STT cost based on audio duration."""
-        minutes = audio_duration_seconds / 60.0
-        self._current_turn.stt_cost += minutes * self.SONIOX_COST_PER_MINUTE
+        Spend by a turn task that is still unwinding after it was cancelled
+        and detached is then billed to its own turn, not the next one.
+        """
+        _task_turn.set((self, self._current_turn))
 
-    def add_llm_cost(self, input_tokens: int, output_tokens: int) -> None:
-        """Add LLM cost based on token counts."""
-        self._current_turn.llm_input_cost += (input_tokens / 1_000_000) * self.GROQ_INPUT_COST_PER_MILLION
-        self._current_turn.llm_output_cost += (output_tokens / 1_000_000) * self.GROQ_OUTPUT_COST_PER_MILLION
+    def add_stt_cost(
+        self,
+        audio_duration_seconds: float,
+        raw_audio_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        Add STT cost for audio streamed to the provider.
+
+        `raw_audio_seconds` is the inbound audio that audio was cut from
+        (before silence gating); it defaults to the streamed duration.
+        """
+        turn = self._turn()
+        audio_us = self.ledger.record_stt_audio(audio_duration_seconds, raw_audio_seconds, turn.usage)
+        turn.stt_nanos += self.pricing.stt_per_audio_us.cost_nanos(audio_us)
+
+    def add_llm_cost(self, input_tokens: int, output_tokens: int, estimated: bool = False) -> None:
+        """
+        Add LLM cost for provider-reported token counts.
+
+        Pass `estimated=True` when no usage was reported and the counts
+        were estimated; they are then also tallied as estimated.
+        """
+        turn = self._turn()
+        self.ledger.record_llm_tokens(input_tokens, output_tokens, estimated, turn.usage)
+        turn.llm_input_nanos += self.pricing.llm_per_input_token.cost_nanos(input_tokens)
+        turn.llm_output_nanos += self.pricing.llm_per_output_token.cost_nanos(output_tokens)
 
     def add_tts_cost(self, characters: int) -> None:
-        """Add TTS cost based on character count."""
-        self._current_turn.tts_cost += (characters / 1000) * self.ELEVENLABS_COST_PER_1K_CHARS
+        """Add TTS cost for characters sent for synthesis."""
+        turn = self._turn()
+        self.ledger.record_tts_characters(characters, turn.usage)
+        turn.tts_nanos += self.pricing.tts_per_character.cost_nanos(characters)
 
-    def finish_turn(self) -> TurnCost:
-        """Finalize current turn and start a new one."""
-        completed_turn = self._current_turn
-        self.turns.append(completed_turn)
+    def finish_turn(self, interrupted: bool = False) -> TurnCost:
+        """
+        Finalize current turn and start a new one.
+
+        Interrupted (barged-in) turns keep whatever was billed before the
+        cancellation and are also tallied as wasted spend.
+        """
+        completed_turn = self._turn()
+        if completed_turn is not self._current_turn:
+            # A detached turn task ran to completion after all
+            self.finish_detached(completed_turn)
+            return completed_turn
+        self._record(completed_turn, interrupted)
+        self.ledger.finish_turn()
         self._turn_counter += 1
-        self._current_turn = TurnCost(turn_id=self._turn_counter)
+        self._current_turn = TurnCost(turn_id=self._turn_counter, usage=self.ledger.current)
         return completed_turn
 
+    def _record(self, completed_turn: TurnCost, interrupted: bool) -> None:
+        completed_turn.interrupted = interrupted
+        if interrupted:
+            self._interrupted_turn_count += 1
+            self._interrupted_nanos += completed_turn.total_nanos
+        self.turns.append(completed_turn)
+        self._completed_stt_nanos += completed_turn.stt_nanos
+        self._completed_llm_nanos += completed_turn.llm_nanos
+        self._completed_tts_nanos += completed_turn.tts_nanos
+        self.turn_cost_stats.add(completed_turn.total_nanos)
+        self._report(completed_turn)
+
+    def _report(self, turn: TurnCost, finished: bool = True) -> None:
+        """Send a turn's spend to the process-wide sinks."""
+        voice_metrics.observe_turn_cost(turn)
+        if self.aggregate is not None:
+            self.aggregate.observe_turn_cost(turn, finished)
+
+    def detach_turn(self) -> TurnCost:
+        """
+        Hand the current turn over to its still-running task and start a new one.
+
+        The detached turn keeps being billed by the task (see bind_task) and
+        joins the totals, as interrupted, through finish_detached() once the
+        task has exited.
+        """
+        turn = self._current_turn
+        turn.interrupted = True
+        self._detached.add(turn.turn_id)
+        self.ledger.detach_turn()
+        self._turn_counter += 1
+        self._current_turn = TurnCost(turn_id=self._turn_counter, usage=self.ledger.current)
+        return turn
+
+    def finish_detached(self, turn: TurnCost) -> None:
+        """Record a detached turn as interrupted (once; later calls are ignored)."""
+        if turn.turn_id not in self._detached:
+            return
+        self._detached.discard(turn.turn_id)
+        self.ledger.finish_detached(turn.usage)
+        self._record(turn, interrupted=True)
+
+    def close(self) -> None:
+        """
+        Report spend on the unfinished turn when the session ends.
+
+        Finished turns are reported as they are recorded; this sends the
+        open turn's spend to the same sinks, once, so every metrics view
+        agrees on totals. It is not counted as a turn.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._report(self._current_turn, finished=False)
+
+    @property
+    def total_stt_nanos(self) -> int:
+        return self._completed_stt_nanos + self._current_turn.stt_nanos
+
+    @property
+    def total_llm_nanos(self) -> int:
+        return self._completed_llm_nanos + self._current_turn.llm_nanos
+
+    @property
+    def total_tts_nanos(self) -> int:
+        return self._completed_tts_nanos + self._current_turn.tts_nanos
+
+    @property
+    def total_nanos(self) -> int:
+        return self.total_stt_nanos + self.total_llm_nanos + self.total_tts_nanos
+
     @property
     def total_stt_cost(self) -> float:
-        return sum(t.stt_cost for t in self.turns) + self._current_turn.stt_cost
+        return nanos_to_dollars(self.total_stt_nanos)
 
     @property
     def total_llm_cost(self) -> float:
-        return sum(t.llm_cost for t in self.turns) + self._current_turn.llm_cost
+        return nanos_to_dollars(self.total_llm_nanos)
 
     @property
     def total_tts_cost(self) -> float:
-        return sum(t.tts_cost for t in self.turns) + self._current_turn.tts_cost
+        return nanos_to_dollars(self.total_tts_nanos)
 
     @property
     def total_cost(self) -> float:
-        return self.total_stt_cost + self.total_llm_cost + self.total_tts_cost
+        return nanos_to_dollars(self.total_nanos)
 
     @property
     def turn_count(self) -> int:
-        return len(self.turns)
+        return self._turn_counter
 
     @property
     def average_cost_per_turn(self) -> float:
-        if not self.turns:
+        if not self._turn_counter:
             return 0.0
-        return self.total_cost / len(self.turns)
+        return nanos_to_dollars(self.total_nanos // self._turn_counter)
 
     def get_summary(self) -> Dict:
         """Get cost summary for the conversation."""
@@ -130,7 +316,13 @@ class CostTracker:
                 "tts": round(self.total_tts_cost, 6),
                 "total": round(self.total_cost, 6),
             },
+            "total_nanos": self.total_nanos,
             "average_per_turn": round(self.average_cost_per_turn, 6),
+            "per_turn": turn_cost_summary(self.turn_cost_stats),
+            "usage": self.ledger.total.to_dict(),
+            "interrupted_turns": self._interrupted_turn_count,
+            "interrupted_cost": round(nanos_to_dollars(self._interrupted_nanos), 6),
+            "pricing_tier": self.pricing.tier,
         }
 
     def get_last_turn(self) -> Dict:
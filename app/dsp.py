@@ -0,0 +1,220 @@
+"""
+Audio DSP for Voice AI Agent
+
+In-process NumPy audio processing so clients can send audio at their native
+format and the server converts it to the PCM 16-bit 16 kHz mono the STT
+pipeline expects, without ffmpeg subprocesses:
+- int16 <-> float32 conversion (zero-copy views over the input buffer,
+  optional preallocated outputs)
+- Interleaved multi-channel downmix
+- RMS / peak level meters in dBFS
+- Stateful polyphase resampler (48 kHz, 44.1 kHz, 8 kHz, ... -> 16 kHz)
+- AudioConverter chaining the above per session
+"""
+
+from fractions import Fraction
+from typing import Dict, Optional
+import math
+
+import numpy as np
+
+from .audio_ingest import SAMPLE_RATE
+
+# Client rates accepted by AudioConverter (others would need very long filters)
+SUPPORTED_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000, 96000)
+
+_INT16_SCALE = 32768.0
+_SILENCE_DB = -120.0
+
+
+def pcm16_view(buffer) -> np.ndarray:
+    """View little-endian PCM 16-bit bytes (or a memoryview) as int16, no copy."""
+    return np.frombuffer(buffer, dtype="<i2")
+
+
+def pcm16_to_float32(buffer, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """PCM 16-bit -> float32 in [-1, 1). Writes into `out` when given."""
+    samples = pcm16_view(buffer)
+    if out is None:
+        out = np.empty(len(samples), dtype=np.float32)
+    else:
+        out = out[:len(samples)]
+    np.multiply(samples, 1 / _INT16_SCALE, out=out, casting="unsafe")
+    return out
+
+
+def float32_to_pcm16(samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """float32 in [-1, 1] -> int16 with clipping. Writes into `out` when given."""
+    if out is None:
+        out = np.empty(len(samples), dtype=np.int16)
+    else:
+        out = out[:len(samples)]
+    scaled = np.multiply(samples, _INT16_SCALE)
+    np.clip(scaled, -_INT16_SCALE, _INT16_SCALE - 1, out=scaled)
+    np.rint(scaled, out=scaled)
+    out[:] = scaled
+    return out
+
+
+def downmix(samples: np.ndarray, channels: int) -> np.ndarray:
+    """Average interleaved `channels` into mono (float32 in, float32 out)."""
+    if channels == 1:
+        return samples
+    frames = len(samples) // channels
+    return samples[:frames * channels].reshape(frames, channels).mean(axis=1, dtype=np.float32)
+
+
+def rms_dbfs(samples: np.ndarray) -> float:
+    """RMS level of float32 samples in dBFS (full-scale sine = -3 dBFS)."""
+    if not len(samples):
+        return _SILENCE_DB
+    power = float(np.dot(samples, samples)) / len(samples)
+    return 10 * math.log10(power) if power > 0 else _SILENCE_DB
+
+
+def peak_dbfs(samples: np.ndarray) -> float:
+    """Peak level of float32 samples in dBFS."""
+    if not len(samples):
+        return _SILENCE_DB
+    peak = max(float(samples.max()), -float(samples.min()))
+    return 20 * math.log10(peak) if peak > 0 else _SILENCE_DB
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler (upsample by `up`, low-pass, downsample by
+    `down`) evaluated in polyphase form, so only the output samples are
+    computed. Keeps filter history between calls, so blocks of any size
+    resample exactly as one continuous stream.
+
+    Usage:
+        resampler = PolyphaseResampler(48000, 16000)
+        out = resampler.process(float_block)     # float32 in, float32 out
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = SAMPLE_RATE, zero_crossings: int = 16):
+        ratio = Fraction(out_rate, in_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = ratio.numerator
+        self.down = ratio.denominator
+
+        # Windowed-sinc low-pass at the upsampled rate, cut off just below
+        # the lower Nyquist frequency
+        up, down = self.up, self.down
+        stretch = max(up, down)
+        taps_per_phase = math.ceil((2 * zero_crossings * stretch + 1) / up)
+        length = taps_per_phase * up
+        cutoff = 0.5 / stretch * 0.92
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0) * up
+        # phases[p, k] = h[p + k * up]; each output uses one phase
+        self._phases = h.reshape(taps_per_phase, up).T.astype(np.float32)
+        self._taps = taps_per_phase
+        self._tap_offsets = np.arange(taps_per_phase)
+
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._consumed = 0   # input samples seen
+        self._produced = 0   # output samples produced
+
+    def reset(self) -> None:
+        """Forget past input, as if the stream started over."""
+        self._history[:] = 0
+        self._consumed = 0
+        self._produced = 0
+
+    @property
+    def delay_ms(self) -> float:
+        """Group delay of the filter, in milliseconds."""
+        return (self._taps * self.up - 1) / 2 / (self.in_rate * self.up) * 1000
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample a block of float32 samples; returns the outputs it completes."""
+        if self.up == self.down:
+            return samples
+        buffer = np.concatenate((self._history, samples)) if len(self._history) else samples
+        total = self._consumed + len(samples)
+
+        # Outputs m whose newest input index (m * down) // up is available
+        end = -(-total * self.up // self.down)
+        m = np.arange(self._produced, end)
+        position = m * self.down
+        newest = position // self.up - (self._consumed - len(self._history))
+        phase = position % self.up
+
+        window = buffer[newest[:, None] - self._tap_offsets]
+        out = np.einsum("ik,ik->i", window, self._phases[phase]).astype(np.float32, copy=False)
+
+        if len(self._history):
+            self._history = buffer[len(buffer) - len(self._history):].copy()
+        self._consumed = total
+        self._produced = end
+        return out
+
+
+class AudioConverter:
+    """
+    Converts a client's native audio format to PCM 16-bit 16 kHz mono.
+
+    16 kHz mono input passes through untouched (no copy). Level meters are
+    updated for every block.
+
+    Usage:
+        converter = AudioConverter(48000, channels=2)
+        pcm16k = converter.process(frame_bytes)
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, channels: int = 1):
+        if sample_rate not in SUPPORTED_RATES or channels not in (1, 2):
+            raise ValueError(f"unsupported audio format: {sample_rate} Hz, {channels} channels")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.resampler = (
+            PolyphaseResampler(sample_rate, SAMPLE_RATE) if sample_rate != SAMPLE_RATE else None
+        )
+        # Bytes per sample frame (all channels); a trailing partial frame
+        # is carried to the next block so downmix() never drops it
+        self._frame_bytes = 2 * channels
+        self._partial = b""
+        self.rms_db = _SILENCE_DB
+        self.peak_db = _SILENCE_DB
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.resampler is None and self.channels == 1
+
+    def process(self, frame) -> bytes:
+        self.bytes_in += len(frame)
+        if self._partial:
+            frame = self._partial + bytes(frame)
+            self._partial = b""
+        rest = len(frame) % self._frame_bytes
+        if rest:
+            self._partial = bytes(frame[-rest:])
+            frame = memoryview(frame)[:-rest]
+
+        samples = pcm16_to_float32(frame)
+        samples = downmix(samples, self.channels)
+        self.rms_db = rms_dbfs(samples)
+        self.peak_db = peak_dbfs(samples)
+        if self.passthrough:
+            self.bytes_out += len(frame)
+            return frame
+        if self.resampler is not None:
+            samples = self.resampler.process(samples)
+        out = float32_to_pcm16(samples).tobytes()
+        self.bytes_out += len(out)
+        return out
+
+    def get_stats(self) -> Dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "resampling": None if self.resampler is None else f"{self.resampler.up}/{self.resampler.down}",
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "rms_dbfs": round(self.rms_db, 1),
+            "peak_dbfs": round(self.peak_db, 1),
+        }
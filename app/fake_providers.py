@@ -0,0 +1,239 @@
+"""
+Fake Providers for Voice AI Agent
+
+Deterministic local stand-ins for Soniox/Groq/ElevenLabs, used to benchmark
+pipeline overhead offline and run capacity tests without external APIs.
+
+Timing is drawn from seeded distributions configured with specs like:
+- "constant:200"        always 200
+- "uniform:100:300"     uniform between 100 and 300
+- "lognormal:200:0.3"   median 200, sigma 0.3 (long right tail)
+"""
+
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import math
+import os
+import random
+
+from .providers import LLMChunk, ProviderSet, TranscriptEvent
+
+# Approximate speaking rate used to size synthesized audio
+TTS_CHARS_PER_SECOND = 15.0
+
+
+@dataclass
+class LatencyDistribution:
+    """A seeded random distribution for a timing parameter."""
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """Parse a "kind:a[:b]" spec string."""
+        parts = spec.split(":")
+        kind = parts[0]
+        values = [float(p) for p in parts[1:]]
+        if kind == "constant" and len(values) == 1:
+            return cls(kind, values[0])
+        if kind in ("uniform", "lognormal") and len(values) == 2:
+            return cls(kind, values[0], values[1])
+        raise ValueError(f"Invalid distribution spec '{spec}'")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b)
+        raise ValueError(f"Unknown distribution kind '{self.kind}'")
+
+
+@dataclass
+class FakeProviderConfig:
+    """Timing model for the fake providers (milliseconds, tokens/sec, bytes/sec)."""
+    stt_final_latency_ms: LatencyDistribution = field(
+        default_factory=lambda: LatencyDistribution("constant", 150))
+    llm_ttft_ms: LatencyDistribution = field(
+        default_factory=lambda: LatencyDistribution("constant", 200))
+    llm_tokens_per_second: LatencyDistribution = field(
+        default_factory=lambda: LatencyDistribution("constant", 250))
+    tts_ttfb_ms: LatencyDistribution = field(
+        default_factory=lambda: LatencyDistribution("constant", 150))
+    tts_bytes_per_second: LatencyDistribution = field(
+        default_factory=lambda: LatencyDistribution("constant", 128_000))
+    seed: int = 0
+    transcripts: List[str] = field(default_factory=lambda: [
+        "hello there", "how are you", "play sound", "goodbye",
+    ])
+
+    @classmethod
+    def from_env(cls) -> "FakeProviderConfig":
+        config = cls()
+        env_fields = {
+            "FAKE_STT_FINAL_LATENCY_MS": "stt_final_latency_ms",
+            "FAKE_LLM_TTFT_MS": "llm_ttft_ms",
+            "FAKE_LLM_TOKENS_PER_SECOND": "llm_tokens_per_second",
+            "FAKE_TTS_TTFB_MS": "tts_ttfb_ms",
+            "FAKE_TTS_BYTES_PER_SECOND": "tts_bytes_per_second",
+        }
+        for env_name, attr in env_fields.items():
+            spec = os.getenv(env_name)
+            if spec:
+                setattr(config, attr, LatencyDistribution.parse(spec))
+        config.seed = int(os.getenv("FAKE_PROVIDER_SEED", config.seed))
+        transcripts = os.getenv("FAKE_STT_TRANSCRIPTS")
+        if transcripts:
+            config.transcripts = transcripts.split("|")
+        return config
+
+
+def canned_response(text: str) -> str:
+    """Pick a scripted reply for the user's text."""
+    text_lower = text.lower()
+
+    if "hello" in text_lower or "hi" in text_lower:
+        return "Hello! I'm your voice AI assistant. How can I help you today?"
+    elif "how are you" in text_lower:
+        return "I'm doing great, thank you for asking! I'm here and ready to help."
+    elif "weather" in text_lower:
+        return "I don't have access to real-time weather data, but I'd recommend checking a weather service for the most accurate forecast."
+    elif "help" in text_lower:
+        return "I can help with various tasks! You can ask me questions, have a conversation, or ask me to play audio by saying 'play sound'."
+    elif "bye" in text_lower or "goodbye" in text_lower:
+        return "Goodbye! It was nice talking with you. Have a great day!"
+    else:
+        return f"I heard you say: '{text}'. I'm a demo voice assistant. In production, I would use Groq's LLM for intelligent responses."
+
+
+class FakeSTTStream:
+    """Counts streamed audio and emits a scripted final transcript on flush."""
+
+    def __init__(self, provider: "FakeSTT"):
+        self._provider = provider
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._bytes = 0
+        self._partial_sent = False
+
+    async def consume(self, chunk: memoryview) -> None:
+        self._bytes += len(chunk)
+        if not self._partial_sent:
+            self._partial_sent = True
+            self._events.put_nowait(TranscriptEvent(text="...", is_final=False))
+
+    async def flush(self) -> None:
+        if not self._bytes:
+            return
+        delay = self._provider.sample(self._provider.config.stt_final_latency_ms)
+        await asyncio.sleep(delay / 1000)
+        self._events.put_nowait(TranscriptEvent(self._provider.next_transcript(), True))
+        self._bytes = 0
+        self._partial_sent = False
+
+    def __aiter__(self) -> AsyncIterator[TranscriptEvent]:
+        return self._iter_events()
+
+    async def _iter_events(self) -> AsyncIterator[TranscriptEvent]:
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            yield event
+
+    async def aclose(self) -> None:
+        self._events.put_nowait(None)
+
+
+class _FakeProvider:
+    def __init__(self, config: FakeProviderConfig, seed_offset: int):
+        self.config = config
+        self._rng = random.Random(config.seed + seed_offset)
+
+    def sample(self, distribution: LatencyDistribution) -> float:
+        return max(0.0, distribution.sample(self._rng))
+
+
+class FakeSTT(_FakeProvider):
+    name = "fake-stt"
+
+    def __init__(self, config: FakeProviderConfig):
+        super().__init__(config, seed_offset=1)
+        self._transcript_index = 0
+
+    def next_transcript(self) -> str:
+        transcripts = self.config.transcripts
+        text = transcripts[self._transcript_index % len(transcripts)]
+        self._transcript_index += 1
+        return text
+
+    def stream(self) -> FakeSTTStream:
+        return FakeSTTStream(self)
+
+
+class FakeLLM(_FakeProvider):
+    name = "fake-llm"
+    model = "fake"
+
+    def __init__(self, config: FakeProviderConfig):
+        super().__init__(config, seed_offset=2)
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[LLMChunk]:
+        user_text = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        )
+        words = canned_response(user_text).split(" ")
+        ttft = self.sample(self.config.llm_ttft_ms)
+        tokens_per_second = max(1.0, self.sample(self.config.llm_tokens_per_second))
+
+        await asyncio.sleep(ttft / 1000)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(1 / tokens_per_second)
+            yield LLMChunk(text=word if i == 0 else " " + word)
+
+        # ~4 characters per token, plus per-message overhead
+        input_tokens = sum(len(m["content"]) // 4 + 4 for m in messages)
+        yield LLMChunk(input_tokens=input_tokens, output_tokens=len(words))
+
+
+class FakeTTS(_FakeProvider):
+    name = "fake-tts"
+    sample_rate = 16000
+    chunk_ms = 40
+
+    def __init__(self, config: FakeProviderConfig):
+        super().__init__(config, seed_offset=3)
+        self._chunk_bytes = self.sample_rate * 2 * self.chunk_ms // 1000
+        self._silence = bytes(self._chunk_bytes)
+
+    async def synthesize(self, text: str) -> AsyncIterator[bytes]:
+        """Yield silent PCM sized to how long `text` would take to speak."""
+        duration = len(text) / TTS_CHARS_PER_SECOND
+        total_bytes = int(duration * self.sample_rate) * 2
+        ttfb = self.sample(self.config.tts_ttfb_ms)
+        bytes_per_second = max(1.0, self.sample(self.config.tts_bytes_per_second))
+        chunk_interval = self._chunk_bytes / bytes_per_second
+
+        await asyncio.sleep(ttfb / 1000)
+        sent = 0
+        while sent < total_bytes:
+            if sent:
+                await asyncio.sleep(chunk_interval)
+            remaining = total_bytes - sent
+            chunk = self._silence if remaining >= self._chunk_bytes else self._silence[:remaining]
+            sent += len(chunk)
+            yield chunk
+
+
+def create_fake_providers(config: Optional[FakeProviderConfig] = None) -> ProviderSet:
+    """Create a provider set backed by the fake providers."""
+    config = config or FakeProviderConfig.from_env()
+    return ProviderSet(
+        backend="fake",
+        stt=FakeSTT(config),
+        llm=FakeLLM(config),
+        tts=FakeTTS(config),
+    )
@@ -0,0 +1,167 @@
+"""
+Binary Framing for /ws/talk
+
+Optional wire format negotiated with the WebSocket subprotocol
+"voice-binary.v1". Every message, audio or control, is one binary WebSocket
+frame with a fixed 20-byte big-endian header:
+
+    offset  size  field
+    0       1     type          FRAME_AUDIO | FRAME_CONTROL
+    1       1     flags         FLAG_END_OF_UTTERANCE, ...
+    2       2     stream id     STREAM_* (audio sources share one socket)
+    4       4     sequence      per stream, starts at 0, wraps at 2^32
+    8       8     timestamp     capture time, microseconds since the epoch
+    16      4     length        payload bytes that follow
+
+Audio payloads are raw PCM 16-bit mono; control payloads are UTF-8 JSON
+with the same messages as the JSON mode. Clients send audio on STREAM_MIC
+and control on STREAM_CONTROL; frames on any other stream are dropped. Clients that don't request the
+subprotocol (e.g. test_client.html) keep the JSON text / raw binary mode.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+import struct
+import time
+
+SUBPROTOCOL = "voice-binary.v1"
+
+HEADER = struct.Struct("!BBHIQI")
+HEADER_SIZE = HEADER.size
+
+# Frame types
+FRAME_AUDIO = 1
+FRAME_CONTROL = 2
+
+# Flags
+FLAG_END_OF_UTTERANCE = 0x01  # client audio: same as a "commit" message
+
+# Stream ids
+STREAM_CONTROL = 0
+STREAM_MIC = 1       # client microphone audio
+STREAM_TTS = 2       # agent speech
+
+_SEQ_MASK = 0xFFFFFFFF
+
+
+class FrameError(ValueError):
+    """Raised for truncated or malformed frames."""
+
+
+@dataclass(slots=True)
+class Frame:
+    type: int
+    flags: int
+    stream_id: int
+    seq: int
+    timestamp_us: int
+    payload: memoryview
+
+
+def now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def parse_frame(data: bytes) -> Frame:
+    """Parse one frame; the payload is a zero-copy view into `data`."""
+    if len(data) < HEADER_SIZE:
+        raise FrameError(f"frame shorter than header ({len(data)} bytes)")
+    frame_type, flags, stream_id, seq, timestamp_us, length = HEADER.unpack_from(data)
+    if len(data) - HEADER_SIZE != length:
+        raise FrameError(f"payload length {len(data) - HEADER_SIZE} != header length {length}")
+    return Frame(frame_type, flags, stream_id, seq, timestamp_us, memoryview(data)[HEADER_SIZE:])
+
+
+class StreamStats:
+    """
+    Arrival statistics for one inbound stream.
+
+    Jitter is the RFC 3550 interarrival jitter estimate, computed from the
+    sender's capture timestamps and local arrival times.
+    """
+
+    __slots__ = ("frames", "bytes", "lost", "reordered", "jitter_us", "_last_seq", "_last_transit")
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self.lost = 0
+        self.reordered = 0
+        self.jitter_us = 0.0
+        self._last_seq: Optional[int] = None
+        self._last_transit: Optional[int] = None
+
+    def observe(self, frame: Frame, arrival_us: int) -> None:
+        self.frames += 1
+        self.bytes += len(frame.payload)
+
+        if self._last_seq is not None:
+            gap = (frame.seq - self._last_seq) & _SEQ_MASK
+            if gap == 0 or gap > _SEQ_MASK // 2:
+                # Duplicate or older than the newest frame seen
+                self.reordered += 1
+                return
+            self.lost += gap - 1
+        self._last_seq = frame.seq
+
+        transit = arrival_us - frame.timestamp_us
+        if self._last_transit is not None:
+            self.jitter_us += (abs(transit - self._last_transit) - self.jitter_us) / 16
+        self._last_transit = transit
+
+    def to_dict(self) -> Dict:
+        return {
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "lost": self.lost,
+            "reordered": self.reordered,
+            "jitter_ms": round(self.jitter_us / 1000, 3),
+        }
+
+
+class BinaryFraming:
+    """
+    Per-connection framing state: outbound sequence numbers and inbound
+    per-stream statistics.
+
+    Usage:
+        framing = BinaryFraming()
+        data = framing.encode(FRAME_AUDIO, STREAM_TTS, pcm_bytes)
+        frame = framing.receive(message_bytes)
+    """
+
+    __slots__ = ("_next_seq", "inbound")
+
+    def __init__(self):
+        self._next_seq: Dict[int, int] = {}
+        self.inbound: Dict[int, StreamStats] = {}
+
+    def encode(
+        self,
+        frame_type: int,
+        stream_id: int,
+        payload: bytes,
+        timestamp_us: Optional[int] = None,
+        flags: int = 0,
+    ) -> bytes:
+        seq = self._next_seq.get(stream_id, 0)
+        self._next_seq[stream_id] = (seq + 1) & _SEQ_MASK
+        if timestamp_us is None:
+            timestamp_us = now_us()
+        return HEADER.pack(frame_type, flags, stream_id, seq, timestamp_us, len(payload)) + payload
+
+    def receive(self, data: bytes) -> Frame:
+        """Parse an inbound frame and record its arrival."""
+        frame = parse_frame(data)
+        stats = self.inbound.get(frame.stream_id)
+        if stats is None:
+            stats = self.inbound[frame.stream_id] = StreamStats()
+        stats.observe(frame, now_us())
+        return frame
+
+    def get_stats(self) -> Dict:
+        return {
+            "protocol": SUBPROTOCOL,
+            "frames_sent": {str(stream): seq for stream, seq in self._next_seq.items()},
+            "inbound": {str(stream): stats.to_dict() for stream, stats in self.inbound.items()},
+        }
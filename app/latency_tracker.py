@@ -8,76 +8,126 @@ Tracks per-stage latency metrics for:
 - Tool execution
 
 Provides end-to-end latency measurements to ensure ≤2s target.
+
+Only the last `max_turn_history` turns are kept verbatim; rolling aggregates
+cover every turn, so memory per session is constant however long it runs.
+
+The STT stage is timed per utterance, apart from the turn in flight: the
+user may start the next utterance while the agent is still answering the
+previous one, and its STT stage belongs to the turn that answers it.
 """
 
+from collections import deque
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Deque, Dict, Optional, Set
+from time import perf_counter_ns
+import os
 import time
 import structlog
 
+from .prometheus import voice_metrics
+from .stats import RollingStats
+
 logger = structlog.get_logger()
 
+STAGES = ("stt", "llm", "tool", "tts")
+
+# Latency SLO: p95 end-to-end latency within 2s
+TARGET_LATENCY_MS = 2000
+TARGET_PERCENTILE = 95
+
+# Completed turns kept verbatim per session (0 = unbounded)
+MAX_TURN_HISTORY = int(os.getenv("MAX_TURN_HISTORY", "100"))
+
+# (tracker, turn) a turn task records into; set by LatencyTracker.bind_task()
+_task_turn: ContextVar[Optional[tuple]] = ContextVar("latency_task_turn", default=None)
+
+
+def _elapsed_ms(start_ns: Optional[int], end_ns: Optional[int]) -> Optional[float]:
+    if start_ns is None or end_ns is None:
+        return None
+    return (end_ns - start_ns) / 1_000_000
+
 
-@dataclass
+def _round_ms(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+@dataclass(slots=True)
 class StageLatency:
-    """Latency measurements for a single processing stage."""
+    """Latency measurements for a single processing stage (perf_counter_ns)."""
     stage: str
-    start_time: Optional[float] = None
-    first_result_time: Optional[float] = None
-    end_time: Optional[float] = None
+    start_ns: Optional[int] = None
+    first_result_ns: Optional[int] = None
+    end_ns: Optional[int] = None
 
     @property
     def time_to_first_result(self) -> Optional[float]:
         """Time from start to first partial result (ms)."""
-        if self.start_time and self.first_result_time:
-            return (self.first_result_time - self.start_time) * 1000
-        return None
+        return _elapsed_ms(self.start_ns, self.first_result_ns)
 
     @property
     def total_duration(self) -> Optional[float]:
         """Total duration from start to end (ms)."""
-        if self.start_time and self.end_time:
-            return (self.end_time - self.start_time) * 1000
-        return None
+        return _elapsed_ms(self.start_ns, self.end_ns)
 
     def to_dict(self) -> Dict:
         return {
             "stage": self.stage,
-            "time_to_first_result_ms": round(self.time_to_first_result, 2) if self.time_to_first_result else None,
-            "total_duration_ms": round(self.total_duration, 2) if self.total_duration else None,
+            "time_to_first_result_ms": _round_ms(self.time_to_first_result),
+            "total_duration_ms": _round_ms(self.total_duration),
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TurnLatency:
-    """Latency breakdown for a single conversation turn."""
+    """
+    Latency breakdown for a single conversation turn.
+
+    Stage timestamps are monotonic perf_counter_ns values; `started_at` is the
+    wall-clock time matching `start_ns`, used only to export absolute times.
+    """
     turn_id: int
-    turn_start_time: float = field(default_factory=time.time)
-    turn_end_time: Optional[float] = None
+    started_at: float = field(default_factory=time.time)
+    start_ns: int = field(default_factory=perf_counter_ns)
+    end_ns: Optional[int] = None
     stt: StageLatency = field(default_factory=lambda: StageLatency("stt"))
     llm: StageLatency = field(default_factory=lambda: StageLatency("llm"))
     tool: StageLatency = field(default_factory=lambda: StageLatency("tool"))
     tts: StageLatency = field(default_factory=lambda: StageLatency("tts"))
+    interrupted: bool = False
+
+    @property
+    def stages(self) -> tuple:
+        return (self.stt, self.llm, self.tool, self.tts)
+
+    @property
+    def started(self) -> bool:
+        """Whether any stage of this turn has started."""
+        return any(stage.start_ns is not None for stage in self.stages)
 
     @property
     def end_to_end_latency(self) -> Optional[float]:
         """End-to-end latency from audio input to first TTS output (ms)."""
-        if self.stt.start_time and self.tts.first_result_time:
-            return (self.tts.first_result_time - self.stt.start_time) * 1000
-        return None
+        return _elapsed_ms(self.stt.start_ns, self.tts.first_result_ns)
 
     @property
     def total_turn_duration(self) -> Optional[float]:
         """Total turn duration (ms)."""
-        if self.turn_end_time:
-            return (self.turn_end_time - self.turn_start_time) * 1000
-        return None
+        return _elapsed_ms(self.start_ns, self.end_ns)
+
+    def wall_time(self, timestamp_ns: int) -> float:
+        """Convert a perf_counter_ns timestamp from this turn to epoch seconds."""
+        return self.started_at + (timestamp_ns - self.start_ns) / 1_000_000_000
 
     def to_dict(self) -> Dict:
         return {
             "turn_id": self.turn_id,
-            "end_to_end_latency_ms": round(self.end_to_end_latency, 2) if self.end_to_end_latency else None,
-            "total_turn_duration_ms": round(self.total_turn_duration, 2) if self.total_turn_duration else None,
+            "started_at": self.started_at,
+            "end_to_end_latency_ms": _round_ms(self.end_to_end_latency),
+            "total_turn_duration_ms": _round_ms(self.total_turn_duration),
+            "interrupted": self.interrupted,
             "stages": {
                 "stt": self.stt.to_dict(),
                 "llm": self.llm.to_dict(),
@@ -96,122 +146,295 @@ class LatencyTracker:
         tracker.start_stt()
         tracker.stt_first_result()
         tracker.end_stt()
+        tracker.attach_stt()          # the utterance's turn starts
         tracker.start_llm()
         # ... etc
         tracker.finish_turn()
     """
 
-    def __init__(self, session_id: str = "default"):
+    __slots__ = (
+        "session_id",
+        "turns",
+        "_current_turn",
+        "_utterance_stt",
+        "_detached",
+        "_turn_counter",
+        "_interrupted_turn_count",
+        "aggregate",
+        "end_to_end_stats",
+        "turn_duration_stats",
+        "stage_stats",
+    )
+
+    def __init__(
+        self,
+        session_id: str = "default",
+        max_turn_history: int = MAX_TURN_HISTORY,
+        aggregate=None,
+    ):
         self.session_id = session_id
-        self.turns: List[TurnLatency] = []
+        # Cross-session aggregate told about every recorded turn (optional;
+        # see session_aggregator.TurnAggregate)
+        self.aggregate = aggregate
+        self.turns: Deque[TurnLatency] = deque(maxlen=max_turn_history or None)
         self._current_turn: TurnLatency = TurnLatency(turn_id=0)
+        # STT stage of the utterance being transcribed, until its turn starts
+        self._utterance_stt = StageLatency("stt")
+        # Ids of turns handed to a task still unwinding after cancellation
+        self._detached: Set[int] = set()
         self._turn_counter = 0
+        self._interrupted_turn_count = 0
+
+        # Aggregates over every completed turn, including those evicted
+        # from the history
+        self.end_to_end_stats = RollingStats()
+        self.turn_duration_stats = RollingStats()
+        self.stage_stats: Dict[str, RollingStats] = {
+            stage: RollingStats() for stage in STAGES
+        }
 
-    def _log_stage(self, stage: str, event: str, latency_ms: Optional[float] = None) -> None:
+    def _turn(self) -> TurnLatency:
+        """The calling turn task's own turn (see bind_task), else the current turn."""
+        bound = _task_turn.get()
+        if bound is not None and bound[0] is self:
+            return bound[1]
+        return self._current_turn
+
+    def bind_task(self) -> None:
+        """
+        Pin the calling task, and the tasks it creates, to the current turn.
+
+        A turn task that is still unwinding after it was cancelled and
+        detached then keeps recording into its own turn, not the next one.
+        """
+        _task_turn.set((self, self._current_turn))
+
+    def _log_stage(
+        self,
+        turn: TurnLatency,
+        stage: str,
+        event: str,
+        latency_ms: Optional[float] = None,
+    ) -> None:
         """Log stage events with structured logging."""
         log_data = {
             "session_id": self.session_id,
-            "turn_id": self._current_turn.turn_id,
+            "turn_id": turn.turn_id,
             "stage": stage,
         }
         if latency_ms is not None:
             log_data["latency_ms"] = round(latency_ms, 2)
         logger.info(f"{stage}_{event}", **log_data)
 
-    # STT timing methods
+    def _log_utterance(self, event: str, latency_ms: Optional[float] = None) -> None:
+        """Log STT events; the utterance has no turn until it is answered."""
+        log_data = {"session_id": self.session_id, "stage": "stt"}
+        if latency_ms is not None:
+            log_data["latency_ms"] = round(latency_ms, 2)
+        logger.info(f"stt_{event}", **log_data)
+
+    @property
+    def stt_started(self) -> bool:
+        """Whether the STT stage of the utterance being transcribed has started."""
+        return self._utterance_stt.start_ns is not None
+
+    # STT timing methods (the utterance being transcribed)
     def start_stt(self) -> None:
-        self._current_turn.stt.start_time = time.time()
-        self._log_stage("stt", "started")
+        self._utterance_stt.start_ns = perf_counter_ns()
+        self._log_utterance("started")
 
     def stt_first_result(self) -> None:
-        self._current_turn.stt.first_result_time = time.time()
-        self._log_stage("stt", "first_result", self._current_turn.stt.time_to_first_result)
+        self._utterance_stt.first_result_ns = perf_counter_ns()
+        self._log_utterance("first_result", self._utterance_stt.time_to_first_result)
 
     def end_stt(self) -> None:
-        self._current_turn.stt.end_time = time.time()
-        self._log_stage("stt", "completed", self._current_turn.stt.total_duration)
+        self._utterance_stt.end_ns = perf_counter_ns()
+        self._log_utterance("completed", self._utterance_stt.total_duration)
+
+    def take_stt(self) -> StageLatency:
+        """Detach the transcribed utterance's STT stage; the next utterance starts afresh."""
+        stage = self._utterance_stt
+        self._utterance_stt = StageLatency("stt")
+        return stage
+
+    def attach_stt(self, stage: Optional[StageLatency] = None) -> None:
+        """
+        Make `stage` (default: the utterance just transcribed) the current
+        turn's STT stage. Call once the turn answering the utterance starts.
+        """
+        self._current_turn.stt = self.take_stt() if stage is None else stage
+
+    def record_instant_stt(self) -> None:
+        """Record a zero-length STT stage on the turn (text input)."""
+        turn = self._turn()
+        stt = turn.stt
+        stt.start_ns = stt.first_result_ns = stt.end_ns = perf_counter_ns()
+        self._log_stage(turn, "stt", "completed", 0.0)
 
     # LLM timing methods
     def start_llm(self) -> None:
-        self._current_turn.llm.start_time = time.time()
-        self._log_stage("llm", "started")
+        turn = self._turn()
+        turn.llm.start_ns = perf_counter_ns()
+        self._log_stage(turn, "llm", "started")
 
     def llm_first_token(self) -> None:
-        self._current_turn.llm.first_result_time = time.time()
-        self._log_stage("llm", "first_token", self._current_turn.llm.time_to_first_result)
+        turn = self._turn()
+        turn.llm.first_result_ns = perf_counter_ns()
+        self._log_stage(turn, "llm", "first_token", turn.llm.time_to_first_result)
 
     def end_llm(self) -> None:
-        self._current_turn.llm.end_time = time.time()
-        self._log_stage("llm", "completed", self._current_turn.llm.total_duration)
+        turn = self._turn()
+        turn.llm.end_ns = perf_counter_ns()
+        self._log_stage(turn, "llm", "completed", turn.llm.total_duration)
 
     # Tool timing methods
     def start_tool(self) -> None:
-        self._current_turn.tool.start_time = time.time()
-        self._log_stage("tool", "started")
+        turn = self._turn()
+        turn.tool.start_ns = perf_counter_ns()
+        self._log_stage(turn, "tool", "started")
 
     def end_tool(self) -> None:
-        self._current_turn.tool.end_time = time.time()
-        self._current_turn.tool.first_result_time = self._current_turn.tool.end_time
-        self._log_stage("tool", "completed", self._current_turn.tool.total_duration)
+        turn = self._turn()
+        turn.tool.end_ns = perf_counter_ns()
+        turn.tool.first_result_ns = turn.tool.end_ns
+        self._log_stage(turn, "tool", "completed", turn.tool.total_duration)
 
     # TTS timing methods
     def start_tts(self) -> None:
-        self._current_turn.tts.start_time = time.time()
-        self._log_stage("tts", "started")
+        turn = self._turn()
+        turn.tts.start_ns = perf_counter_ns()
+        self._log_stage(turn, "tts", "started")
 
     def tts_first_audio(self) -> None:
-        self._current_turn.tts.first_result_time = time.time()
-        self._log_stage("tts", "first_audio", self._current_turn.tts.time_to_first_result)
+        turn = self._turn()
+        turn.tts.first_result_ns = perf_counter_ns()
+        self._log_stage(turn, "tts", "first_audio", turn.tts.time_to_first_result)
         # Log end-to-end latency when first audio is produced
-        e2e = self._current_turn.end_to_end_latency
-        if e2e:
+        e2e = turn.end_to_end_latency
+        if e2e is not None:
             logger.info("end_to_end_latency", 
                        session_id=self.session_id,
-                       turn_id=self._current_turn.turn_id,
+                       turn_id=turn.turn_id,
                        latency_ms=round(e2e, 2),
-                       target_met=e2e <= 2000)
+                       target_met=e2e <= TARGET_LATENCY_MS)
 
     def end_tts(self) -> None:
-        self._current_turn.tts.end_time = time.time()
-        self._log_stage("tts", "completed", self._current_turn.tts.total_duration)
+        turn = self._turn()
+        turn.tts.end_ns = perf_counter_ns()
+        self._log_stage(turn, "tts", "completed", turn.tts.total_duration)
 
-    def finish_turn(self) -> TurnLatency:
+    def finish_turn(self, interrupted: bool = False) -> TurnLatency:
         """Finalize current turn and start a new one."""
-        self._current_turn.turn_end_time = time.time()
-        completed_turn = self._current_turn
+        turn = self._turn()
+        if turn is not self._current_turn:
+            # A detached turn task ran to completion after all
+            self.finish_detached(turn)
+            return turn
+        self._record(turn, interrupted)
+        self._turn_counter += 1
+        self._current_turn = TurnLatency(turn_id=self._turn_counter)
+        return turn
+
+    def _record(self, completed_turn: TurnLatency, interrupted: bool) -> None:
+        completed_turn.end_ns = perf_counter_ns()
+        completed_turn.interrupted = interrupted
         self.turns.append(completed_turn)
+        if interrupted:
+            self._interrupted_turn_count += 1
+        end_to_end = completed_turn.end_to_end_latency
+        if end_to_end is not None:
+            self.end_to_end_stats.add(end_to_end)
+        turn_duration = completed_turn.total_turn_duration
+        if turn_duration is not None:
+            self.turn_duration_stats.add(turn_duration)
+        for stage in completed_turn.stages:
+            duration = stage.total_duration
+            if duration is not None:
+                self.stage_stats[stage.stage].add(duration)
         
+        voice_metrics.observe_turn_latency(completed_turn)
+        if self.aggregate is not None:
+            self.aggregate.observe_turn_latency(completed_turn)
+
         logger.info("turn_completed",
                    session_id=self.session_id,
                    turn_id=completed_turn.turn_id,
-                   total_duration_ms=round(completed_turn.total_turn_duration or 0, 2),
-                   end_to_end_ms=round(completed_turn.end_to_end_latency or 0, 2))
-        
+                   total_duration_ms=round(turn_duration or 0, 2),
+                   end_to_end_ms=round(end_to_end or 0, 2),
+                   interrupted=interrupted)
+
+    @staticmethod
+    def _close_stages(turn: TurnLatency) -> None:
+        now = perf_counter_ns()
+        for stage in turn.stages:
+            if stage.start_ns is not None and stage.end_ns is None:
+                stage.end_ns = now
+
+    def interrupt_turn(self) -> Optional[TurnLatency]:
+        """
+        Close any open stages of the current turn and record it as interrupted.
+
+        Returns None if the turn had not started yet.
+        """
+        turn = self._current_turn
+        if not turn.started:
+            return None
+        self._close_stages(turn)
+        return self.finish_turn(interrupted=True)
+
+    def detach_turn(self) -> TurnLatency:
+        """
+        Hand the current turn over to its still-running task and start a new one.
+
+        The detached turn keeps receiving the task's writes (see bind_task)
+        and is recorded as interrupted by finish_detached() once the task
+        has exited.
+        """
+        turn = self._current_turn
+        turn.interrupted = True
+        self._detached.add(turn.turn_id)
         self._turn_counter += 1
         self._current_turn = TurnLatency(turn_id=self._turn_counter)
-        return completed_turn
+        return turn
+
+    def finish_detached(self, turn: TurnLatency) -> None:
+        """Record a detached turn as interrupted (once; later calls are ignored)."""
+        if turn.turn_id not in self._detached:
+            return
+        self._detached.discard(turn.turn_id)
+        self._close_stages(turn)
+        self._record(turn, interrupted=True)
+
+    @property
+    def interrupted_turn_count(self) -> int:
+        return self._interrupted_turn_count
 
     @property
     def average_end_to_end_latency(self) -> Optional[float]:
         """Average end-to-end latency across all turns (ms)."""
-        latencies = [t.end_to_end_latency for t in self.turns if t.end_to_end_latency]
-        if not latencies:
-            return None
-        return sum(latencies) / len(latencies)
+        return self.end_to_end_stats.mean
 
     @property
     def turn_count(self) -> int:
-        return len(self.turns)
+        return self._turn_counter
 
     def get_summary(self) -> Dict:
         """Get latency summary for the session."""
         avg_e2e = self.average_end_to_end_latency
+        p95 = self.end_to_end_stats.quantile(TARGET_PERCENTILE / 100)
         return {
             "session_id": self.session_id,
             "turn_count": self.turn_count,
+            "interrupted_turns": self.interrupted_turn_count,
             "average_end_to_end_latency_ms": round(avg_e2e, 2) if avg_e2e else None,
-            "target_latency_ms": 2000,
-            "target_met": avg_e2e is not None and avg_e2e <= 2000,
+            "target_latency_ms": TARGET_LATENCY_MS,
+            "target_percentile": TARGET_PERCENTILE,
+            "target_met": p95 is not None and p95 <= TARGET_LATENCY_MS,
+            "end_to_end_ms": self.end_to_end_stats.to_dict(),
+            "turn_duration_ms": self.turn_duration_stats.to_dict(),
+            "stages_ms": {
+                stage: stats.to_dict() for stage, stats in self.stage_stats.items()
+            },
         }
 
     def get_last_turn(self) -> Dict:
@@ -0,0 +1,135 @@
+"""
+LiveKit Provider Adapters for Voice AI Agent
+
+Wraps the LiveKit plugins (Soniox STT, Groq LLM, ElevenLabs TTS, Silero VAD)
+behind the provider protocol in providers.py. The wrapped plugin is exposed
+as `.plugin` so VoiceAgent can hand it to an AgentSession.
+"""
+
+from typing import AsyncIterator, Dict, List
+import os
+
+from livekit import rtc
+from livekit.agents import llm as agents_llm
+from livekit.agents import stt as agents_stt
+from livekit.plugins import soniox, groq, elevenlabs, silero
+
+from .audio_ingest import SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+from .providers import LLMChunk, ProviderSet, TranscriptEvent
+
+LLM_MODEL = "llama-3.3-70b-versatile"
+TTS_MODEL = "eleven_turbo_v2_5"  # Fastest model for low latency
+
+
+class LiveKitSTTStream:
+    """Feeds PCM chunks into a LiveKit SpeechStream and yields transcripts."""
+
+    def __init__(self, speech_stream):
+        self._stream = speech_stream
+
+    async def consume(self, chunk: memoryview) -> None:
+        samples = len(chunk) // (SAMPLE_WIDTH * CHANNELS)
+        # AudioFrame copies the data, so the ring buffer slot can be reused
+        self._stream.push_frame(rtc.AudioFrame(
+            data=chunk,
+            sample_rate=SAMPLE_RATE,
+            num_channels=CHANNELS,
+            samples_per_channel=samples,
+        ))
+
+    async def flush(self) -> None:
+        self._stream.flush()
+
+    def __aiter__(self) -> AsyncIterator[TranscriptEvent]:
+        return self._iter_events()
+
+    async def _iter_events(self) -> AsyncIterator[TranscriptEvent]:
+        async for event in self._stream:
+            if event.type == agents_stt.SpeechEventType.INTERIM_TRANSCRIPT:
+                is_final = False
+            elif event.type == agents_stt.SpeechEventType.FINAL_TRANSCRIPT:
+                is_final = True
+            else:
+                continue
+            if event.alternatives:
+                yield TranscriptEvent(text=event.alternatives[0].text, is_final=is_final)
+
+    async def aclose(self) -> None:
+        self._stream.end_input()
+        await self._stream.aclose()
+
+
+class LiveKitSTT:
+    name = "soniox"
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    def stream(self) -> LiveKitSTTStream:
+        return LiveKitSTTStream(self.plugin.stream())
+
+
+class LiveKitLLM:
+    name = "groq"
+
+    def __init__(self, plugin, model: str):
+        self.plugin = plugin
+        self.model = model
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[LLMChunk]:
+        chat_ctx = agents_llm.ChatContext.empty()
+        for message in messages:
+            chat_ctx.add_message(role=message["role"], content=message["content"])
+
+        async with self.plugin.chat(chat_ctx=chat_ctx) as llm_stream:
+            async for chunk in llm_stream:
+                if chunk.delta and chunk.delta.content:
+                    yield LLMChunk(text=chunk.delta.content)
+                if chunk.usage:
+                    yield LLMChunk(
+                        input_tokens=chunk.usage.prompt_tokens,
+                        output_tokens=chunk.usage.completion_tokens,
+                    )
+
+
+class LiveKitTTS:
+    name = "elevenlabs"
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    @property
+    def sample_rate(self) -> int:
+        return self.plugin.sample_rate
+
+    async def synthesize(self, text: str) -> AsyncIterator[bytes]:
+        async with self.plugin.synthesize(text) as tts_stream:
+            async for audio in tts_stream:
+                yield bytes(audio.frame.data)
+
+
+def create_livekit_providers(load_vad: bool = True) -> ProviderSet:
+    """Create the production provider set (Soniox, Groq, ElevenLabs, Silero)."""
+    stt = soniox.STT(
+        api_key=os.getenv("SONIOX_API_KEY"),
+    )
+
+    llm = groq.LLM(
+        model=LLM_MODEL,
+        api_key=os.getenv("GROQ_API_KEY"),
+        temperature=0.7,
+    )
+
+    tts = elevenlabs.TTS(
+        api_key=os.getenv("ELEVEN_API_KEY"),
+        voice_id=os.getenv("ELEVEN_VOICE_ID", "21m00Tcm4TlvDq8ikWAM"),  # Rachel
+        model=TTS_MODEL,
+    )
+
+    return ProviderSet(
+        backend="livekit",
+        stt=LiveKitSTT(stt),
+        llm=LiveKitLLM(llm, LLM_MODEL),
+        tts=LiveKitTTS(tts),
+        vad=silero.VAD.load() if load_vad else None,
+    )
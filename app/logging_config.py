@@ -0,0 +1,315 @@
+"""
+Logging Configuration for Voice AI Agent
+
+Shared structlog setup for the API server and the LiveKit worker:
+- The calling (event loop) thread only builds the event dict and enqueues it;
+  structlog events skip stdlib LogRecords entirely
+- A background thread drains the queue in batches, renders JSON and writes
+- The queue is bounded; when it is full records are dropped and counted,
+  never blocking the caller
+- High-frequency events can be sampled (keep 1 in N) before any work is done
+- Stdlib records (livekit, ...) go through the same queue and writer; so do
+  uvicorn's, whose loggers don't propagate to the root logger and get the
+  queue handler attached directly (uvicorn configures its logging before it
+  imports the app, so this replaces its stream handlers)
+
+Environment:
+- LOG_LEVEL:       minimum level (default INFO)
+- LOG_QUEUE_SIZE:  max records waiting to be written (default 10000)
+- LOG_SAMPLE:      per-event sampling, e.g. "stt_started:10,llm_started:10"
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TextIO, Union
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+
+import structlog
+
+_BATCH_SIZE = 256
+_DRAIN_TIMEOUT = 2.0
+
+# Queue end-of-stream marker
+_STOP = None
+
+# Loggers uvicorn configures with their own handlers and propagate=False
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+def parse_sample_rates(spec: str) -> Dict[str, int]:
+    """Parse "event:N,event:N" into {event: N} (keep 1 in N)."""
+    rates = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        event, _, every = item.partition(":")
+        rates[event.strip()] = max(1, int(every or 1))
+    return rates
+
+
+class EventSampler:
+    """structlog processor that keeps 1 in N occurrences of selected events."""
+
+    def __init__(self, rates: Dict[str, int]):
+        self.rates = rates
+        self._seen: Dict[str, int] = {}
+        self.sampled_out = 0
+
+    def __call__(self, logger, method_name: str, event_dict: Dict) -> Dict:
+        every = self.rates.get(event_dict.get("event"))
+        if every and every > 1:
+            event = event_dict["event"]
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+            if seen % every:
+                self.sampled_out += 1
+                raise structlog.DropEvent
+            event_dict["sample_rate"] = every
+        return event_dict
+
+
+def _iso_timestamp(logger, method_name: str, event_dict: Dict) -> Dict:
+    """Render the epoch timestamp captured at log time as ISO 8601 (UTC)."""
+    timestamp = event_dict.get("timestamp")
+    if isinstance(timestamp, float):
+        event_dict["timestamp"] = datetime.fromtimestamp(
+            timestamp, tz=timezone.utc
+        ).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return event_dict
+
+
+class LogQueue:
+    """Bounded, non-blocking record queue shared by structlog and stdlib."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._queue: "queue.SimpleQueue[Union[Dict, logging.LogRecord, None]]" = queue.SimpleQueue()
+        self.enqueued = 0
+        self.dropped = 0
+
+    def put(self, item: Union[str, Dict, logging.LogRecord]) -> None:
+        if self._queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return
+        self._queue.put(item)
+        self.enqueued += 1
+
+    def put_stop(self) -> None:
+        self._queue.put(_STOP)
+
+    def get(self):
+        return self._queue.get()
+
+    def get_nowait(self):
+        return self._queue.get_nowait()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+class QueueLogger:
+    """structlog logger that hands the finished event dict to the queue."""
+
+    def __init__(self, log_queue: LogQueue, name: str):
+        self._queue = log_queue
+        self._name = name
+
+    def msg(self, **event_dict: Any) -> None:
+        event_dict["logger"] = self._name
+        self._queue.put(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class QueueLoggerFactory:
+    """
+    Creates QueueLoggers named after the calling module.
+
+    The name is resolved once per logger; with cache_logger_on_first_use
+    that is once per module-level `structlog.get_logger()`.
+    """
+
+    def __init__(self, log_queue: LogQueue):
+        self._queue = log_queue
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        if args and isinstance(args[0], str):
+            return QueueLogger(self._queue, args[0])
+        frame = sys._getframe(1)
+        while frame.f_back and frame.f_globals.get("__name__", "").startswith("structlog"):
+            frame = frame.f_back
+        return QueueLogger(self._queue, frame.f_globals.get("__name__", "?"))
+
+
+class NonBlockingQueueHandler(logging.Handler):
+    """Stdlib handler that enqueues records for the writer thread."""
+
+    def __init__(self, log_queue: LogQueue):
+        super().__init__()
+        self.queue = log_queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Resolve args now, since they may reference objects that change
+        # before the writer runs
+        record.msg = record.getMessage()
+        record.args = None
+        self.queue.put(record)
+
+
+class LogWriter:
+    """
+    Background thread that renders and writes queued records in batches.
+
+    Items are stdlib LogRecords, structlog event dicts, or already
+    rendered lines (str), which are written as they are.
+    """
+
+    def __init__(self, log_queue: LogQueue, stream: TextIO, name: str = "log-writer"):
+        self.queue = log_queue
+        self.stream = stream
+        self.written = 0
+        self.batches = 0
+
+        self._render_chain = [
+            _iso_timestamp,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(),
+        ]
+        self._record_formatter = structlog.stdlib.ProcessorFormatter(
+            foreign_pre_chain=[
+                structlog.stdlib.add_logger_name,
+                structlog.stdlib.add_log_level,
+                structlog.processors.TimeStamper(fmt=None, utc=True),
+            ],
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.processors.format_exc_info,
+                *self._render_chain,
+            ],
+        )
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write everything still queued, then stop the thread."""
+        if not self._thread.is_alive():
+            return
+        self.queue.put_stop()
+        self._thread.join(_DRAIN_TIMEOUT)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            batch: List[Union[Dict, logging.LogRecord]] = []
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= _BATCH_SIZE:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            if item is _STOP:
+                return
+
+    def _render(self, item: Union[str, Dict, logging.LogRecord]) -> str:
+        if isinstance(item, str):
+            return item
+        if isinstance(item, logging.LogRecord):
+            return self._record_formatter.format(item)
+        rendered: Any = item
+        for processor in self._render_chain:
+            rendered = processor(None, "info", rendered)
+        return rendered
+
+    def _write(self, batch: List[Union[Dict, logging.LogRecord]]) -> None:
+        lines = []
+        for item in batch:
+            try:
+                lines.append(self._render(item))
+            except Exception as e:
+                lines.append(f'{{"event": "log_render_failed", "error": {str(e)!r}}}')
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            return
+        self.written += len(lines)
+        self.batches += 1
+
+
+_queue: Optional[LogQueue] = None
+_writer: Optional[LogWriter] = None
+_sampler: Optional[EventSampler] = None
+
+
+def configure_logging(level: Optional[str] = None, stream: Optional[TextIO] = None) -> None:
+    """Configure structlog and stdlib logging. Safe to call more than once."""
+    global _queue, _writer, _sampler
+    if _writer is not None:
+        return
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    _queue = LogQueue(int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    _sampler = EventSampler(parse_sample_rates(os.getenv("LOG_SAMPLE", "")))
+
+    structlog.configure(
+        processors=[
+            _sampler,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt=None, utc=True),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(level)),
+        context_class=dict,
+        logger_factory=QueueLoggerFactory(_queue),
+        cache_logger_on_first_use=True,
+    )
+
+    handler = NonBlockingQueueHandler(_queue)
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name in _UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for existing in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(existing)
+        uvicorn_logger.addHandler(handler)
+        uvicorn_logger.propagate = False
+
+    _writer = LogWriter(_queue, stream or sys.stdout)
+    _writer.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records. Call on shutdown; also registered with atexit."""
+    if _writer is not None:
+        _writer.stop()
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Get queue and writer counters for metrics."""
+    if _queue is None or _writer is None:
+        return {}
+    return {
+        "enqueued": _queue.enqueued,
+        "dropped": _queue.dropped,
+        "sampled_out": _sampler.sampled_out if _sampler else 0,
+        "written": _writer.written,
+        "batches": _writer.batches,
+        "queue_depth": _queue.qsize(),
+    }
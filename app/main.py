@@ -5,50 +5,66 @@ Provides:
 - WebSocket endpoint /ws/talk for bidirectional audio streaming
 - GET /health for health checks
 - GET /metrics for latency and cost metrics
+- GET /metrics/prometheus for Prometheus scraping
 """
 
 import asyncio
-import json
+import functools
 import os
 import uuid
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from typing import Dict, Optional
 
 import structlog
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from dotenv import load_dotenv
 
-from .session_manager import session_manager, Session
+from .session_manager import session_manager, Session, SessionRejected
+from .session_aggregator import finished_sessions
+from .audio_ingest import AudioIngest, BYTES_PER_SECOND, SAMPLE_RATE
+from .dsp import AudioConverter
+from .opus import OpusError, create_codec
+from .framing import (
+    FLAG_END_OF_UTTERANCE,
+    FRAME_AUDIO,
+    FRAME_CONTROL,
+    STREAM_CONTROL,
+    STREAM_MIC,
+    SUBPROTOCOL as BINARY_SUBPROTOCOL,
+    BinaryFraming,
+    FrameError,
+)
+from .outbound import OutboundQueue
 from .cost_tracker import CostTracker
-from .latency_tracker import LatencyTracker
+from .usage import estimate_tokens
+from .latency_tracker import LatencyTracker, StageLatency
+from .pipeline import TurnPipeline, static_llm_stream
+from .logging_config import configure_logging, get_logging_stats
+from .prometheus import CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE, voice_metrics
+from .shared_metrics import attach_from_env as attach_shared_metrics
+from .provider_pool import provider_pool
+from .vad import SPEECH_END, SPEECH_START, create_vad
+from .silence_gate import create_silence_gate
+from .serialization import JSONBytesResponse, JSONDecodeError, get_serializer
 from .tools import AudioPlaybackTool, SAMPLE_AUDIO_URLS
 
 # Load environment variables
 load_dotenv()
 
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
-    wrapper_class=structlog.stdlib.BoundLogger,
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
-)
+# Configure structured logging (rendered and written off the event loop)
+configure_logging()
 
 logger = structlog.get_logger()
 
+serializer = get_serializer()
+
+# WebSocket close codes (RFC 6455)
+WS_CLOSE_GOING_AWAY = 1001
+WS_CLOSE_UNSUPPORTED_DATA = 1003
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -56,10 +72,21 @@ async def lifespan(app: FastAPI):
     logger.info("application_startup", 
                 host=os.getenv("HOST", "0.0.0.0"),
                 port=os.getenv("PORT", "8000"))
+    # Load providers once so the first session doesn't pay for it
+    provider_pool.load()
+    session_manager.start_reaper()
+    # Publish metrics for other workers when METRICS_SHM_NAME is set
+    shared_metrics = attach_shared_metrics()
+    voice_metrics.attach_shared(shared_metrics)
     yield
     # Cleanup on shutdown
     logger.info("application_shutdown",
                 active_sessions=session_manager.active_session_count)
+    await session_manager.stop_reaper()
+    finished_sessions.close()
+    if shared_metrics is not None:
+        voice_metrics.attach_shared(None)
+        shared_metrics.detach()
 
 
 # Create FastAPI app
@@ -87,24 +114,35 @@ async def health_check() -> Dict[str, str]:
 
 
 @app.get("/metrics")
-async def get_metrics() -> Dict[str, Any]:
+async def get_metrics() -> JSONBytesResponse:
     """
     Get metrics including:
     - Active sessions count
     - Average end-to-end latency
     - Cost per turn and per conversation breakdown
+    - Server-wide totals across workers (when METRICS_SHM_NAME is set)
     """
     metrics = session_manager.get_aggregate_metrics()
-    return metrics
+    metrics["providers"] = provider_pool.get_stats()
+    metrics["logging"] = get_logging_stats()
+    if voice_metrics.shared is not None:
+        metrics["cluster"] = voice_metrics.shared.read_all()
+    return JSONBytesResponse(metrics)
+
+
+@app.get("/metrics/prometheus")
+async def get_prometheus_metrics() -> Response:
+    """Prometheus text exposition of event-time counters, gauges and histograms."""
+    return Response(content=voice_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
 @app.get("/metrics/{session_id}")
-async def get_session_metrics(session_id: str) -> Dict[str, Any]:
+async def get_session_metrics(session_id: str) -> JSONBytesResponse:
     """Get detailed metrics for a specific session."""
     details = session_manager.get_session_details(session_id)
     if not details:
         raise HTTPException(status_code=404, detail="Session not found")
-    return details
+    return JSONBytesResponse(details)
 
 
 @app.websocket("/ws/talk")
@@ -113,21 +151,54 @@ async def websocket_talk(websocket: WebSocket):
     Bidirectional WebSocket for voice conversation.
     
     Protocol:
-    - Client sends: Binary audio frames (PCM 16-bit, 16kHz, mono)
-    - Client sends: JSON control messages {"type": "start"|"stop"|"cancel"}
+    - Client sends: Binary audio frames (PCM 16-bit; 16kHz mono unless the
+      `sample_rate` / `channels` query parameters say otherwise, e.g.
+      /ws/talk?sample_rate=48000&channels=2, resampled in-process; or Opus
+      packets, one per message, with /ws/talk?codec=opus)
+    - Client sends: JSON control messages {"type": "start"|"commit"|"stop"|"cancel"}
     - Server sends: JSON transcript updates {"type": "transcript", "text": "...", "is_final": bool}
-    - Server sends: Binary audio frames (TTS output)
-    - Server sends: JSON metadata {"type": "metadata", "latency": {...}, "cost": {...}}
+    - Server sends: Binary audio frames (TTS output; Opus packets with codec=opus)
+    - Server sends: JSON metadata {"type": "turn_complete"|"turn_cancelled", "latency": {...}, "cost": {...}}
+    
+    Control messages and transcripts are written ahead of queued TTS audio.
+    
+    Clients that request the "voice-binary.v1" subprotocol get the binary
+    framing of framing.py instead: every message in both directions is a
+    binary frame with type, stream id, sequence, timestamp and length.
+    
+    Close codes: 1013 (try again later) when the server is at capacity,
+    1001 (going away) when the session hits its idle or maximum duration.
     """
-    await websocket.accept()
+    binary = BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", ())
+    await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
+    
+    params = websocket.query_params
+    try:
+        codec = create_codec(params.get("codec"))
+        # Opus is always decoded to 16kHz mono
+        converter = None if codec else create_audio_converter(params)
+    except ValueError as e:
+        await websocket.close(code=WS_CLOSE_UNSUPPORTED_DATA, reason=str(e))
+        return
     
     session_id = str(uuid.uuid4())
-    session = await session_manager.create_session(session_id)
+    try:
+        session = await session_manager.create_session(session_id)
+    except SessionRejected as e:
+        await websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER, reason=str(e))
+        return
+    # Lets the session reaper stop this handler on timeout
+    session.handler_task = asyncio.current_task()
+    if binary:
+        session.framing = BinaryFraming()
+    session.audio_converter = converter
+    session.codec = codec
     
-    logger.info("websocket_connected", session_id=session_id)
+    logger.info("websocket_connected", session_id=session_id, binary_framing=binary,
+                codec=codec.name if codec else "pcm")
     
     # Send session info to client
-    await websocket.send_json({
+    await send_direct(websocket, session, {
         "type": "session_start",
         "session_id": session_id,
     })
@@ -136,10 +207,19 @@ async def websocket_talk(websocket: WebSocket):
         await handle_voice_session(websocket, session)
     except WebSocketDisconnect:
         logger.info("websocket_disconnected", session_id=session_id)
+    except asyncio.CancelledError:
+        if session.expired_reason is None:
+            raise
+        # Expired by the reaper: swallow our own cancellation and close
+        asyncio.current_task().uncancel()
+        try:
+            await websocket.close(code=WS_CLOSE_GOING_AWAY, reason=session.expired_reason)
+        except Exception:
+            pass
     except Exception as e:
         logger.exception("websocket_error", session_id=session_id, error=str(e))
         try:
-            await websocket.send_json({
+            await send_direct(websocket, session, {
                 "type": "error",
                 "message": str(e),
             })
@@ -151,34 +231,93 @@ async def websocket_talk(websocket: WebSocket):
         logger.info("session_cleanup_complete", session_id=session_id)
 
 
+def create_audio_converter(params) -> Optional[AudioConverter]:
+    """Converter for the client's declared input format; None for 16kHz mono."""
+    sample_rate = int(params.get("sample_rate", SAMPLE_RATE))
+    channels = int(params.get("channels", 1))
+    if sample_rate == SAMPLE_RATE and channels == 1:
+        return None
+    return AudioConverter(sample_rate, channels)
+
+
+async def send_direct(websocket: WebSocket, session: Session, message: Dict) -> None:
+    """Send a message outside the outbound queue (before it starts / after it stops)."""
+    if session.framing is None:
+        await websocket.send_text(serializer.dumps_str(message))
+    else:
+        await websocket.send_bytes(
+            session.framing.encode(FRAME_CONTROL, STREAM_CONTROL, serializer.dumps(message))
+        )
+
+
 async def handle_voice_session(websocket: WebSocket, session: Session):
     """
     Main voice session handler.
     
-    This simulates the voice pipeline without requiring actual LiveKit connection.
-    For production, this would integrate with the LiveKit agent worker.
+    Runs the voice pipeline without requiring a LiveKit connection. This
+    coroutine is the connection's reader; a separate writer task drains the
+    session's outbound queue to the socket.
     """
     cost_tracker = session.cost_tracker
     latency_tracker = session.latency_tracker
     
+    # Borrow the process-wide providers for the lifetime of the session
+    provider_lease = provider_pool.acquire()
+    session.providers = provider_lease.providers
+    
+    # All sends go through the outbound queue, drained by its own writer
+    # task so a slow client cannot stall the receive loop
+    encoder_factory = None
+    if session.codec is not None:
+        encoder_factory = functools.partial(session.codec.new_encoder, session.providers.tts.sample_rate)
+    outbound = OutboundQueue(
+        session.session_id,
+        framing=session.framing,
+        encoder_factory=encoder_factory,
+    )
+    session.outbound = outbound
+    outbound.start(websocket)
+    
     # Audio playback callback
     async def play_audio_callback(audio_url: str) -> bool:
         """Send audio playback command to client."""
-        try:
-            await websocket.send_json({
-                "type": "play_audio",
-                "url": audio_url,
-            })
-            return True
-        except Exception as e:
-            logger.error("play_audio_send_failed", error=str(e))
+        if outbound.closed:
+            logger.error("play_audio_send_failed", error="connection closed")
             return False
+        outbound.send_control({
+            "type": "play_audio",
+            "url": audio_url,
+        })
+        return True
     
     audio_tool = AudioPlaybackTool(play_audio_callback)
     
     # Simulated conversation state
     conversation_history = []
     
+    try:
+        await _receive_loop(websocket, session, audio_tool, conversation_history)
+    finally:
+        # Cleanup below must not be interrupted by the reaper
+        session.is_active = False
+        await session.turn_runner.aclose()
+        if session.audio_ingest is not None:
+            await session.audio_ingest.close()
+            await session.audio_ingest.consumer.aclose()
+        await outbound.aclose()
+        if session.codec is not None:
+            session.codec.close()
+        provider_lease.release()
+
+
+async def _receive_loop(
+    websocket: WebSocket,
+    session: Session,
+    audio_tool: AudioPlaybackTool,
+    conversation_history: list,
+):
+    """Read and dispatch client messages until the client stops or disconnects."""
+    framing = session.framing
     while True:
         try:
             # Receive message from client
@@ -186,12 +325,32 @@ async def handle_voice_session(websocket: WebSocket, session: Session):
             
             if message["type"] == "websocket.disconnect":
                 break
+            session.touch()
+            
+            data = None
+            if "bytes" in message and framing is not None:
+                frame = framing.receive(message["bytes"])
+                if frame.type == FRAME_AUDIO and frame.stream_id == STREAM_MIC:
+                    await process_audio_frame(
+                        session,
+                        frame.payload,
+                        audio_tool,
+                        conversation_history
+                    )
+                    if frame.flags & FLAG_END_OF_UTTERANCE:
+                        await commit_utterance(session)
+                elif frame.type == FRAME_CONTROL and frame.stream_id == STREAM_CONTROL:
+                    data = serializer.loads(bytes(frame.payload))
+                else:
+                    logger.warning("unexpected_frame_dropped",
+                                   session_id=session.session_id,
+                                   frame_type=frame.type,
+                                   stream_id=frame.stream_id)
             
             # Handle binary audio data
-            if "bytes" in message:
+            elif "bytes" in message:
                 audio_data = message["bytes"]
                 await process_audio_frame(
-                    websocket, 
                     session, 
                     audio_data,
                     audio_tool,
@@ -200,30 +359,25 @@ async def handle_voice_session(websocket: WebSocket, session: Session):
             
             # Handle JSON control messages
             elif "text" in message:
-                data = json.loads(message["text"])
-                msg_type = data.get("type")
-                
-                if msg_type == "text_input":
-                    # Handle text input for testing (simulates STT output)
-                    text = data.get("text", "")
-                    await process_text_input(
-                        websocket,
-                        session,
-                        text,
-                        audio_tool,
-                        conversation_history
-                    )
-                
-                elif msg_type == "stop":
-                    logger.info("client_requested_stop", session_id=session.session_id)
+                data = serializer.loads(message["text"])
+            
+            if data is not None:
+                if not isinstance(data, dict):
+                    logger.warning("invalid_control_message",
+                                   session_id=session.session_id,
+                                   json_type=type(data).__name__)
+                elif not await handle_control_message(
+                    session, data, audio_tool, conversation_history
+                ):
                     break
                 
-                elif msg_type == "cancel":
-                    logger.info("client_cancelled_turn", session_id=session.session_id)
-                    # Cancel current processing
-                
-        except json.JSONDecodeError:
+        except (JSONDecodeError, UnicodeDecodeError):
+            # Binary control payloads are decoded as UTF-8 first
             logger.warning("invalid_json_message", session_id=session.session_id)
+        except FrameError as e:
+            logger.warning("invalid_frame", session_id=session.session_id, error=str(e))
+        except OpusError as e:
+            logger.warning("invalid_opus_packet", session_id=session.session_id, error=str(e))
         except Exception as e:
             logger.exception("message_processing_error", 
                            session_id=session.session_id, 
@@ -231,8 +385,45 @@ async def handle_voice_session(websocket: WebSocket, session: Session):
             raise
 
 
+async def handle_control_message(
+    session: Session,
+    data: Dict,
+    audio_tool: AudioPlaybackTool,
+    conversation_history: list,
+) -> bool:
+    """Dispatch one client control message. Returns False when the client stops."""
+    msg_type = data.get("type")
+    
+    if msg_type == "text_input":
+        # Handle text input for testing (simulates STT output)
+        text = data.get("text", "")
+        if text.strip():
+            await start_turn(
+                session,
+                process_text_input(
+                    session,
+                    text,
+                    audio_tool,
+                    conversation_history
+                ),
+            )
+    
+    elif msg_type == "commit":
+        # End of utterance (push-to-talk release)
+        await commit_utterance(session)
+    
+    elif msg_type == "stop":
+        logger.info("client_requested_stop", session_id=session.session_id)
+        return False
+    
+    elif msg_type == "cancel":
+        logger.info("client_cancelled_turn", session_id=session.session_id)
+        await cancel_turn(session, "client_cancel")
+    
+    return True
+
+
 async def process_audio_frame(
-    websocket: WebSocket,
     session: Session,
     audio_data: bytes,
     audio_tool: AudioPlaybackTool,
@@ -241,22 +432,222 @@ async def process_audio_frame(
     """
     Process incoming audio frame through the voice pipeline.
     
-    In a real implementation, this would:
-    1. Buffer audio frames
-    2. Send to Soniox STT for transcription
-    3. Process transcript through Groq LLM
-    4. Generate response via ElevenLabs TTS
-    5. Stream audio back to client
+    Frames are copied into the session's preallocated ring buffer; a
+    background task drains fixed-size chunks into the STT stream, and each
+    final transcript is answered through the LLM and TTS providers.
+    
+    With VAD enabled the STT stage starts at detected speech onset and the
+    utterance is committed once the hangover of silence has passed, so the
+    client does not need to send "commit". The silence gate then forwards
+    only speech (plus padding) to the STT stream.
+    """
+    ingest = session.audio_ingest
+    if ingest is None:
+        stt_consumer = TranscriptPump(session, audio_tool, conversation_history)
+        ingest = start_audio_ingest(session, stt_consumer)
+        session.vad = create_vad()
+        session.silence_gate = create_silence_gate(session.vad)
+    
+    if session.codec is not None:
+        audio_data = session.codec.decoder.decode(audio_data)
+    elif session.audio_converter is not None:
+        audio_data = session.audio_converter.process(audio_data)
+    
+    vad = session.vad
+    if vad is None:
+        if not session.latency_tracker.stt_started:
+            session.latency_tracker.start_stt()
+        await ingest.push(audio_data)
+        return
+    
+    # Events are handled where they fall in the frame, so the audio up to
+    # an endpoint is committed before any speech that follows it
+    gate = session.silence_gate
+    steps = gate.split(audio_data) if gate is not None else vad.split(audio_data)
+    for pieces, event in steps:
+        for piece in pieces:
+            await ingest.push(piece)
+        if event is None:
+            continue
+        if event.kind == SPEECH_START:
+            session.utterance_committed = False
+            if not session.latency_tracker.stt_started:
+                session.latency_tracker.start_stt()
+        elif event.kind == SPEECH_END:
+            logger.debug("vad_endpoint", session_id=session.session_id)
+            ingest.commit()
+            session.utterance_committed = True
+
+
+async def commit_utterance(session: Session) -> None:
+    """
+    Client end-of-utterance (commit message or frame flag).
+    
+    Ignored when VAD has already committed the utterance and no speech has
+    been detected since, so the same audio doesn't produce a second turn.
+    
+    If the VAD never detected speech (e.g. a quiet push-to-talk mic), the
+    silence gate's held pre-roll is streamed instead of being dropped. With
+    no audio at all, the client gets an empty final transcript rather than
+    waiting for one that will never come.
+    """
+    if session.utterance_committed:
+        return
+    ingest = session.audio_ingest
+    gate = session.silence_gate
+    if ingest is not None and gate is not None and not gate.open:
+        held = gate.flush()
+        if held:
+            await ingest.push(held)
+    if ingest is None or not ingest.uncommitted:
+        logger.info("empty_utterance_committed", session_id=session.session_id)
+        session.outbound.send_transcript({
+            "type": "transcript",
+            "text": "",
+            "is_final": True,
+        })
+        return
+    if not session.latency_tracker.stt_started:
+        # No speech onset detected; time the STT stage from the commit
+        session.latency_tracker.start_stt()
+    ingest.commit()
+
+
+def start_audio_ingest(session: Session, consumer) -> AudioIngest:
+    """Create the session's audio ingest engine and start its consumer task."""
+    ingest = AudioIngest(
+        session.session_id,
+        chunk_ms=int(os.getenv("AUDIO_CHUNK_MS", "100")),
+        buffer_ms=int(os.getenv("AUDIO_BUFFER_MS", "2000")),
+    )
+    session.audio_ingest = ingest
+    ingest.start(consumer)
+    return ingest
+
+
+class TranscriptPump:
+    """
+    Audio chunk consumer that streams into the STT provider.
+    
+    Partial transcripts are forwarded to the client; each final transcript
+    closes the STT stage of the turn and runs the response pipeline.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        audio_tool: AudioPlaybackTool,
+        conversation_history: list,
+    ):
+        self._session = session
+        self._audio_tool = audio_tool
+        self._conversation_history = conversation_history
+        self._stt_stream = session.providers.stt.stream()
+        # AudioIngest.bytes_consumed at the previous final transcript
+        self._billed_bytes = 0
+        self._task = asyncio.create_task(self._forward_transcripts())
+
+    async def consume(self, chunk: memoryview) -> None:
+        await self._stt_stream.consume(chunk)
+
+    async def flush(self) -> None:
+        await self._stt_stream.flush()
+
+    async def aclose(self) -> None:
+        await self._stt_stream.aclose()
+        await self._task
+
+    async def _forward_transcripts(self) -> None:
+        session = self._session
+        latency_tracker = session.latency_tracker
+        first_partial = True
+        
+        async for event in self._stt_stream:
+            if not event.is_final:
+                if first_partial:
+                    latency_tracker.stt_first_result()
+                    first_partial = False
+                session.outbound.send_transcript({
+                    "type": "transcript",
+                    "text": event.text,
+                    "is_final": False,
+                })
+                continue
+            
+            if first_partial:
+                latency_tracker.stt_first_result()
+            latency_tracker.end_stt()
+            # The utterance is timed and billed on the turn that answers it,
+            # which only starts once any turn it barges in on is cancelled
+            stt_stage = latency_tracker.take_stt()
+            # Audio streamed for the utterance, without the silence that
+            # pads its last chunk
+            consumed = session.audio_ingest.bytes_consumed
+            streamed = (consumed - self._billed_bytes) / BYTES_PER_SECOND
+            self._billed_bytes = consumed
+            gate = session.silence_gate
+            raw = gate.take_turn_audio()[0] if gate is not None else streamed
+            first_partial = True
+            
+            session.outbound.send_transcript({
+                "type": "transcript",
+                "text": event.text,
+                "is_final": True,
+            })
+            await start_turn(
+                session,
+                respond_to_user(
+                    session,
+                    event.text,
+                    self._audio_tool,
+                    self._conversation_history,
+                ),
+                stt_stage=stt_stage,
+                audio_seconds=streamed,
+                raw_audio_seconds=raw,
+            )
+
+
+async def start_turn(
+    session: Session,
+    turn,
+    stt_stage: Optional[StageLatency] = None,
+    audio_seconds: float = 0.0,
+    raw_audio_seconds: Optional[float] = None,
+) -> None:
+    """
+    Run a turn as a background task so the receive loop stays responsive.
     
-    For this demo, we simulate the pipeline with mock responses.
+    A turn still in flight is treated as barged-in and cancelled first; the
+    utterance being answered (its STT stage and the audio streamed for it)
+    is then recorded on the new turn.
     """
-    # For demo: accumulate audio and simulate transcription
-    # Real implementation would stream to Soniox
-    pass
+    await cancel_turn(session, "barge_in")
+    if stt_stage is not None:
+        session.latency_tracker.attach_stt(stt_stage)
+        session.cost_tracker.add_stt_cost(audio_seconds, raw_audio_seconds=raw_audio_seconds)
+    session.turn_runner.start(turn)
+
+
+async def cancel_turn(session: Session, reason: str) -> None:
+    """Cancel the in-flight turn, if any, and tell the client to stop playback."""
+    interrupted = await session.turn_runner.cancel(reason)
+    if interrupted is None:
+        return
+    
+    # Audio from the cancelled turn that has not been written yet is stale
+    session.outbound.drop_audio()
+    
+    turn_latency, turn_cost = interrupted
+    session.outbound.send_control({
+        "type": "turn_cancelled",
+        "reason": reason,
+        "latency": turn_latency.to_dict(),
+        "cost": turn_cost.to_dict(),
+    })
 
 
 async def process_text_input(
-    websocket: WebSocket,
     session: Session,
     text: str,
     audio_tool: AudioPlaybackTool,
@@ -270,39 +661,45 @@ async def process_text_input(
     if not text.strip():
         return
     
-    cost_tracker = session.cost_tracker
     latency_tracker = session.latency_tracker
     
-    # Start tracking this turn
-    latency_tracker.start_stt()
-    
-    # Simulate STT completion (instant for text input)
-    latency_tracker.stt_first_result()
-    latency_tracker.end_stt()
-    
-    # Estimate STT cost (based on word count)
-    word_count = len(text.split())
-    audio_duration = (word_count / 150) * 60  # ~150 words/min
-    cost_tracker.add_stt_cost(audio_duration)
+    # Simulate STT completion (instant for text input; no audio is
+    # streamed, so there is no STT usage to bill)
+    latency_tracker.record_instant_stt()
     
     # Send transcript to client
-    await websocket.send_json({
+    session.outbound.send_transcript({
         "type": "transcript",
         "text": text,
         "is_final": True,
     })
     
+    await respond_to_user(session, text, audio_tool, conversation_history)
+
+
+async def respond_to_user(
+    session: Session,
+    text: str,
+    audio_tool: AudioPlaybackTool,
+    conversation_history: list,
+):
+    """
+    Run the LLM and TTS stages for a committed user utterance.
+    
+    LLM output is chunked at sentence/clause boundaries and synthesized
+    while the LLM is still generating; audio is streamed to the client as
+    binary frames as soon as it is produced.
+    """
+    providers = session.providers
+    cost_tracker = session.cost_tracker
+    latency_tracker = session.latency_tracker
+    
     # Start LLM processing
     latency_tracker.start_llm()
     
     # Build conversation context
     conversation_history.append({"role": "user", "content": text})
     
-    # Simulate LLM response (in production, call Groq API)
-    response = await simulate_llm_response(text, conversation_history)
-    
-    latency_tracker.llm_first_token()
-    
     # Check for tool calls
     if "play_audio" in text.lower() or "play sound" in text.lower():
         latency_tracker.start_tool()
@@ -311,72 +708,61 @@ async def process_text_input(
             "notification sound"
         )
         latency_tracker.end_tool()
-        response = "I've played a notification sound for you!"
-    
-    latency_tracker.end_llm()
-    
-    # Estimate LLM cost
-    input_tokens = len(text.split()) * 2  # Rough estimate
-    output_tokens = len(response.split()) * 2
-    cost_tracker.add_llm_cost(input_tokens, output_tokens)
-    
-    conversation_history.append({"role": "assistant", "content": response})
-    
-    # Start TTS
-    latency_tracker.start_tts()
-    
-    # Send response text
-    await websocket.send_json({
-        "type": "response",
-        "text": response,
-    })
-    
-    latency_tracker.tts_first_audio()
-    
-    # Estimate TTS cost
-    cost_tracker.add_tts_cost(len(response))
-    
-    # In production, we'd stream TTS audio here
-    # For demo, just simulate completion
-    await asyncio.sleep(0.1)  # Simulate TTS generation
-    
-    latency_tracker.end_tts()
+        llm_stream = static_llm_stream("I've played a notification sound for you!")
+        calls_llm = False
+    else:
+        llm_stream = providers.llm.stream(conversation_history)
+        calls_llm = True
+    
+    async def send_response_text(response: str) -> None:
+        session.outbound.send_control({
+            "type": "response",
+            "text": response,
+        })
+    
+    pipeline = TurnPipeline(
+        providers.tts,
+        latency_tracker,
+        cost_tracker,
+        send_audio=session.outbound.send_audio,
+        on_text_complete=send_response_text,
+    )
+    try:
+        await pipeline.run(llm_stream)
+    finally:
+        # Bill the LLM even when the turn is cancelled mid-generation
+        response = pipeline.text
+        
+        # Provider-reported usage; a stream cancelled before its usage
+        # chunk (or a provider without usage) is estimated from the prompt
+        if pipeline.usage is not None:
+            usage = pipeline.usage
+            cost_tracker.add_llm_cost(usage.input_tokens or 0, usage.output_tokens or 0)
+        elif calls_llm:
+            cost_tracker.add_llm_cost(
+                estimate_tokens(m["content"] for m in conversation_history),
+                estimate_tokens((response,)),
+                estimated=True,
+            )
+        
+        conversation_history.append({"role": "assistant", "content": response})
     
     # Finish turn
     turn_latency = latency_tracker.finish_turn()
     turn_cost = cost_tracker.finish_turn()
+    if turn_latency.interrupted:
+        # Detached after a cancel that outlived its deadline; the client
+        # already got turn_cancelled
+        return
     
-    # Send turn metadata to client
-    await websocket.send_json({
+    # Send turn metadata to client, after the turn's queued audio
+    session.outbound.send_media_json({
         "type": "turn_complete",
         "latency": turn_latency.to_dict(),
         "cost": turn_cost.to_dict(),
     })
 
 
-async def simulate_llm_response(text: str, history: list) -> str:
-    """
-    Simulate LLM response for demo purposes.
-    
-    In production, this calls the Groq API.
-    """
-    # Simple response simulation
-    text_lower = text.lower()
-    
-    if "hello" in text_lower or "hi" in text_lower:
-        return "Hello! I'm your voice AI assistant. How can I help you today?"
-    elif "how are you" in text_lower:
-        return "I'm doing great, thank you for asking! I'm here and ready to help."
-    elif "weather" in text_lower:
-        return "I don't have access to real-time weather data, but I'd recommend checking a weather service for the most accurate forecast."
-    elif "help" in text_lower:
-        return "I can help with various tasks! You can ask me questions, have a conversation, or ask me to play audio by saying 'play sound'."
-    elif "bye" in text_lower or "goodbye" in text_lower:
-        return "Goodbye! It was nice talking with you. Have a great day!"
-    else:
-        return f"I heard you say: '{text}'. I'm a demo voice assistant. In production, I would use Groq's LLM for intelligent responses."
-
-
 def main():
     """Run the FastAPI application."""
     import uvicorn
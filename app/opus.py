@@ -0,0 +1,337 @@
+"""
+Opus Audio Codec for /ws/talk
+
+Optional Opus transport negotiated per session with the `codec=opus` query
+parameter, cutting audio from 256 kbps of raw PCM to OPUS_BITRATE per
+direction:
+- Inbound: every binary message (or FRAME_AUDIO payload in binary framing)
+  is one Opus packet, decoded to PCM 16-bit 16 kHz mono into a reusable
+  buffer and pushed through the same VAD / ingest path as raw PCM
+- Outbound: TTS audio is encoded into OPUS_FRAME_MS packets, one per
+  message; a trailing partial frame is padded with silence when the turn's
+  audio ends
+- libopus is called through ctypes (Debian: libopus0); when it is missing,
+  sessions asking for Opus are refused and raw PCM keeps working
+
+Environment:
+- OPUS_LIBRARY:     path to libopus (default: found via ctypes.util)
+- OPUS_BITRATE:     encoder bitrate in bits/s (default 24000)
+- OPUS_COMPLEXITY:  encoder complexity 0-10 (default 5)
+- OPUS_FRAME_MS:    outbound packet duration, 10/20/40/60 (default 20)
+"""
+
+from typing import Dict, List, Optional
+import ctypes
+import ctypes.util
+import os
+
+from .audio_ingest import SAMPLE_RATE
+from .dsp import PolyphaseResampler, float32_to_pcm16, pcm16_to_float32
+
+# Opus C API constants (opus_defines.h)
+OPUS_OK = 0
+OPUS_APPLICATION_VOIP = 2048
+OPUS_SET_BITRATE_REQUEST = 4002
+OPUS_SET_COMPLEXITY_REQUEST = 4010
+
+# Sample rates the Opus encoder and decoder accept
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+# Packet buffer size libopus recommends for opus_encode (the 1275-byte
+# limit is per Opus frame; 40/60 ms packets hold several)
+MAX_PACKET_BYTES = 4000
+
+
+class OpusError(RuntimeError):
+    """Raised when libopus is unavailable or reports an error."""
+
+
+_lib: Optional[ctypes.CDLL] = None
+
+
+def _load() -> ctypes.CDLL:
+    """Load libopus and declare the functions used (once per process)."""
+    global _lib
+    if _lib is not None:
+        return _lib
+    path = os.getenv("OPUS_LIBRARY") or ctypes.util.find_library("opus")
+    if not path:
+        raise OpusError("libopus not found (install libopus0 or set OPUS_LIBRARY)")
+    try:
+        lib = ctypes.CDLL(path)
+    except OSError as e:
+        raise OpusError(f"cannot load libopus from {path}: {e}") from e
+
+    c_int, c_int32, c_void_p = ctypes.c_int, ctypes.c_int32, ctypes.c_void_p
+    pcm_p = ctypes.POINTER(ctypes.c_int16)
+    error_p = ctypes.POINTER(c_int)
+
+    lib.opus_get_version_string.restype = ctypes.c_char_p
+    lib.opus_strerror.argtypes = [c_int]
+    lib.opus_strerror.restype = ctypes.c_char_p
+
+    lib.opus_encoder_create.argtypes = [c_int32, c_int, c_int, error_p]
+    lib.opus_encoder_create.restype = c_void_p
+    lib.opus_encode.argtypes = [c_void_p, pcm_p, c_int, ctypes.c_char_p, c_int32]
+    lib.opus_encode.restype = c_int32
+    # opus_encoder_ctl is variadic: only restype is declared
+    lib.opus_encoder_ctl.restype = c_int
+    lib.opus_encoder_destroy.argtypes = [c_void_p]
+    lib.opus_encoder_destroy.restype = None
+
+    lib.opus_decoder_create.argtypes = [c_int32, c_int, error_p]
+    lib.opus_decoder_create.restype = c_void_p
+    lib.opus_decode.argtypes = [c_void_p, ctypes.c_char_p, c_int32, pcm_p, c_int, c_int]
+    lib.opus_decode.restype = c_int
+    lib.opus_decoder_destroy.argtypes = [c_void_p]
+    lib.opus_decoder_destroy.restype = None
+
+    _lib = lib
+    return lib
+
+
+def opus_available() -> bool:
+    try:
+        _load()
+    except OpusError:
+        return False
+    return True
+
+
+def opus_version() -> Optional[str]:
+    """libopus version string, or None when it is not installed."""
+    if not opus_available():
+        return None
+    return _lib.opus_get_version_string().decode()
+
+
+def _check(result: int, what: str) -> int:
+    if result < OPUS_OK:
+        raise OpusError(f"{what} failed: {_lib.opus_strerror(result).decode()}")
+    return result
+
+
+class OpusEncoder:
+    """
+    Streaming Opus encoder for PCM 16-bit mono.
+
+    Input of any length is split into fixed frames; samples short of a
+    whole frame are kept until the next call or `flush`. Input at a rate
+    Opus does not encode (e.g. 22.05 kHz TTS) is resampled to the next
+    higher Opus rate.
+
+    Usage:
+        encoder = OpusEncoder(sample_rate=24000)
+        for packet in encoder.encode(pcm_bytes):
+            send(packet)
+        for packet in encoder.flush():  # end of the audio stream
+            send(packet)
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        bitrate: Optional[int] = None,
+        complexity: Optional[int] = None,
+        frame_ms: Optional[int] = None,
+    ):
+        lib = _load()
+        self.input_rate = sample_rate
+        self._resampler: Optional[PolyphaseResampler] = None
+        if sample_rate not in OPUS_RATES:
+            rate = next((r for r in OPUS_RATES if r > sample_rate), OPUS_RATES[-1])
+            self._resampler = PolyphaseResampler(sample_rate, rate)
+            sample_rate = rate
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate or int(os.getenv("OPUS_BITRATE", "24000"))
+        frame_ms = frame_ms or int(os.getenv("OPUS_FRAME_MS", "20"))
+        complexity = complexity if complexity is not None else int(os.getenv("OPUS_COMPLEXITY", "5"))
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+
+        error = ctypes.c_int()
+        self._state = lib.opus_encoder_create(sample_rate, 1, OPUS_APPLICATION_VOIP, ctypes.byref(error))
+        _check(error.value, "opus_encoder_create")
+        state = ctypes.c_void_p(self._state)
+        _check(lib.opus_encoder_ctl(state, OPUS_SET_BITRATE_REQUEST, ctypes.c_int32(self.bitrate)),
+               "OPUS_SET_BITRATE")
+        _check(lib.opus_encoder_ctl(state, OPUS_SET_COMPLEXITY_REQUEST, ctypes.c_int32(complexity)),
+               "OPUS_SET_COMPLEXITY")
+
+        self._pcm = (ctypes.c_int16 * self.frame_samples)()
+        self._pcm_bytes = memoryview(self._pcm).cast("B")
+        self._packet = ctypes.create_string_buffer(MAX_PACKET_BYTES)
+        self._pending = bytearray()
+
+        # Counters for metrics
+        self.packets = 0
+        self.pcm_bytes = 0
+        self.packet_bytes = 0
+
+    @property
+    def pending(self) -> bool:
+        """Whether samples short of a whole frame are waiting."""
+        return bool(self._pending)
+
+    def _encode_frame(self, frame) -> bytes:
+        self._pcm_bytes[:] = frame
+        size = _check(
+            _lib.opus_encode(self._state, self._pcm, self.frame_samples, self._packet, MAX_PACKET_BYTES),
+            "opus_encode",
+        )
+        self.packets += 1
+        self.packet_bytes += size
+        return ctypes.string_at(self._packet, size)
+
+    def encode(self, pcm) -> List[bytes]:
+        """Encode PCM 16-bit mono; returns one packet per completed frame."""
+        self.pcm_bytes += len(pcm)
+        if self._resampler is not None:
+            pcm = float32_to_pcm16(self._resampler.process(pcm16_to_float32(pcm))).tobytes()
+        pending = self._pending
+        pending += pcm
+        frame_bytes = self.frame_bytes
+        count = len(pending) // frame_bytes
+        if not count:
+            return []
+        view = memoryview(pending)
+        packets = [
+            self._encode_frame(view[i * frame_bytes:(i + 1) * frame_bytes])
+            for i in range(count)
+        ]
+        view.release()
+        del pending[:count * frame_bytes]
+        return packets
+
+    def flush(self) -> List[bytes]:
+        """Encode the waiting partial frame, padded with silence."""
+        if not self._pending:
+            return []
+        self._pending += bytes(self.frame_bytes - len(self._pending))
+        packet = self._encode_frame(self._pending)
+        self._pending.clear()
+        return [packet]
+
+    def reset(self) -> None:
+        """Discard the waiting partial frame and resampler history (e.g. after barge-in)."""
+        self._pending.clear()
+        if self._resampler is not None:
+            self._resampler.reset()
+
+    def close(self) -> None:
+        if self._state:
+            _lib.opus_encoder_destroy(self._state)
+            self._state = None
+
+    def __del__(self):
+        if getattr(self, "_state", None):
+            self.close()
+
+
+class OpusDecoder:
+    """
+    Opus decoder producing PCM 16-bit 16 kHz mono.
+
+    Decoded audio is written to a buffer allocated once per decoder; the
+    returned view is valid until the next `decode`.
+
+    Usage:
+        decoder = OpusDecoder()
+        pcm = decoder.decode(packet)    # memoryview of PCM bytes
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        lib = _load()
+        self.sample_rate = sample_rate
+        # Longest Opus packet (120 ms) at the output rate
+        self.max_samples = sample_rate * 120 // 1000
+        error = ctypes.c_int()
+        self._state = lib.opus_decoder_create(sample_rate, 1, ctypes.byref(error))
+        _check(error.value, "opus_decoder_create")
+        self._pcm = (ctypes.c_int16 * self.max_samples)()
+        self._pcm_bytes = memoryview(self._pcm).cast("B")
+
+        # Counters for metrics
+        self.packets = 0
+        self.packet_bytes = 0
+        self.pcm_bytes = 0
+
+    def decode(self, packet) -> memoryview:
+        if not isinstance(packet, bytes):
+            packet = bytes(packet)
+        samples = _check(
+            _lib.opus_decode(self._state, packet, len(packet), self._pcm, self.max_samples, 0),
+            "opus_decode",
+        )
+        self.packets += 1
+        self.packet_bytes += len(packet)
+        self.pcm_bytes += samples * 2
+        return self._pcm_bytes[:samples * 2]
+
+    def close(self) -> None:
+        if self._state:
+            _lib.opus_decoder_destroy(self._state)
+            self._state = None
+
+    def __del__(self):
+        if getattr(self, "_state", None):
+            self.close()
+
+
+class OpusCodec:
+    """
+    Per-session Opus state: the inbound decoder and the outbound encoders
+    (one per audio stream, created on first use).
+
+    Usage:
+        codec = OpusCodec()
+        pcm = codec.decoder.decode(packet)
+        encoder = codec.new_encoder(tts.sample_rate)
+    """
+
+    name = "opus"
+
+    def __init__(self):
+        self.decoder = OpusDecoder()
+        self.encoders: List[OpusEncoder] = []
+
+    def new_encoder(self, sample_rate: int = SAMPLE_RATE) -> OpusEncoder:
+        encoder = OpusEncoder(sample_rate)
+        self.encoders.append(encoder)
+        return encoder
+
+    def close(self) -> None:
+        self.decoder.close()
+        for encoder in self.encoders:
+            encoder.close()
+
+    def get_stats(self) -> Dict:
+        decoder = self.decoder
+        pcm_out = sum(e.pcm_bytes for e in self.encoders)
+        packets_out = sum(e.packet_bytes for e in self.encoders)
+        return {
+            "codec": self.name,
+            "inbound": {
+                "packets": decoder.packets,
+                "bytes": decoder.packet_bytes,
+                "pcm_bytes": decoder.pcm_bytes,
+                "compression": round(decoder.pcm_bytes / decoder.packet_bytes, 1) if decoder.packet_bytes else None,
+            },
+            "outbound": {
+                "packets": sum(e.packets for e in self.encoders),
+                "bytes": packets_out,
+                "pcm_bytes": pcm_out,
+                "compression": round(pcm_out / packets_out, 1) if packets_out else None,
+            },
+        }
+
+
+def create_codec(name: Optional[str]) -> Optional[OpusCodec]:
+    """Codec for the `codec` query parameter; None for raw PCM."""
+    if name in (None, "", "pcm"):
+        return None
+    if name != "opus":
+        raise ValueError(f"unsupported codec: {name}")
+    try:
+        return OpusCodec()
+    except OpusError as e:
+        raise ValueError(str(e)) from e
@@ -0,0 +1,250 @@
+"""
+Outbound Message Queue for Voice AI Agent
+
+Decouples WebSocket sends from the rest of the session: producers enqueue
+and a single writer task drains to the socket, so a slow client never
+stalls ingestion of its own audio.
+
+Messages are sent in lane priority order:
+- control:     session/turn control messages (never dropped)
+- transcript:  transcripts; stale partials are coalesced or dropped
+- media:       TTS audio and messages ordered with it (bounded, producers wait)
+
+In the negotiated binary mode (see framing.py) every message is written as
+a framed binary message; audio carries its stream id and enqueue timestamp.
+Sessions using Opus (see opus.py) have audio encoded as it is enqueued, one
+packet per message.
+"""
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+import asyncio
+import time
+import structlog
+
+from .framing import FRAME_AUDIO, FRAME_CONTROL, STREAM_CONTROL, STREAM_TTS, BinaryFraming, now_us
+from .opus import OpusEncoder
+from .serialization import get_serializer
+
+logger = structlog.get_logger()
+
+
+class OutboundQueue:
+    """
+    Bounded per-connection outbound priority queue with a writer task.
+
+    Usage:
+        outbound = OutboundQueue(session_id)
+        outbound.start(websocket)
+        outbound.send_control({"type": "turn_cancelled"})
+        await outbound.send_audio(pcm_bytes)
+        ...
+        await outbound.aclose()
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        max_media_items: int = 64,
+        close_timeout: float = 1.0,
+        framing: Optional[BinaryFraming] = None,
+        encoder_factory: Optional[Callable[[], OpusEncoder]] = None,
+    ):
+        self.session_id = session_id
+        self.framing = framing
+        # Opus encoders per audio stream, created on first use
+        self.encoder_factory = encoder_factory
+        self._encoders: Dict[int, OpusEncoder] = {}
+        self.max_media_items = max_media_items
+        self.close_timeout = close_timeout
+
+        self._control: Deque[Dict[str, Any]] = deque()
+        self._transcripts: Deque[Dict[str, Any]] = deque()
+        # (stream_id, payload, timestamp_us); STREAM_CONTROL items are JSON
+        self._media: Deque[Tuple[int, Any, int]] = deque()
+        self._pending_partial: Optional[Dict[str, Any]] = None
+
+        self._ready = asyncio.Event()
+        self._media_space = asyncio.Event()
+        self._media_space.set()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+        serializer = get_serializer()
+        self._encode = serializer.encode_message
+        self._encode_bytes = serializer.encode_message_bytes
+
+        # Counters for metrics
+        self.messages_sent = 0
+        self.audio_bytes_sent = 0
+        self.partials_coalesced = 0
+        self.partials_dropped = 0
+        self.audio_items_dropped = 0
+        self.max_depth = 0
+        # Monotonic time of the last successful send (idle tracking)
+        self.last_sent = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be written."""
+        return len(self._control) + len(self._transcripts) + len(self._media)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def send_control(self, message: Dict[str, Any]) -> None:
+        """Enqueue a control message ahead of transcripts and audio."""
+        if self._closed:
+            return
+        self._control.append(message)
+        self._wake()
+
+    def send_transcript(self, message: Dict[str, Any]) -> None:
+        """
+        Enqueue a transcript.
+
+        A partial replaces any partial still waiting to be sent; a final
+        transcript drops the waiting partial it supersedes.
+        """
+        if self._closed:
+            return
+        pending = self._pending_partial
+        if not message.get("is_final"):
+            if pending is not None:
+                pending.clear()
+                pending.update(message)
+                self.partials_coalesced += 1
+                return
+            self._pending_partial = message
+        elif pending is not None:
+            self._transcripts.remove(pending)
+            self._pending_partial = None
+            self.partials_dropped += 1
+        self._transcripts.append(message)
+        self._wake()
+
+    async def send_audio(self, data: bytes, stream_id: int = STREAM_TTS) -> None:
+        """Enqueue audio (TTS by default), waiting while the media lane is full."""
+        while len(self._media) >= self.max_media_items and not self._closed:
+            self._media_space.clear()
+            await self._media_space.wait()
+        if self._closed:
+            return
+        timestamp_us = now_us() if self.framing else 0
+        if self.encoder_factory is None:
+            self._media.append((stream_id, data, timestamp_us))
+        else:
+            encoder = self._encoders.get(stream_id)
+            if encoder is None:
+                encoder = self._encoders[stream_id] = self.encoder_factory()
+            for packet in encoder.encode(data):
+                self._media.append((stream_id, packet, timestamp_us))
+        self._wake()
+
+    def send_media_json(self, message: Dict[str, Any]) -> None:
+        """Enqueue a JSON message that must stay ordered after queued audio."""
+        if self._closed:
+            return
+        # The message ends the audio queued before it: send partial frames
+        for stream_id, encoder in self._encoders.items():
+            for packet in encoder.flush():
+                self._media.append((stream_id, packet, now_us() if self.framing else 0))
+        self._media.append((STREAM_CONTROL, message, 0))
+        self._wake()
+
+    def drop_audio(self) -> int:
+        """Discard queued audio (e.g. after barge-in). Returns items dropped."""
+        kept = deque(item for item in self._media if item[0] == STREAM_CONTROL)
+        dropped = len(self._media) - len(kept)
+        self._media = kept
+        self.audio_items_dropped += dropped
+        for encoder in self._encoders.values():
+            encoder.reset()
+        self._media_space.set()
+        return dropped
+
+    def _wake(self) -> None:
+        depth = self.depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._ready.set()
+
+    def _next(self) -> Optional[Tuple[int, Any, int]]:
+        if self._control:
+            return STREAM_CONTROL, self._control.popleft(), 0
+        if self._transcripts:
+            message = self._transcripts.popleft()
+            if message is self._pending_partial:
+                self._pending_partial = None
+            return STREAM_CONTROL, message, 0
+        if self._media:
+            item = self._media.popleft()
+            self._media_space.set()
+            return item
+        return None
+
+    async def run(self, websocket) -> None:
+        """Write queued messages to the socket until closed and drained."""
+        framing = self.framing
+        try:
+            while True:
+                item = self._next()
+                if item is None:
+                    if self._closed:
+                        return
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                stream_id, payload, timestamp_us = item
+                if stream_id != STREAM_CONTROL:
+                    self.audio_bytes_sent += len(payload)
+                    if framing is not None:
+                        payload = framing.encode(FRAME_AUDIO, stream_id, payload, timestamp_us)
+                    await websocket.send_bytes(payload)
+                elif framing is not None:
+                    await websocket.send_bytes(framing.encode(
+                        FRAME_CONTROL, STREAM_CONTROL, self._encode_bytes(payload)
+                    ))
+                else:
+                    await websocket.send_text(self._encode(payload))
+                self.messages_sent += 1
+                self.last_sent = time.monotonic()
+        except Exception as e:
+            logger.info("outbound_writer_stopped", session_id=self.session_id, error=str(e))
+        finally:
+            self._closed = True
+            self._media_space.set()
+
+    def start(self, websocket) -> asyncio.Task:
+        """Start the writer task for `websocket`."""
+        if self._task is not None:
+            raise RuntimeError("outbound writer already started")
+        self._task = asyncio.create_task(self.run(websocket))
+        return self._task
+
+    async def aclose(self) -> None:
+        """Stop accepting messages and give the writer a bounded time to drain."""
+        self._closed = True
+        self._ready.set()
+        self._media_space.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, self.close_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("outbound_drain_timeout",
+                           session_id=self.session_id,
+                           pending=self.depth)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get queue depth and counters for metrics."""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "messages_sent": self.messages_sent,
+            "audio_bytes_sent": self.audio_bytes_sent,
+            "partials_coalesced": self.partials_coalesced,
+            "partials_dropped": self.partials_dropped,
+            "audio_items_dropped": self.audio_items_dropped,
+        }
@@ -0,0 +1,314 @@
+"""
+Streaming Turn Pipeline for Voice AI Agent
+
+Runs the response half of a turn as concurrent stages connected by bounded
+queues, so TTS starts on the first sentence while the LLM is still
+generating and audio reaches the client as soon as it is synthesized:
+
+    LLM tokens -> SentenceChunker -> [text queue] -> TTS -> [audio queue] -> send
+"""
+
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable, Coroutine, List, Optional, Set
+import asyncio
+import re
+import structlog
+
+from .cost_tracker import CostTracker
+from .latency_tracker import LatencyTracker
+from .providers import LLMChunk, TTSProvider
+
+logger = structlog.get_logger()
+
+# Sentence or clause punctuation followed by whitespace
+_BOUNDARY_RE = re.compile(r"[.!?;:,](?=\s)")
+_SENTENCE_END = ".!?"
+
+# Queue end-of-stream marker
+_DONE = None
+
+
+class SentenceChunker:
+    """
+    Splits streamed LLM text into segments suitable for TTS.
+
+    Sentence ends always cut; clause punctuation cuts once the segment is
+    long enough to sound natural. The first segment uses a lower threshold
+    to minimize time-to-first-audio. Text with no punctuation is cut at a
+    word boundary after `max_chars`.
+    """
+
+    def __init__(
+        self,
+        first_min_chars: int = 12,
+        min_clause_chars: int = 40,
+        max_chars: int = 200,
+    ):
+        self.first_min_chars = first_min_chars
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._emitted = False
+
+    def push(self, text: str) -> List[str]:
+        """Add streamed text and return any complete segments."""
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if segment:
+                segments.append(segment)
+                self._emitted = True
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text remains at the end of the stream."""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        return segment or None
+
+    def _find_cut(self) -> Optional[int]:
+        min_clause = self.min_clause_chars if self._emitted else self.first_min_chars
+        for match in _BOUNDARY_RE.finditer(self._buffer):
+            end = match.end()
+            if match.group() in _SENTENCE_END or end >= min_clause:
+                return end
+        if len(self._buffer) > self.max_chars:
+            space = self._buffer.rfind(" ", 0, self.max_chars)
+            return space if space > 0 else self.max_chars
+        return None
+
+
+class TurnPipeline:
+    """
+    Pipelined LLM -> TTS -> client stages for one turn.
+
+    Usage:
+        pipeline = TurnPipeline(providers.tts, latency_tracker, cost_tracker,
+                                send_audio=websocket.send_bytes)
+        result = await pipeline.run(providers.llm.stream(messages))
+        result.text, result.usage
+    """
+
+    def __init__(
+        self,
+        tts: TTSProvider,
+        latency_tracker: LatencyTracker,
+        cost_tracker: CostTracker,
+        send_audio: Callable[[bytes], Awaitable[None]],
+        on_text_complete: Optional[Callable[[str], Awaitable[None]]] = None,
+        text_queue_size: int = 4,
+        audio_queue_size: int = 16,
+    ):
+        self._tts = tts
+        self._latency_tracker = latency_tracker
+        self._cost_tracker = cost_tracker
+        self._send_audio = send_audio
+        self._on_text_complete = on_text_complete
+        self._text_queue: asyncio.Queue = asyncio.Queue(maxsize=text_queue_size)
+        self._audio_queue: asyncio.Queue = asyncio.Queue(maxsize=audio_queue_size)
+        self._chunker = SentenceChunker()
+
+        # Result of the LLM stage (partial if the turn is cancelled)
+        self._parts: List[str] = []
+        self.usage: Optional[LLMChunk] = None
+        self.segments_synthesized = 0
+
+    @property
+    def text(self) -> str:
+        """LLM text generated so far."""
+        return "".join(self._parts)
+
+    async def run(self, llm_stream: AsyncIterator[LLMChunk]) -> "TurnPipeline":
+        """Run all stages to completion; any stage failure cancels the rest."""
+        tasks = [
+            asyncio.create_task(self._llm_stage(llm_stream)),
+            asyncio.create_task(self._tts_stage()),
+            asyncio.create_task(self._send_stage()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self
+
+    async def _llm_stage(self, llm_stream: AsyncIterator[LLMChunk]) -> None:
+        parts = self._parts
+        try:
+            # aclosing() tears the provider stream down as soon as the
+            # stage is cancelled instead of leaving it to the GC
+            async with aclosing(llm_stream):
+                async for chunk in llm_stream:
+                    if chunk.has_usage:
+                        self.usage = chunk
+                    if not chunk.text:
+                        continue
+                    if not parts:
+                        self._latency_tracker.llm_first_token()
+                    parts.append(chunk.text)
+                    for segment in self._chunker.push(chunk.text):
+                        await self._text_queue.put(segment)
+
+            tail = self._chunker.flush()
+            if tail:
+                await self._text_queue.put(tail)
+        finally:
+            self._latency_tracker.end_llm()
+
+        if self._on_text_complete:
+            await self._on_text_complete(self.text)
+        await self._text_queue.put(_DONE)
+
+    async def _tts_stage(self) -> None:
+        while True:
+            segment = await self._text_queue.get()
+            if segment is _DONE:
+                break
+            if not self.segments_synthesized:
+                self._latency_tracker.start_tts()
+            self.segments_synthesized += 1
+            self._cost_tracker.add_tts_cost(len(segment))
+            async with aclosing(self._tts.synthesize(segment)) as audio_stream:
+                async for audio in audio_stream:
+                    await self._audio_queue.put(audio)
+        await self._audio_queue.put(_DONE)
+
+    async def _send_stage(self) -> None:
+        first_audio = True
+        while True:
+            audio = await self._audio_queue.get()
+            if audio is _DONE:
+                break
+            if first_audio:
+                self._latency_tracker.tts_first_audio()
+                first_audio = False
+            await self._send_audio(audio)
+        if self.segments_synthesized:
+            self._latency_tracker.end_tts()
+
+
+class TurnRunner:
+    """
+    Runs at most one turn at a time as a tracked task.
+
+    Cancelling (client "cancel" or barge-in) aborts LLM generation, TTS
+    synthesis and pending sends, waits up to `cancel_timeout` seconds for
+    the task to unwind, and records the partial turn in the trackers. A
+    task that is still running after the deadline is detached: the next
+    turn can start at once, and the stale task keeps recording into its
+    own turn, which is recorded as interrupted when the task exits.
+
+    Usage:
+        runner = TurnRunner(session_id, latency_tracker, cost_tracker)
+        runner.start(respond_to_user(...))
+        ...
+        interrupted = await runner.cancel("barge_in")
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        latency_tracker: LatencyTracker,
+        cost_tracker: CostTracker,
+        cancel_timeout: float = 0.2,
+    ):
+        self.session_id = session_id
+        self.cancel_timeout = cancel_timeout
+        self._latency_tracker = latency_tracker
+        self._cost_tracker = cost_tracker
+        self._task: Optional[asyncio.Task] = None
+        # Cancelled tasks still unwinding past the deadline (strong refs:
+        # the event loop only keeps weak ones)
+        self._detached: Set[asyncio.Task] = set()
+
+    @property
+    def busy(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, turn: Coroutine) -> asyncio.Task:
+        """Run `turn` in the background; the previous turn must be cancelled first."""
+        if self.busy:
+            turn.close()
+            raise RuntimeError("a turn is already running")
+        self._task = asyncio.create_task(self._run(turn))
+        return self._task
+
+    async def _run(self, turn: Coroutine) -> None:
+        # Tracker writes from this task and the pipeline stages it starts
+        # go to this turn, even once the task has been detached
+        self._latency_tracker.bind_task()
+        self._cost_tracker.bind_task()
+        try:
+            await turn
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("turn_failed", session_id=self.session_id, error=str(e))
+            if asyncio.current_task() is self._task:
+                self._record_interrupted()
+
+    async def cancel(self, reason: str = "cancel") -> Optional[tuple]:
+        """
+        Cancel the running turn, if any.
+
+        Returns the interrupted (TurnLatency, TurnCost), or None if no turn
+        was in flight. For a detached turn these are still being written
+        to until its task exits.
+        """
+        task = self._task
+        if task is None or task.done():
+            return None
+
+        task.cancel()
+        done, _ = await asyncio.wait({task}, timeout=self.cancel_timeout)
+        if done:
+            interrupted = self._record_interrupted()
+        else:
+            logger.warning("turn_cancel_deadline_exceeded",
+                           session_id=self.session_id,
+                           timeout_ms=round(self.cancel_timeout * 1000))
+            interrupted = self._detach(task)
+
+        logger.info("turn_cancelled",
+                    session_id=self.session_id,
+                    reason=reason,
+                    turn_id=interrupted[0].turn_id if interrupted else None)
+        return interrupted
+
+    async def aclose(self) -> None:
+        """Cancel any running turn when the session ends."""
+        await self.cancel("session_closed")
+
+    def _record_interrupted(self) -> Optional[tuple]:
+        turn_latency = self._latency_tracker.interrupt_turn()
+        if turn_latency is None:
+            return None
+        return turn_latency, self._cost_tracker.finish_turn(interrupted=True)
+
+    def _detach(self, task: asyncio.Task) -> tuple:
+        self._task = None
+        self._detached.add(task)
+        turn_latency = self._latency_tracker.detach_turn()
+        turn_cost = self._cost_tracker.detach_turn()
+
+        def finish(task: asyncio.Task) -> None:
+            self._detached.discard(task)
+            self._latency_tracker.finish_detached(turn_latency)
+            self._cost_tracker.finish_detached(turn_cost)
+            logger.info("detached_turn_finished",
+                        session_id=self.session_id,
+                        turn_id=turn_latency.turn_id)
+
+        task.add_done_callback(finish)
+        return turn_latency, turn_cost
+
+
+async def static_llm_stream(text: str) -> AsyncIterator[LLMChunk]:
+    """An LLM stream that yields fixed text, for scripted replies."""
+    yield LLMChunk(text=text)
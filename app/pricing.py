@@ -0,0 +1,210 @@
+"""
+Pricing Tables for Voice AI Agent
+
+Provider prices keyed by service, provider, model, tier and effective date,
+resolved once per session into integer rates so cost accounting is exact.
+
+Costs are accounted in integer nano-dollars (1 USD = 1_000_000_000). Usage
+is measured in base units: microseconds of audio, tokens, characters.
+
+A table can be loaded from JSON (PRICING_TABLE_PATH), a list of entries:
+    {"service": "llm", "provider": "groq", "model": "llama-3.3-70b-versatile",
+     "tier": "default", "effective_from": "2025-01-01",
+     "unit": "million_input_tokens", "price_usd": "0.59"}
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional
+import json
+import os
+
+NANOS_PER_DOLLAR = 1_000_000_000
+
+# Pricing unit -> (usage kind, base units per pricing unit)
+UNITS: Dict[str, tuple] = {
+    "audio_second": ("audio_us", 1_000_000),
+    "audio_minute": ("audio_us", 60_000_000),
+    "audio_hour": ("audio_us", 3_600_000_000),
+    "input_token": ("input_tokens", 1),
+    "million_input_tokens": ("input_tokens", 1_000_000),
+    "output_token": ("output_tokens", 1),
+    "million_output_tokens": ("output_tokens", 1_000_000),
+    "character": ("characters", 1),
+    "thousand_characters": ("characters", 1_000),
+    "million_characters": ("characters", 1_000_000),
+}
+
+# Built-in prices (as of 2025):
+# - Soniox STT: ~$0.12/hour = $0.002/minute
+# - Groq llama-3.3-70b-versatile: $0.59/1M input tokens, $0.79/1M output tokens
+# - ElevenLabs TTS: ~$0.24/1K characters (Pro tier)
+DEFAULT_PRICE_ENTRIES: List[Dict[str, str]] = [
+    {"service": "stt", "provider": "soniox", "model": "default", "tier": "default",
+     "effective_from": "2025-01-01", "unit": "audio_minute", "price_usd": "0.002"},
+    {"service": "llm", "provider": "groq", "model": "llama-3.3-70b-versatile", "tier": "default",
+     "effective_from": "2025-01-01", "unit": "million_input_tokens", "price_usd": "0.59"},
+    {"service": "llm", "provider": "groq", "model": "llama-3.3-70b-versatile", "tier": "default",
+     "effective_from": "2025-01-01", "unit": "million_output_tokens", "price_usd": "0.79"},
+    {"service": "tts", "provider": "elevenlabs", "model": "default", "tier": "default",
+     "effective_from": "2025-01-01", "unit": "thousand_characters", "price_usd": "0.24"},
+]
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Exact price per base unit, as a nano-dollar fraction."""
+    numerator: int
+    denominator: int
+
+    @classmethod
+    def from_price(cls, price_usd: str, unit: str) -> "Rate":
+        if unit not in UNITS:
+            raise ValueError(f"Unknown pricing unit '{unit}'")
+        per_unit = Fraction(Decimal(price_usd)) * NANOS_PER_DOLLAR / UNITS[unit][1]
+        return cls(per_unit.numerator, per_unit.denominator)
+
+    def cost_nanos(self, quantity: int) -> int:
+        """Cost of `quantity` base units, rounded half-up to a nano-dollar."""
+        return (quantity * self.numerator * 2 + self.denominator) // (2 * self.denominator)
+
+
+@dataclass(frozen=True)
+class PriceEntry:
+    service: str
+    provider: str
+    model: str
+    tier: str
+    effective_from: date
+    unit: str
+    rate: Rate
+
+    @property
+    def usage_kind(self) -> str:
+        return UNITS[self.unit][0]
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, str]) -> "PriceEntry":
+        return cls(
+            service=entry["service"],
+            provider=entry["provider"],
+            model=entry.get("model", "default"),
+            tier=entry.get("tier", "default"),
+            effective_from=date.fromisoformat(entry.get("effective_from", "1970-01-01")),
+            unit=entry["unit"],
+            rate=Rate.from_price(str(entry["price_usd"]), entry["unit"]),
+        )
+
+
+@dataclass(frozen=True)
+class SessionPricing:
+    """Rates resolved for one session; used by CostTracker."""
+    stt_per_audio_us: Rate
+    llm_per_input_token: Rate
+    llm_per_output_token: Rate
+    tts_per_character: Rate
+    tier: str = "default"
+    effective_on: Optional[date] = None
+
+
+class PricingTable:
+    """
+    Price lookup by (service, provider, model, tier) as of a date.
+
+    Resolution picks the entry with the latest effective_from on or before
+    the date, falling back from the exact model to "default" and from the
+    requested tier to "default".
+
+    Usage:
+        table = PricingTable.from_env()
+        pricing = table.resolve_session(tier="enterprise")
+        tracker = CostTracker(session_id, pricing=pricing)
+    """
+
+    def __init__(self, entries: Iterable[PriceEntry]):
+        self._entries: Dict[tuple, List[PriceEntry]] = {}
+        for entry in entries:
+            key = (entry.service, entry.provider, entry.model, entry.tier, entry.usage_kind)
+            self._entries.setdefault(key, []).append(entry)
+        for versions in self._entries.values():
+            versions.sort(key=lambda e: e.effective_from)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, str]]) -> "PricingTable":
+        return cls(PriceEntry.from_dict(e) for e in entries)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PricingTable":
+        with open(path) as f:
+            return cls.from_entries(json.load(f))
+
+    @classmethod
+    def from_env(cls) -> "PricingTable":
+        """Load PRICING_TABLE_PATH if set, otherwise the built-in prices."""
+        path = os.getenv("PRICING_TABLE_PATH")
+        if path:
+            return cls.from_file(path)
+        return cls.from_entries(DEFAULT_PRICE_ENTRIES)
+
+    def resolve(
+        self,
+        service: str,
+        provider: str,
+        usage_kind: str,
+        model: str = "default",
+        tier: str = "default",
+        on: Optional[date] = None,
+    ) -> Rate:
+        """Find the rate in effect on `on` (default: today, UTC)."""
+        on = on or datetime.now(timezone.utc).date()
+        for candidate_model in dict.fromkeys((model, "default")):
+            for candidate_tier in dict.fromkeys((tier, "default")):
+                versions = self._entries.get(
+                    (service, provider, candidate_model, candidate_tier, usage_kind), []
+                )
+                effective = [e for e in versions if e.effective_from <= on]
+                if effective:
+                    return effective[-1].rate
+        raise KeyError(
+            f"No {service} price for {provider}/{model} tier={tier} ({usage_kind}) on {on}"
+        )
+
+    def resolve_session(
+        self,
+        stt_provider: str = "soniox",
+        stt_model: str = "default",
+        llm_provider: str = "groq",
+        llm_model: str = "llama-3.3-70b-versatile",
+        tts_provider: str = "elevenlabs",
+        tts_model: str = "default",
+        tier: Optional[str] = None,
+        on: Optional[date] = None,
+    ) -> SessionPricing:
+        """Resolve every rate a session needs, once, at session start."""
+        tier = tier or os.getenv("PRICING_TIER", "default")
+        on = on or datetime.now(timezone.utc).date()
+        return SessionPricing(
+            stt_per_audio_us=self.resolve("stt", stt_provider, "audio_us", stt_model, tier, on),
+            llm_per_input_token=self.resolve("llm", llm_provider, "input_tokens", llm_model, tier, on),
+            llm_per_output_token=self.resolve("llm", llm_provider, "output_tokens", llm_model, tier, on),
+            tts_per_character=self.resolve("tts", tts_provider, "characters", tts_model, tier, on),
+            tier=tier,
+            effective_on=on,
+        )
+
+
+_pricing_table: Optional[PricingTable] = None
+
+
+def get_pricing_table() -> PricingTable:
+    """Get the process-wide pricing table, loading it on first use."""
+    global _pricing_table
+    if _pricing_table is None:
+        _pricing_table = PricingTable.from_env()
+    return _pricing_table
+
+
+def nanos_to_dollars(nanos: int) -> float:
+    return nanos / NANOS_PER_DOLLAR
@@ -0,0 +1,283 @@
+"""
+Prometheus Metrics for Voice AI Agent
+
+Counters, gauges and histograms updated when events happen (session
+created/removed, turn finished), rendered in the Prometheus text exposition
+format (0.0.4). A scrape costs O(metric series), independent of how many
+sessions or turns exist.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .pricing import NANOS_PER_DOLLAR
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, dense around the 2s end-to-end target
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 2.5, 3.0, 5.0, 10.0)
+SESSION_DURATION_BUCKETS = (10, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._label_strings: Dict[Tuple[str, ...], str] = {}
+
+    def _labels(self, labelvalues: Tuple[str, ...], extra: str = "") -> str:
+        """Render {a="x",b="y"}; cached per label set since sets are few."""
+        rendered = self._label_strings.get(labelvalues)
+        if rendered is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            rendered = ",".join(
+                f'{name}="{_escape(str(value))}"'
+                for name, value in zip(self.labelnames, labelvalues)
+            )
+            self._label_strings[labelvalues] = rendered
+        if extra:
+            rendered = f"{rendered},{extra}" if rendered else extra
+        return "{" + rendered + "}" if rendered else ""
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter. Values are divided by `divisor` on render, so integer
+    units (e.g. nano-dollars) accumulate exactly and export in base units.
+    """
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), divisor: int = 1):
+        super().__init__(name, documentation, labelnames)
+        self.divisor = divisor
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0) / self.divisor
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in self._values.items():
+            if self.divisor != 1:
+                value /= self.divisor
+            lines.append(f"{self.name}{self._labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        self._values[labels] = value
+
+    def inc(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self.inc(-amount, labels)
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{self._labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; buckets are rendered cumulatively."""
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Iterable[float],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self._bounds, counts):
+                cumulative += bucket_count
+                le = 'le="' + bound + '"'
+                lines.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {count}")
+        return lines
+
+
+class VoiceMetrics:
+    """
+    Process-wide Prometheus metrics for voice sessions.
+
+    Usage:
+        voice_metrics.session_created()
+        voice_metrics.observe_turn_latency(turn_latency)
+        voice_metrics.observe_turn_cost(turn_cost)
+        text = voice_metrics.render()
+
+    With `attach_shared(slot)` every event is also published to this
+    worker's SharedMetricsSlot, so other workers can report server totals.
+    """
+
+    def __init__(self):
+        self.sessions_created = Counter(
+            "voice_sessions_created_total", "Voice sessions created.")
+        self.sessions_active = Gauge(
+            "voice_sessions_active", "Voice sessions currently open.")
+        self.sessions_rejected = Counter(
+            "voice_sessions_rejected_total", "Voice sessions rejected at capacity.")
+        self.sessions_expired = Counter(
+            "voice_sessions_expired_total", "Voice sessions closed by timeout.", ("reason",))
+        self.session_duration = Histogram(
+            "voice_session_duration_seconds", "Duration of finished voice sessions.",
+            SESSION_DURATION_BUCKETS)
+        self.turns = Counter(
+            "voice_turns_total", "Completed conversation turns.", ("interrupted",))
+        self.end_to_end_latency = Histogram(
+            "voice_end_to_end_latency_seconds",
+            "Time from start of user speech to first TTS audio.", LATENCY_BUCKETS)
+        self.stage_duration = Histogram(
+            "voice_stage_duration_seconds", "Duration of each pipeline stage.",
+            LATENCY_BUCKETS, ("stage",))
+        self.cost = Counter(
+            "voice_cost_dollars_total", "Estimated provider spend.", ("service",),
+            divisor=NANOS_PER_DOLLAR)
+        self.stt_audio = Counter(
+            "voice_stt_audio_seconds_total",
+            "Inbound audio before (raw) and after (streamed) silence gating.", ("stream",),
+            divisor=1_000_000)
+        self.llm_tokens = Counter(
+            "voice_llm_tokens_total", "LLM tokens billed.", ("direction",))
+        self.tts_characters = Counter(
+            "voice_tts_characters_total", "Characters sent for synthesis.")
+        self._metrics: List[_Metric] = [
+            self.sessions_created,
+            self.sessions_active,
+            self.sessions_rejected,
+            self.sessions_expired,
+            self.session_duration,
+            self.turns,
+            self.end_to_end_latency,
+            self.stage_duration,
+            self.cost,
+            self.stt_audio,
+            self.llm_tokens,
+            self.tts_characters,
+        ]
+        self.shared = None
+
+    def attach_shared(self, slot) -> None:
+        """Also publish events to a shared-memory slot (None to detach)."""
+        self.shared = slot
+
+    def session_created(self) -> None:
+        self.sessions_created.inc()
+        self.sessions_active.inc()
+        if self.shared is not None:
+            self.shared.session_created()
+
+    def session_removed(self, duration_seconds: float) -> None:
+        self.sessions_active.dec()
+        self.session_duration.observe(duration_seconds)
+        if self.shared is not None:
+            self.shared.session_removed()
+
+    def session_rejected(self) -> None:
+        self.sessions_rejected.inc()
+
+    def session_expired(self, reason: str) -> None:
+        self.sessions_expired.inc(labels=(reason,))
+
+    def observe_turn_latency(self, turn) -> None:
+        """Record a finished TurnLatency."""
+        self.turns.inc(labels=("true" if turn.interrupted else "false",))
+        end_to_end = turn.end_to_end_latency
+        if end_to_end is not None:
+            self.end_to_end_latency.observe(end_to_end / 1000)
+        for stage in turn.stages:
+            duration = stage.total_duration
+            if duration is not None:
+                self.stage_duration.observe(duration / 1000, (stage.stage,))
+        if self.shared is not None:
+            self.shared.observe_turn_latency(turn)
+
+    def observe_turn_cost(self, turn) -> None:
+        """Record a finished TurnCost (integer nano-dollars)."""
+        if turn.stt_nanos:
+            self.cost.inc(turn.stt_nanos, ("stt",))
+        if turn.llm_nanos:
+            self.cost.inc(turn.llm_nanos, ("llm",))
+        if turn.tts_nanos:
+            self.cost.inc(turn.tts_nanos, ("tts",))
+        usage = turn.usage
+        if usage.raw_audio_us:
+            self.stt_audio.inc(usage.raw_audio_us, ("raw",))
+            self.stt_audio.inc(usage.stt_audio_us, ("streamed",))
+        if usage.llm_input_tokens or usage.llm_output_tokens:
+            self.llm_tokens.inc(usage.llm_input_tokens, ("input",))
+            self.llm_tokens.inc(usage.llm_output_tokens, ("output",))
+        if usage.tts_characters:
+            self.tts_characters.inc(usage.tts_characters)
+        if self.shared is not None:
+            self.shared.observe_turn_cost(turn)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics instance
+voice_metrics = VoiceMetrics()
@@ -0,0 +1,128 @@
+"""
+Provider Pool for Voice AI Agent
+
+Process-wide cache of provider sets so sessions borrow providers instead of
+constructing them:
+- Models (Silero VAD) are loaded once per process
+- Provider clients, and the HTTP connection pools behind them, are shared
+- Leases are reference-counted so a backend is never unloaded while in use
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+import os
+import time
+import structlog
+
+from .providers import ProviderSet, create_providers
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class _PoolEntry:
+    providers: ProviderSet
+    load_ms: float
+    leases: int = 0
+    total_leases: int = 0
+    loaded_at: float = field(default_factory=time.time)
+
+
+class ProviderLease:
+    """A borrowed reference to a pooled ProviderSet. Release exactly once."""
+
+    def __init__(self, pool: "ProviderPool", backend: str, providers: ProviderSet):
+        self._pool = pool
+        self.backend = backend
+        self.providers = providers
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool._release(self.backend)
+
+    def __enter__(self) -> ProviderSet:
+        return self.providers
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class ProviderPool:
+    """
+    Loads each provider backend once and hands out reference-counted leases.
+
+    Usage:
+        provider_pool.load("livekit")         # at startup / worker prewarm
+        lease = provider_pool.acquire("livekit")
+        agent = VoiceAgent(..., providers=lease.providers)
+        ...
+        lease.release()
+    """
+
+    def __init__(self, factory: Callable[[str], ProviderSet] = create_providers):
+        self._factory = factory
+        self._entries: Dict[str, _PoolEntry] = {}
+
+    @staticmethod
+    def default_backend() -> str:
+        return os.getenv("VOICE_PROVIDERS", "fake")
+
+    def load(self, backend: Optional[str] = None) -> ProviderSet:
+        """Load a backend if it is not loaded yet and return its providers."""
+        backend = backend or self.default_backend()
+        entry = self._entries.get(backend)
+        if entry is None:
+            start = time.perf_counter()
+            providers = self._factory(backend)
+            load_ms = (time.perf_counter() - start) * 1000
+            entry = self._entries[backend] = _PoolEntry(providers, load_ms)
+            logger.info("provider_pool_loaded", backend=backend, load_ms=round(load_ms, 2))
+        return entry.providers
+
+    def acquire(self, backend: Optional[str] = None) -> ProviderLease:
+        """Borrow the providers for `backend`, loading them on first use."""
+        backend = backend or self.default_backend()
+        providers = self.load(backend)
+        entry = self._entries[backend]
+        entry.leases += 1
+        entry.total_leases += 1
+        return ProviderLease(self, backend, providers)
+
+    def _release(self, backend: str) -> None:
+        entry = self._entries.get(backend)
+        if entry is None or entry.leases == 0:
+            logger.warning("provider_pool_release_unbalanced", backend=backend)
+            return
+        entry.leases -= 1
+
+    def unload(self, backend: str) -> bool:
+        """Drop a backend's providers. Refused while any lease is outstanding."""
+        entry = self._entries.get(backend)
+        if entry is None:
+            return False
+        if entry.leases:
+            logger.warning("provider_pool_unload_refused", backend=backend, leases=entry.leases)
+            return False
+        del self._entries[backend]
+        logger.info("provider_pool_unloaded", backend=backend)
+        return True
+
+    def is_loaded(self, backend: str) -> bool:
+        return backend in self._entries
+
+    def get_stats(self) -> Dict:
+        """Get load times and lease counts per backend."""
+        return {
+            backend: {
+                "load_ms": round(entry.load_ms, 2),
+                "active_leases": entry.leases,
+                "total_leases": entry.total_leases,
+            }
+            for backend, entry in self._entries.items()
+        }
+
+
+# Global provider pool instance
+provider_pool = ProviderPool()
@@ -0,0 +1,131 @@
+"""
+Provider Interfaces for Voice AI Agent
+
+Defines the async protocol shared by the WebSocket pipeline and VoiceAgent:
+- STTProvider: streaming speech-to-text over fixed-size PCM chunks
+- LLMProvider: streaming token generation with provider-reported usage
+- TTSProvider: chunked audio synthesis
+
+Backends are selected by name ("livekit" for Soniox/Groq/ElevenLabs,
+"fake" for deterministic local stand-ins used in load tests).
+"""
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol
+import os
+
+
+@dataclass
+class TranscriptEvent:
+    """A partial or final transcript produced by an STT stream."""
+    text: str
+    is_final: bool
+
+
+@dataclass
+class LLMChunk:
+    """
+    A piece of streamed LLM output.
+
+    Token usage is reported by the provider on (usually) the last chunk;
+    it is None on chunks that only carry text.
+    """
+    text: str = ""
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+    @property
+    def has_usage(self) -> bool:
+        return self.input_tokens is not None or self.output_tokens is not None
+
+
+class STTStream(Protocol):
+    """
+    One streaming recognition session.
+
+    Implements the AudioChunkConsumer protocol so it can be driven directly
+    by AudioIngest, and yields TranscriptEvents when iterated.
+    """
+
+    async def consume(self, chunk: memoryview) -> None:
+        ...
+
+    async def flush(self) -> None:
+        ...
+
+    def __aiter__(self) -> AsyncIterator[TranscriptEvent]:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class STTProvider(Protocol):
+    name: str
+
+    def stream(self) -> STTStream:
+        ...
+
+
+class LLMProvider(Protocol):
+    name: str
+    model: str
+
+    def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[LLMChunk]:
+        ...
+
+
+class TTSProvider(Protocol):
+    name: str
+    sample_rate: int
+
+    def synthesize(self, text: str) -> AsyncIterator[bytes]:
+        ...
+
+
+@dataclass
+class ProviderSet:
+    """The STT/LLM/TTS (and optional VAD) providers used by a session."""
+    backend: str
+    stt: STTProvider
+    llm: LLMProvider
+    tts: TTSProvider
+    vad: Optional[Any] = None
+
+    def livekit_plugins(self) -> tuple:
+        """
+        Return the underlying LiveKit plugin objects (stt, llm, tts, vad).
+
+        AgentSession only accepts LiveKit plugins, so this is only available
+        for the "livekit" backend.
+        """
+        plugins = tuple(getattr(p, "plugin", None) for p in (self.stt, self.llm, self.tts))
+        if any(p is None for p in plugins):
+            raise RuntimeError(
+                f"provider backend '{self.backend}' cannot drive a LiveKit AgentSession"
+            )
+        return plugins + (self.vad,)
+
+
+PROVIDER_BACKENDS = ("livekit", "fake")
+
+
+def create_providers(backend: Optional[str] = None) -> ProviderSet:
+    """
+    Create a provider set for the given backend.
+
+    Args:
+        backend: "livekit" or "fake"; defaults to the VOICE_PROVIDERS env var
+    """
+    backend = backend or os.getenv("VOICE_PROVIDERS", "fake")
+
+    if backend == "fake":
+        from .fake_providers import create_fake_providers
+        return create_fake_providers()
+    if backend == "livekit":
+        from .livekit_providers import create_livekit_providers
+        return create_livekit_providers()
+
+    raise ValueError(
+        f"Unknown provider backend '{backend}', expected one of {PROVIDER_BACKENDS}"
+    )
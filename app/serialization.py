@@ -0,0 +1,140 @@
+"""
+JSON Serialization for Voice AI Agent
+
+One place for encoding WebSocket messages and HTTP responses:
+- orjson when installed (bytes out, several times faster than json.dumps),
+  with a stdlib fallback producing identical compact output
+- Precompiled shapes for hot outbound messages (transcript partials and
+  finals): constant parts are prebuilt and only the variable fields are
+  encoded
+- JSONBytesResponse skips FastAPI's jsonable_encoder pass for plain dicts
+
+Environment:
+- JSON_SERIALIZER: "auto" (default), "orjson" or "json"
+"""
+
+from json.encoder import encode_basestring
+from typing import Any, Callable, Dict, Optional, Union
+import json
+import os
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Raised by loads() for malformed input (orjson's error subclasses it)
+JSONDecodeError = json.JSONDecodeError
+
+# Built once: json.dumps() with non-default options creates an encoder per call
+_compact_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+class Serializer:
+    """
+    Encodes messages to compact JSON.
+
+    Usage:
+        serializer = get_serializer()
+        payload = serializer.dumps({"type": "session_start"})   # bytes
+        text = serializer.encode_message(message)                # str, for text frames
+        data = serializer.encode_message_bytes(message)          # bytes, for binary frames
+        data = serializer.loads(frame_text)
+    """
+
+    name = "json"
+    dumps_str: Callable[[Any], str] = staticmethod(_compact_encoder.encode)
+    loads: Callable[[Union[str, bytes]], Any] = staticmethod(json.loads)
+
+    def __init__(self):
+        # Message "type" -> encoder returning the JSON text. Messages with
+        # nested payloads (turn_complete) are not listed: splicing their
+        # parts measured no faster than encoding them whole.
+        self._shapes: Dict[str, Callable[[Dict[str, Any]], str]] = {
+            "transcript": self._encode_transcript,
+        }
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.dumps_str(obj).encode()
+
+    def encode_message(self, message: Dict[str, Any]) -> str:
+        """Encode an outbound WebSocket message, using a precompiled shape if one fits."""
+        shape = self._shape(message)
+        if shape is not None:
+            return shape(message)
+        return self.dumps_str(message)
+
+    def encode_message_bytes(self, message: Dict[str, Any]) -> bytes:
+        """Like encode_message(), but UTF-8 bytes; with orjson, no str round-trip."""
+        shape = self._shape(message)
+        if shape is not None:
+            return shape(message).encode()
+        return self.dumps(message)
+
+    def _shape(self, message: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], str]]:
+        shape = self._shapes.get(message.get("type"))
+        if shape is not None and len(message) == _SHAPE_FIELDS[message["type"]]:
+            return shape
+        return None
+
+    def _encode_transcript(self, message: Dict[str, Any]) -> str:
+        return (
+            '{"type":"transcript","text":'
+            + encode_basestring(message["text"])
+            + (',"is_final":true}' if message["is_final"] else ',"is_final":false}')
+        )
+
+
+# Field count of each precompiled shape; other messages of that type
+# (e.g. with extra fields) take the generic path
+_SHAPE_FIELDS = {"transcript": 3}
+
+
+class OrjsonSerializer(Serializer):
+    """Serializer backed by orjson (only constructed when it is installed)."""
+
+    name = "orjson"
+
+    def __init__(self):
+        super().__init__()
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+    def dumps_str(self, obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+
+def create_serializer(name: Optional[str] = None) -> Serializer:
+    """Create the serializer named by `name` or JSON_SERIALIZER."""
+    name = (name or os.getenv("JSON_SERIALIZER", "auto")).lower()
+    if name == "json":
+        return Serializer()
+    if name in ("auto", "orjson"):
+        if orjson is not None:
+            return OrjsonSerializer()
+        if name == "orjson":
+            raise ImportError("JSON_SERIALIZER=orjson but orjson is not installed")
+        return Serializer()
+    raise ValueError(f"unknown JSON serializer: {name}")
+
+
+_serializer: Optional[Serializer] = None
+
+
+def get_serializer() -> Serializer:
+    """Get the process-wide serializer (created on first use)."""
+    global _serializer
+    if _serializer is None:
+        _serializer = create_serializer()
+    return _serializer
+
+
+class JSONBytesResponse(Response):
+    """JSON response rendered with the process serializer."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return get_serializer().dumps(content)
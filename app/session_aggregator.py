@@ -0,0 +1,312 @@
+"""
+Finished Session Aggregator for Voice AI Agent
+
+Process-wide totals for aggregate metrics, maintained at event time so
+reads don't revisit sessions:
+- TurnAggregate: turn counts, cost, usage and latency histograms over every
+  finished turn, fed by the session trackers as each turn is recorded
+- FinishedSessionAggregator: folds each removed session, histograms
+  included, into lifetime totals so aggregate metrics keep counting
+  sessions after they end (O(histogram buckets) per session)
+- Time-windowed throughput, spend and latency over the last 1m / 5m / 1h,
+  from a ring of fixed-width buckets fed per turn as it finishes, so a
+  long call is spread over the windows it ran in
+- Optional append-only JSONL log of finished session summaries
+  (SESSION_LOG_PATH), opened on first use and written by a background
+  thread; at most SESSION_LOG_QUEUE_SIZE summaries wait to be written
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, TextIO
+import os
+import time
+import structlog
+
+from .cost_tracker import new_turn_cost_stats, turn_cost_summary
+from .latency_tracker import STAGES
+from .logging_config import LogQueue, LogWriter
+from .pricing import nanos_to_dollars
+from .serialization import get_serializer
+from .stats import RollingStats
+from .usage import Usage
+
+logger = structlog.get_logger()
+
+# Reported windows, in seconds
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+_BUCKET_SECONDS = 10
+
+# Session summaries waiting for the log writer thread
+_LOG_QUEUE_SIZE = int(os.getenv("SESSION_LOG_QUEUE_SIZE", "10000"))
+
+
+class TurnAggregate:
+    """
+    Running totals over finished turns, across sessions.
+
+    Passed to each session's trackers, which report every turn they record,
+    so aggregate metrics need no per-session work at read time. Aggregates
+    are mergeable (e.g. per registry shard into a total). Turns are also
+    passed on to `windows`, if given, for the time-windowed totals.
+
+    Usage:
+        aggregate = TurnAggregate(windows=finished_sessions)
+        latency_tracker = LatencyTracker(session_id, aggregate=aggregate)
+        cost_tracker = CostTracker(session_id, aggregate=aggregate)
+        aggregate.total_nanos, aggregate.end_to_end.quantile(0.95)
+    """
+
+    __slots__ = (
+        "turns",
+        "interrupted_turns",
+        "stt_nanos",
+        "llm_nanos",
+        "tts_nanos",
+        "usage",
+        "end_to_end",
+        "stages",
+        "windows",
+    )
+
+    def __init__(self, windows: Optional["FinishedSessionAggregator"] = None):
+        self.turns = 0
+        self.interrupted_turns = 0
+        self.stt_nanos = 0
+        self.llm_nanos = 0
+        self.tts_nanos = 0
+        self.usage = Usage()
+        self.end_to_end = RollingStats()
+        self.stages: Dict[str, RollingStats] = {stage: RollingStats() for stage in STAGES}
+        self.windows = windows
+
+    @property
+    def total_nanos(self) -> int:
+        return self.stt_nanos + self.llm_nanos + self.tts_nanos
+
+    def observe_turn_latency(self, turn) -> None:
+        self.turns += 1
+        if turn.interrupted:
+            self.interrupted_turns += 1
+        end_to_end = turn.end_to_end_latency
+        if end_to_end is not None:
+            self.end_to_end.add(end_to_end)
+        for stage in turn.stages:
+            duration = stage.total_duration
+            if duration is not None:
+                self.stages[stage.stage].add(duration)
+        if self.windows is not None:
+            self.windows.observe_turn_latency(turn)
+
+    def observe_turn_cost(self, turn, finished: bool = True) -> None:
+        """Add a TurnCost's spend (a finished turn, or one left open by a removed session)."""
+        self.stt_nanos += turn.stt_nanos
+        self.llm_nanos += turn.llm_nanos
+        self.tts_nanos += turn.tts_nanos
+        self.usage.add(turn.usage)
+        if self.windows is not None:
+            self.windows.observe_turn_cost(turn, finished)
+
+    def merge(self, other: "TurnAggregate") -> None:
+        self.turns += other.turns
+        self.interrupted_turns += other.interrupted_turns
+        self.stt_nanos += other.stt_nanos
+        self.llm_nanos += other.llm_nanos
+        self.tts_nanos += other.tts_nanos
+        self.usage.add(other.usage)
+        self.end_to_end.merge(other.end_to_end)
+        for stage, stats in other.stages.items():
+            self.stages[stage].merge(stats)
+
+
+@dataclass(slots=True)
+class _WindowBucket:
+    epoch: int = -1  # bucket start // _BUCKET_SECONDS
+    sessions: int = 0
+    turns: int = 0
+    interrupted_turns: int = 0
+    cost_nanos: int = 0
+    end_to_end: RollingStats = field(default_factory=RollingStats)
+    turn_cost: RollingStats = field(default_factory=new_turn_cost_stats)
+
+
+class FinishedSessionAggregator:
+    """
+    Lifetime totals over finished sessions, and windowed totals over
+    recent turns and session ends.
+
+    Usage:
+        aggregate = TurnAggregate(windows=finished_sessions)   # feeds turns
+        finished_sessions.fold(session)          # when a session is removed
+        finished_sessions.get_summary()
+    """
+
+    def __init__(self, log_path: Optional[str] = None):
+        self.sessions = 0
+        self.turns = 0
+        self.interrupted_turns = 0
+        self.stt_nanos = 0
+        self.llm_nanos = 0
+        self.tts_nanos = 0
+        self.usage = Usage()
+        self.duration_seconds = 0.0
+        self.end_to_end = RollingStats()
+        self.stages: Dict[str, RollingStats] = {stage: RollingStats() for stage in STAGES}
+        self.turn_cost = new_turn_cost_stats()
+
+        self._buckets: List[_WindowBucket] = [
+            _WindowBucket() for _ in range(max(WINDOWS.values()) // _BUCKET_SECONDS)
+        ]
+
+        self._log_path = log_path if log_path is not None else os.getenv("SESSION_LOG_PATH")
+        self._log: Optional[TextIO] = None
+        self._log_writer: Optional[LogWriter] = None
+
+    @property
+    def total_nanos(self) -> int:
+        return self.stt_nanos + self.llm_nanos + self.tts_nanos
+
+    def observe_turn_latency(self, turn, now: Optional[float] = None) -> None:
+        """Count a finished TurnLatency in the current window bucket."""
+        bucket = self._bucket(time.time() if now is None else now)
+        bucket.turns += 1
+        if turn.interrupted:
+            bucket.interrupted_turns += 1
+        end_to_end = turn.end_to_end_latency
+        if end_to_end is not None:
+            bucket.end_to_end.add(end_to_end)
+
+    def observe_turn_cost(self, turn, finished: bool = True, now: Optional[float] = None) -> None:
+        """Add a TurnCost's spend to the current window bucket."""
+        bucket = self._bucket(time.time() if now is None else now)
+        bucket.cost_nanos += turn.total_nanos
+        if finished:
+            bucket.turn_cost.add(turn.total_nanos)
+
+    def fold(self, session, now: Optional[float] = None) -> None:
+        """Add a finished session's totals (its turns are already windowed)."""
+        now = time.time() if now is None else now
+        cost = session.cost_tracker
+        latency = session.latency_tracker
+        duration = (datetime.utcnow() - session.created_at).total_seconds()
+
+        self.sessions += 1
+        self.turns += latency.turn_count
+        self.interrupted_turns += latency.interrupted_turn_count
+        self.stt_nanos += cost.total_stt_nanos
+        self.llm_nanos += cost.total_llm_nanos
+        self.tts_nanos += cost.total_tts_nanos
+        self.usage.add(cost.ledger.total)
+        self.duration_seconds += duration
+        self.end_to_end.merge(latency.end_to_end_stats)
+        for stage, stats in latency.stage_stats.items():
+            self.stages[stage].merge(stats)
+        self.turn_cost.merge(cost.turn_cost_stats)
+
+        self._bucket(now).sessions += 1
+
+        if self._log_path:
+            self._write_log(session, now, duration)
+
+    def _bucket(self, now: float) -> _WindowBucket:
+        epoch = int(now) // _BUCKET_SECONDS
+        index = epoch % len(self._buckets)
+        bucket = self._buckets[index]
+        if bucket.epoch != epoch:
+            # Replace a bucket that has aged out of every window
+            bucket = self._buckets[index] = _WindowBucket(epoch)
+        return bucket
+
+    def window(self, seconds: int, now: Optional[float] = None) -> Dict:
+        """Totals for turns and session ends in the last `seconds`."""
+        now = time.time() if now is None else now
+        current = int(now) // _BUCKET_SECONDS
+        oldest = current - seconds // _BUCKET_SECONDS + 1
+        sessions = turns = interrupted = cost_nanos = 0
+        end_to_end = RollingStats()
+        turn_cost = new_turn_cost_stats()
+        for bucket in self._buckets:
+            if oldest <= bucket.epoch <= current:
+                sessions += bucket.sessions
+                turns += bucket.turns
+                interrupted += bucket.interrupted_turns
+                cost_nanos += bucket.cost_nanos
+                end_to_end.merge(bucket.end_to_end)
+                turn_cost.merge(bucket.turn_cost)
+        return {
+            "sessions": sessions,
+            "turns": turns,
+            "interrupted_turns": interrupted,
+            "cost": round(nanos_to_dollars(cost_nanos), 6),
+            "turns_per_minute": round(turns * 60 / seconds, 2),
+            "end_to_end_ms": end_to_end.to_dict(),
+            "per_turn_cost": turn_cost_summary(turn_cost),
+        }
+
+    def _open_log(self) -> bool:
+        try:
+            self._log = open(self._log_path, "a")
+        except OSError as e:
+            logger.warning("session_log_open_failed", path=self._log_path, error=str(e))
+            self._log_path = None
+            return False
+        self._log_writer = LogWriter(LogQueue(_LOG_QUEUE_SIZE), self._log, name="session-log-writer")
+        self._log_writer.start()
+        return True
+
+    def _write_log(self, session, now: float, duration: float) -> None:
+        if self._log_writer is None and not self._open_log():
+            return
+        cost = session.cost_tracker
+        latency = session.latency_tracker
+        end_to_end = latency.end_to_end_stats
+        record = {
+            "session_id": session.session_id,
+            "ended_at": round(now, 3),
+            "duration_s": round(duration, 3),
+            "turns": latency.turn_count,
+            "interrupted": latency.interrupted_turn_count,
+            "cost_nanos": [cost.total_stt_nanos, cost.total_llm_nanos, cost.total_tts_nanos],
+            "usage": cost.ledger.total.to_dict(),
+            "e2e_ms_mean": round(end_to_end.mean, 2) if end_to_end.count else None,
+            "e2e_ms_p95": round(end_to_end.quantile(0.95), 2) if end_to_end.count else None,
+        }
+        # Rendered here (a small dict), written by the writer thread
+        self._log_writer.queue.put(get_serializer().dumps_str(record))
+
+    def close(self) -> None:
+        """Write any queued session summaries and close the log."""
+        if self._log_writer is not None:
+            self._log_writer.stop()
+            self._log_writer = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def get_summary(self, now: Optional[float] = None) -> Dict:
+        """Lifetime totals for finished sessions, and windowed totals."""
+        return {
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "interrupted_turns": self.interrupted_turns,
+            "cost": {
+                "stt": round(nanos_to_dollars(self.stt_nanos), 6),
+                "llm": round(nanos_to_dollars(self.llm_nanos), 6),
+                "tts": round(nanos_to_dollars(self.tts_nanos), 6),
+                "total": round(nanos_to_dollars(self.total_nanos), 6),
+            },
+            "usage": self.usage.to_dict(),
+            "per_turn_cost": turn_cost_summary(self.turn_cost),
+            "latency_ms": {
+                "end_to_end": self.end_to_end.to_dict(),
+                "stages": {stage: stats.to_dict() for stage, stats in self.stages.items()},
+            },
+            "average_duration_seconds": (
+                round(self.duration_seconds / self.sessions, 2) if self.sessions else None
+            ),
+            "windows": {name: self.window(seconds, now) for name, seconds in WINDOWS.items()},
+        }
+
+
+# Global finished-session aggregator
+finished_sessions = FinishedSessionAggregator()
@@ -3,21 +3,58 @@ Session Manager for Voice AI Agent
 
 Manages concurrent voice sessions with:
 - Session lifecycle (create, get, remove)
-- Aggregate metrics across sessions
-- Thread-safe operations
+- Aggregate metrics across active and finished sessions
+- Hash-sharded registry with per-shard counters and running turn, cost
+  and latency aggregates, so metrics reads cost O(shards), not O(sessions)
+- Idle/absolute timeouts enforced by a background reaper (deadline heap)
+- Admission control: a per-process capacity, with optional queueing
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import asyncio
+import heapq
+import math
+import os
+import time
 from datetime import datetime
 import structlog
 
+from .audio_ingest import AudioIngest
 from .cost_tracker import CostTracker
-from .latency_tracker import LatencyTracker
+from .dsp import AudioConverter
+from .opus import OpusCodec
+from .framing import BinaryFraming
+from .silence_gate import SilenceGate
+from .vad import VoiceActivityDetector
+from .latency_tracker import TARGET_LATENCY_MS, TARGET_PERCENTILE, LatencyTracker
+from .outbound import OutboundQueue
+from .pipeline import TurnRunner
+from .pricing import nanos_to_dollars
+from .prometheus import voice_metrics
+from .providers import ProviderSet
+from .session_aggregator import TurnAggregate, finished_sessions
 
 logger = structlog.get_logger()
 
+# Number of hash partitions in the session registry
+SESSION_SHARDS = int(os.getenv("SESSION_SHARDS", "16"))
+
+# Seconds without client messages or server sends before a session is
+# closed (0 disables)
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "120"))
+# Maximum session lifetime in seconds (0 disables)
+SESSION_MAX_DURATION = float(os.getenv("SESSION_MAX_DURATION", "3600"))
+SESSION_REAPER_INTERVAL = float(os.getenv("SESSION_REAPER_INTERVAL", "1.0"))
+# Maximum concurrent sessions in this process (0 = unlimited)
+SESSION_CAPACITY = int(os.getenv("SESSION_CAPACITY", "0"))
+# Seconds a new session may wait for capacity before it is rejected
+SESSION_ADMISSION_WAIT = float(os.getenv("SESSION_ADMISSION_WAIT", "0"))
+
+
+class SessionRejected(Exception):
+    """Raised when a session cannot be admitted because the server is at capacity."""
+
 
 @dataclass
 class Session:
@@ -26,75 +63,308 @@ class Session:
     created_at: datetime = field(default_factory=datetime.utcnow)
     cost_tracker: CostTracker = field(default=None)
     latency_tracker: LatencyTracker = field(default=None)
+    audio_ingest: Optional[AudioIngest] = None
+    turn_runner: TurnRunner = field(default=None)
+    outbound: Optional[OutboundQueue] = None
+    # Set when the client negotiated binary framing
+    framing: Optional[BinaryFraming] = None
+    # Converts the client's native audio format (None for 16kHz mono)
+    audio_converter: Optional[AudioConverter] = None
+    # Opus transport (None for raw PCM)
+    codec: Optional[OpusCodec] = None
+    # Endpointing for /ws/talk audio (None when VAD is disabled)
+    vad: Optional[VoiceActivityDetector] = None
+    # Forwards only speech to STT (None without VAD or when disabled)
+    silence_gate: Optional[SilenceGate] = None
+    # VAD already committed the current utterance
+    utterance_committed: bool = False
+    providers: Optional[ProviderSet] = None
     is_active: bool = True
     metadata: Dict = field(default_factory=dict)
+    # Monotonic clock, for timeouts
+    started_monotonic: float = field(default_factory=time.monotonic)
+    last_activity: float = field(default_factory=time.monotonic)
+    # Connection handler task; cancelled when the session expires
+    handler_task: Optional[asyncio.Task] = None
+    expired_reason: Optional[str] = None
 
     def __post_init__(self):
         if self.cost_tracker is None:
             self.cost_tracker = CostTracker(self.session_id)
         if self.latency_tracker is None:
             self.latency_tracker = LatencyTracker(self.session_id)
+        if self.turn_runner is None:
+            self.turn_runner = TurnRunner(
+                self.session_id, self.latency_tracker, self.cost_tracker
+            )
+
+    def touch(self) -> None:
+        """Record client activity (resets the idle timeout)."""
+        self.last_activity = time.monotonic()
+
+    @property
+    def idle_since(self) -> float:
+        """Monotonic time of the last client message or server send."""
+        if self.outbound is not None and self.outbound.last_sent > self.last_activity:
+            return self.outbound.last_sent
+        return self.last_activity
+
+
+class _SessionShard:
+    """One hash partition of the session registry, with its own counters and aggregate."""
+
+    __slots__ = ("index", "sessions", "created", "removed", "peak_active", "aggregate")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.sessions: Dict[str, Session] = {}
+        self.created = 0
+        self.removed = 0
+        self.peak_active = 0
+        # Every turn of the shard's sessions, past and present, fed by
+        # their trackers as turns are recorded
+        self.aggregate = TurnAggregate(windows=finished_sessions)
+
+    def get_stats(self) -> Dict:
+        return {
+            "shard": self.index,
+            "active": len(self.sessions),
+            "peak_active": self.peak_active,
+            "created": self.created,
+            "removed": self.removed,
+            "turns": self.aggregate.turns,
+        }
 
 
 class SessionManager:
     """
     Manages concurrent voice sessions.
     
-    Thread-safe session management with aggregate metrics.
+    Sessions are hash-partitioned by session_id into shards, each with its
+    own counters and a TurnAggregate that the session trackers update as
+    turns finish; a removed session adds the spend of its unfinished turn.
+    Aggregate metrics then merge one aggregate per shard instead of walking
+    sessions. Registry updates contain no await, so on the single-threaded
+    event loop they need no locking.
+    
+    Expiry uses a min-heap of (deadline, session_id). `Session.touch()` is
+    O(1); when an entry comes due the reaper recomputes the deadline from the
+    session's last activity and re-pushes it (O(log n)) if it moved, so each
+    session costs at most one heap operation per idle period.
     
     Usage:
         manager = SessionManager()
+        manager.start_reaper()
         session = await manager.create_session("session-123")
         session.cost_tracker.add_stt_cost(...)
         await manager.remove_session("session-123")
+        await manager.stop_reaper()
     """
 
-    def __init__(self):
-        self._sessions: Dict[str, Session] = {}
-        self._lock = asyncio.Lock()
+    def __init__(
+        self,
+        shard_count: int = SESSION_SHARDS,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        max_duration: float = SESSION_MAX_DURATION,
+        capacity: int = SESSION_CAPACITY,
+        admission_wait: float = SESSION_ADMISSION_WAIT,
+    ):
+        self._shards: List[_SessionShard] = [_SessionShard(i) for i in range(max(1, shard_count))]
+        self._active_count = 0
         self._total_sessions_created = 0
 
+        self.idle_timeout = idle_timeout
+        self.max_duration = max_duration
+        self._deadlines: List[Tuple[float, str]] = []
+        self._reaper: Optional[asyncio.Task] = None
+        self._expired: Dict[str, int] = {"idle_timeout": 0, "max_duration": 0}
+
+        self.capacity = capacity
+        self.admission_wait = admission_wait
+        self._admission = asyncio.Semaphore(capacity) if capacity > 0 else None
+        self._waiting = 0
+        self._rejected = 0
+
+    def _shard(self, session_id: str) -> _SessionShard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    async def _admit(self) -> None:
+        """Take a capacity slot, waiting up to `admission_wait` seconds."""
+        admission = self._admission
+        if admission is None:
+            return
+        if not admission.locked():
+            await admission.acquire()
+            return
+        if self.admission_wait <= 0:
+            self._reject()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(admission.acquire(), self.admission_wait)
+        except asyncio.TimeoutError:
+            self._reject()
+        finally:
+            self._waiting -= 1
+
+    def _reject(self) -> None:
+        self._rejected += 1
+        voice_metrics.session_rejected()
+        logger.warning("session_rejected",
+                       capacity=self.capacity,
+                       active_sessions=self._active_count)
+        raise SessionRejected(f"server at capacity ({self.capacity} sessions)")
+
     async def create_session(self, session_id: str, metadata: Optional[Dict] = None) -> Session:
-        """Create a new session."""
-        async with self._lock:
-            if session_id in self._sessions:
-                logger.warning("session_already_exists", session_id=session_id)
-                return self._sessions[session_id]
-
-            session = Session(
-                session_id=session_id,
-                metadata=metadata or {}
-            )
-            self._sessions[session_id] = session
-            self._total_sessions_created += 1
+        """
+        Create a new session.
+        
+        Raises SessionRejected if the capacity is reached and no slot frees
+        up within the admission wait.
+        """
+        await self._admit()
+        shard = self._shard(session_id)
+        if session_id in shard.sessions:
+            logger.warning("session_already_exists", session_id=session_id)
+            if self._admission is not None:
+                self._admission.release()
+            return shard.sessions[session_id]
 
-            logger.info("session_created",
-                       session_id=session_id,
-                       active_sessions=len(self._sessions))
-            return session
+        session = Session(
+            session_id=session_id,
+            cost_tracker=CostTracker(session_id, aggregate=shard.aggregate),
+            latency_tracker=LatencyTracker(session_id, aggregate=shard.aggregate),
+            metadata=metadata or {}
+        )
+        shard.sessions[session_id] = session
+        shard.created += 1
+        if len(shard.sessions) > shard.peak_active:
+            shard.peak_active = len(shard.sessions)
+        self._active_count += 1
+        self._total_sessions_created += 1
+        voice_metrics.session_created()
+        deadline = self._deadline(session)
+        if deadline != math.inf:
+            heapq.heappush(self._deadlines, (deadline, session_id))
+
+        logger.info("session_created",
+                   session_id=session_id,
+                   shard=shard.index,
+                   active_sessions=self._active_count)
+        return session
 
     async def get_session(self, session_id: str) -> Optional[Session]:
         """Get a session by ID."""
-        return self._sessions.get(session_id)
+        return self._shard(session_id).sessions.get(session_id)
 
     async def remove_session(self, session_id: str) -> Optional[Session]:
         """Remove and return a session."""
-        async with self._lock:
-            session = self._sessions.pop(session_id, None)
-            if session:
-                session.is_active = False
-                logger.info("session_removed",
-                           session_id=session_id,
-                           duration_seconds=(datetime.utcnow() - session.created_at).total_seconds(),
-                           turns=session.latency_tracker.turn_count,
-                           total_cost=session.cost_tracker.total_cost,
-                           active_sessions=len(self._sessions))
-            return session
+        shard = self._shard(session_id)
+        session = shard.sessions.pop(session_id, None)
+        if session:
+            shard.removed += 1
+            self._active_count -= 1
+            session.is_active = False
+            if self._admission is not None:
+                self._admission.release()
+            # Spend on the turn in progress when the session ended; finished
+            # turns have already been reported
+            session.cost_tracker.close()
+            duration = (datetime.utcnow() - session.created_at).total_seconds()
+            voice_metrics.session_removed(duration)
+            finished_sessions.fold(session)
+            logger.info("session_removed",
+                       session_id=session_id,
+                       duration_seconds=duration,
+                       turns=session.latency_tracker.turn_count,
+                       total_cost=session.cost_tracker.total_cost,
+                       active_sessions=self._active_count)
+        return session
+
+    def _deadline(self, session: Session) -> float:
+        deadline = math.inf
+        if self.idle_timeout > 0:
+            deadline = session.idle_since + self.idle_timeout
+        if self.max_duration > 0:
+            deadline = min(deadline, session.started_monotonic + self.max_duration)
+        return deadline
+
+    async def reap(self, now: Optional[float] = None) -> int:
+        """Expire sessions past their idle or absolute deadline. Returns the count."""
+        now = time.monotonic() if now is None else now
+        heap = self._deadlines
+        expired = 0
+        while heap and heap[0][0] <= now:
+            _, session_id = heapq.heappop(heap)
+            session = self._shard(session_id).sessions.get(session_id)
+            if session is None or not session.is_active or session.expired_reason:
+                # Already removed, or its handler is shutting down
+                continue
+            deadline = self._deadline(session)
+            if deadline > now:
+                # Touched since this entry was pushed
+                heapq.heappush(heap, (deadline, session_id))
+                continue
+            reason = (
+                "max_duration"
+                if self.max_duration > 0 and now >= session.started_monotonic + self.max_duration
+                else "idle_timeout"
+            )
+            await self._expire(session, reason)
+            expired += 1
+        return expired
+
+    async def _expire(self, session: Session, reason: str) -> None:
+        session.expired_reason = reason
+        self._expired[reason] += 1
+        voice_metrics.session_expired(reason)
+        logger.info("session_expired",
+                    session_id=session.session_id,
+                    reason=reason,
+                    idle_seconds=round(time.monotonic() - session.idle_since, 1))
+        if session.handler_task is not None and not session.handler_task.done():
+            # The handler closes the connection and removes the session
+            session.handler_task.cancel()
+        else:
+            await self.remove_session(session.session_id)
+
+    def start_reaper(self, interval: float = SESSION_REAPER_INTERVAL) -> None:
+        """Start the background expiry task on the running loop."""
+        if self._reaper is None and (self.idle_timeout > 0 or self.max_duration > 0):
+            self._reaper = asyncio.create_task(self._reap_loop(interval))
+
+    async def stop_reaper(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+
+    async def _reap_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.exception("session_reaper_error", error=str(e))
+
+    def get_admission_stats(self) -> Dict:
+        """Get capacity, queueing and expiry counters."""
+        return {
+            "capacity": self.capacity or None,
+            "waiting": self._waiting,
+            "rejected": self._rejected,
+            "expired": dict(self._expired),
+            "idle_timeout_seconds": self.idle_timeout or None,
+            "max_duration_seconds": self.max_duration or None,
+            "pending_deadlines": len(self._deadlines),
+        }
 
     @property
     def active_session_count(self) -> int:
         """Number of currently active sessions."""
-        return len(self._sessions)
+        return self._active_count
 
     @property
     def total_sessions_created(self) -> int:
@@ -103,63 +373,61 @@ class SessionManager:
 
     def get_active_sessions(self) -> List[str]:
         """Get list of active session IDs."""
-        return list(self._sessions.keys())
+        return [session_id for shard in self._shards for session_id in shard.sessions]
+
+    def get_shard_stats(self) -> List[Dict]:
+        """Get per-shard session counts."""
+        return [shard.get_stats() for shard in self._shards]
 
     def get_aggregate_metrics(self) -> Dict:
-        """Get aggregate metrics across all active sessions."""
-        if not self._sessions:
-            return {
-                "active_sessions": 0,
-                "total_sessions_created": self._total_sessions_created,
-                "aggregate_cost": 0.0,
-                "average_latency_ms": None,
-            }
-
-        total_cost = 0.0
-        latencies = []
-        total_turns = 0
-
-        for session in self._sessions.values():
-            total_cost += session.cost_tracker.total_cost
-            total_turns += session.latency_tracker.turn_count
-            avg_lat = session.latency_tracker.average_end_to_end_latency
-            if avg_lat:
-                latencies.append(avg_lat)
-
-        avg_latency = sum(latencies) / len(latencies) if latencies else None
+        """
+        Get aggregate metrics across all sessions since startup.
+
+        Merges the per-shard running aggregates, which cover every finished
+        turn of active and removed sessions (plus the unfinished turn of
+        each removed session), so cost and turn counts never go backwards
+        when a call ends. Spend on turns still in progress shows up when
+        they finish.
+        """
+        total = TurnAggregate()
+        for shard in self._shards:
+            total.merge(shard.aggregate)
+        end_to_end = total.end_to_end
+        stages = total.stages
+        stt_nanos, llm_nanos, tts_nanos = total.stt_nanos, total.llm_nanos, total.tts_nanos
+        avg_latency = end_to_end.mean
+        p95 = end_to_end.quantile(TARGET_PERCENTILE / 100)
 
         return {
             "active_sessions": self.active_session_count,
             "total_sessions_created": self._total_sessions_created,
-            "total_turns": total_turns,
+            "total_turns": total.turns,
+            "interrupted_turns": total.interrupted_turns,
             "aggregate_cost": {
-                "total": round(total_cost, 6),
-                "breakdown": self._get_cost_breakdown(),
+                "total": round(nanos_to_dollars(stt_nanos + llm_nanos + tts_nanos), 6),
+                "breakdown": {
+                    "stt": round(nanos_to_dollars(stt_nanos), 6),
+                    "llm": round(nanos_to_dollars(llm_nanos), 6),
+                    "tts": round(nanos_to_dollars(tts_nanos), 6),
+                },
             },
+            "aggregate_usage": total.usage.to_dict(),
             "average_latency_ms": round(avg_latency, 2) if avg_latency else None,
-            "target_latency_ms": 2000,
-        }
-
-    def _get_cost_breakdown(self) -> Dict:
-        """Get aggregated cost breakdown across all sessions."""
-        stt_cost = 0.0
-        llm_cost = 0.0
-        tts_cost = 0.0
-
-        for session in self._sessions.values():
-            stt_cost += session.cost_tracker.total_stt_cost
-            llm_cost += session.cost_tracker.total_llm_cost
-            tts_cost += session.cost_tracker.total_tts_cost
-
-        return {
-            "stt": round(stt_cost, 6),
-            "llm": round(llm_cost, 6),
-            "tts": round(tts_cost, 6),
+            "latency_ms": {
+                "end_to_end": end_to_end.to_dict(),
+                "stages": {stage: stats.to_dict() for stage, stats in stages.items()},
+            },
+            "target_latency_ms": TARGET_LATENCY_MS,
+            "target_percentile": TARGET_PERCENTILE,
+            "target_met": p95 is not None and p95 <= TARGET_LATENCY_MS,
+            "finished_sessions": finished_sessions.get_summary(),
+            "admission": self.get_admission_stats(),
+            "shards": self.get_shard_stats(),
         }
 
     def get_session_details(self, session_id: str) -> Optional[Dict]:
         """Get detailed info for a specific session."""
-        session = self._sessions.get(session_id)
+        session = self._shard(session_id).sessions.get(session_id)
         if not session:
             return None
 
@@ -167,8 +435,16 @@ class SessionManager:
             "session_id": session_id,
             "created_at": session.created_at.isoformat(),
             "is_active": session.is_active,
+            "idle_seconds": round(time.monotonic() - session.idle_since, 2),
             "cost": session.cost_tracker.get_summary(),
             "latency": session.latency_tracker.get_summary(),
+            "audio": session.audio_ingest.get_stats() if session.audio_ingest else None,
+            "outbound": session.outbound.get_stats() if session.outbound else None,
+            "framing": session.framing.get_stats() if session.framing else None,
+            "vad": session.vad.get_stats() if session.vad else None,
+            "silence_gate": session.silence_gate.get_stats() if session.silence_gate else None,
+            "audio_format": session.audio_converter.get_stats() if session.audio_converter else None,
+            "codec": session.codec.get_stats() if session.codec else None,
             "metadata": session.metadata,
         }
 
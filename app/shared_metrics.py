@@ -0,0 +1,314 @@
+"""
+Shared-Memory Metrics for Voice AI Agent
+
+Lets every worker process (e.g. `uvicorn --workers N`) publish its counters
+and latency histograms into one fixed-layout shared memory segment, so
+`/metrics` on any worker can report totals for the whole server:
+- Each worker owns one slot and is its only writer, so no locking is needed
+  on the hot path; updates happen at event time
+- A slot is marked released when its worker exits cleanly (or found dead
+  after a crash) and is reclaimed by the next worker to start, which keeps
+  its cumulative counters and resets its gauges; released slots still
+  count toward the totals
+- The segment is unregistered from the resource tracker so it outlives
+  any single worker; the last worker to detach unlinks it
+- Histograms use the LogHistogram bucket layout, so slots merge into the
+  same RollingStats used for per-process metrics
+
+Enabled by setting METRICS_SHM_NAME (shared by all workers of one server).
+"""
+
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Optional
+import fcntl
+import os
+import time
+import structlog
+
+from .latency_tracker import STAGES
+from .pricing import nanos_to_dollars
+from .stats import LogHistogram, RollingStats
+
+logger = structlog.get_logger()
+
+_MAGIC = 0x564F4943  # "VOIC"
+_VERSION = 2
+MAX_WORKERS = int(os.getenv("METRICS_SHM_MAX_WORKERS", "64"))
+
+# Segment header (int64 fields)
+_H_MAGIC, _H_VERSION, _H_SLOTS, _H_SLOT_SIZE = range(4)
+_HEADER_FIELDS = 4
+
+# Slot scalar fields (int64)
+(
+    _STATE,
+    _PID,
+    _UPDATED_MS,
+    _SESSIONS_CREATED,
+    _SESSIONS_ACTIVE,
+    _TURNS,
+    _INTERRUPTED_TURNS,
+    _STT_NANOS,
+    _LLM_NANOS,
+    _TTS_NANOS,
+) = range(10)
+_SCALAR_FIELDS = 10
+
+# Slot states; _PID keeps the last owner's pid after release
+_SLOT_UNUSED, _SLOT_OWNED, _SLOT_RELEASED = range(3)
+
+# Each histogram block: count, sum (us), min (us), max (us), then buckets
+_HIST_COUNT, _HIST_SUM_US, _HIST_MIN_US, _HIST_MAX_US = range(4)
+_HIST_HEADER = 4
+_HISTOGRAMS = ("end_to_end",) + STAGES
+
+# Bucket layout shared with RollingStats() defaults (values in ms)
+_LAYOUT = LogHistogram()
+_HIST_SIZE = _HIST_HEADER + _LAYOUT.size
+SLOT_FIELDS = _SCALAR_FIELDS + len(_HISTOGRAMS) * _HIST_SIZE
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _slot_owned(words, base: int) -> bool:
+    """Whether the slot at `base` belongs to a running worker."""
+    return words[base + _STATE] == _SLOT_OWNED and _pid_alive(words[base + _PID])
+
+
+@contextmanager
+def _segment_lock(name: str) -> Iterator[None]:
+    """Serialize segment creation, slot claims and release across workers."""
+    with open(os.path.join("/tmp", f"{name}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+class SharedMetricsSlot:
+    """
+    This worker's slot in the shared segment.
+
+    Usage:
+        shared = SharedMetricsSlot.attach("voice-metrics")
+        voice_metrics.attach_shared(shared)
+        ...
+        shared.read_all()     # merged view across workers
+        shared.detach()       # on shutdown
+    """
+
+    def __init__(self, name: str, shm: shared_memory.SharedMemory, slot: int):
+        self.name = name
+        self._shm = shm
+        self._words = shm.buf.cast("q")
+        self.slot = slot
+        self._base = _HEADER_FIELDS + slot * SLOT_FIELDS
+        self._hist_base = {
+            name: self._base + _SCALAR_FIELDS + i * _HIST_SIZE
+            for i, name in enumerate(_HISTOGRAMS)
+        }
+
+    @classmethod
+    def attach(cls, name: str, max_workers: int = MAX_WORKERS) -> "SharedMetricsSlot":
+        """Create or open the segment `name` and claim a slot for this process."""
+        size = (_HEADER_FIELDS + max_workers * SLOT_FIELDS) * 8
+        with _segment_lock(name):
+            try:
+                shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+                words = shm.buf.cast("q")
+                words[_H_MAGIC] = _MAGIC
+                words[_H_VERSION] = _VERSION
+                words[_H_SLOTS] = max_workers
+                words[_H_SLOT_SIZE] = SLOT_FIELDS
+            except FileExistsError:
+                shm = shared_memory.SharedMemory(name=name)
+                words = shm.buf.cast("q")
+                if (words[_H_MAGIC], words[_H_VERSION], words[_H_SLOT_SIZE]) != (_MAGIC, _VERSION, SLOT_FIELDS):
+                    words.release()
+                    shm.close()
+                    raise RuntimeError(f"shared metrics segment '{name}' has an incompatible layout")
+            # The segment outlives any single worker; don't let the resource
+            # tracker unlink it when this process exits (detach() does, for
+            # the last worker)
+            resource_tracker.unregister(shm._name, "shared_memory")
+
+            slot = cls._claim(words)
+            words.release()
+        if slot is None:
+            shm.close()
+            raise RuntimeError(f"no free shared metrics slot (max {max_workers} workers)")
+        logger.info("shared_metrics_attached", name=name, slot=slot, pid=os.getpid())
+        return cls(name, shm, slot)
+
+    @staticmethod
+    def _claim(words) -> Optional[int]:
+        pid = os.getpid()
+        for slot in range(words[_H_SLOTS]):
+            base = _HEADER_FIELDS + slot * SLOT_FIELDS
+            if words[base + _PID] == pid or not _slot_owned(words, base):
+                # Inherit cumulative counters of an exited worker; its
+                # sessions are gone, so reset the gauge
+                words[base + _STATE] = _SLOT_OWNED
+                words[base + _PID] = pid
+                words[base + _SESSIONS_ACTIVE] = 0
+                words[base + _UPDATED_MS] = int(time.time() * 1000)
+                return slot
+        return None
+
+    def _touch(self) -> None:
+        self._words[self._base + _UPDATED_MS] = int(time.time() * 1000)
+
+    def session_created(self) -> None:
+        words, base = self._words, self._base
+        words[base + _SESSIONS_CREATED] += 1
+        words[base + _SESSIONS_ACTIVE] += 1
+        self._touch()
+
+    def session_removed(self) -> None:
+        self._words[self._base + _SESSIONS_ACTIVE] -= 1
+        self._touch()
+
+    def _observe(self, histogram: str, value_ms: float) -> None:
+        words = self._words
+        base = self._hist_base[histogram]
+        value_us = int(value_ms * 1000)
+        if not words[base + _HIST_COUNT] or value_us < words[base + _HIST_MIN_US]:
+            words[base + _HIST_MIN_US] = value_us
+        if value_us > words[base + _HIST_MAX_US]:
+            words[base + _HIST_MAX_US] = value_us
+        words[base + _HIST_COUNT] += 1
+        words[base + _HIST_SUM_US] += value_us
+        words[base + _HIST_HEADER + _LAYOUT.bucket_index(value_ms)] += 1
+
+    def observe_turn_latency(self, turn) -> None:
+        """Record a finished TurnLatency."""
+        words, base = self._words, self._base
+        words[base + _TURNS] += 1
+        if turn.interrupted:
+            words[base + _INTERRUPTED_TURNS] += 1
+        end_to_end = turn.end_to_end_latency
+        if end_to_end is not None:
+            self._observe("end_to_end", end_to_end)
+        for stage in turn.stages:
+            duration = stage.total_duration
+            if duration is not None:
+                self._observe(stage.stage, duration)
+        self._touch()
+
+    def observe_turn_cost(self, turn) -> None:
+        """Record a finished TurnCost (integer nano-dollars)."""
+        words, base = self._words, self._base
+        words[base + _STT_NANOS] += turn.stt_nanos
+        words[base + _LLM_NANOS] += turn.llm_nanos
+        words[base + _TTS_NANOS] += turn.tts_nanos
+        self._touch()
+
+    def _read_stats(self, base: int) -> RollingStats:
+        words = self._words
+        stats = RollingStats()
+        count = words[base + _HIST_COUNT]
+        if count:
+            stats.count = count
+            stats.total = words[base + _HIST_SUM_US] / 1000
+            stats.min = words[base + _HIST_MIN_US] / 1000
+            stats.max = words[base + _HIST_MAX_US] / 1000
+            stats.histogram.add_bucket_counts(
+                words[base + _HIST_HEADER:base + _HIST_SIZE]
+            )
+        return stats
+
+    def read_all(self) -> Dict:
+        """Merge every worker's slot into server-wide totals."""
+        words = self._words
+        workers: List[Dict] = []
+        totals = {
+            "sessions_created": 0,
+            "active_sessions": 0,
+            "turns": 0,
+            "interrupted_turns": 0,
+        }
+        stt_nanos = llm_nanos = tts_nanos = 0
+        merged = {name: RollingStats() for name in _HISTOGRAMS}
+
+        for slot in range(words[_H_SLOTS]):
+            base = _HEADER_FIELDS + slot * SLOT_FIELDS
+            if words[base + _STATE] == _SLOT_UNUSED:
+                continue
+            pid = words[base + _PID]
+            alive = _slot_owned(words, base)
+            active = words[base + _SESSIONS_ACTIVE] if alive else 0
+            workers.append({
+                "slot": slot,
+                "pid": pid,
+                "alive": alive,
+                "active_sessions": active,
+                "updated_ms": words[base + _UPDATED_MS],
+            })
+            totals["sessions_created"] += words[base + _SESSIONS_CREATED]
+            totals["active_sessions"] += active
+            totals["turns"] += words[base + _TURNS]
+            totals["interrupted_turns"] += words[base + _INTERRUPTED_TURNS]
+            stt_nanos += words[base + _STT_NANOS]
+            llm_nanos += words[base + _LLM_NANOS]
+            tts_nanos += words[base + _TTS_NANOS]
+            for name in _HISTOGRAMS:
+                hist_base = base + _SCALAR_FIELDS + _HISTOGRAMS.index(name) * _HIST_SIZE
+                merged[name].merge(self._read_stats(hist_base))
+
+        return {
+            "workers": workers,
+            **totals,
+            "cost": {
+                "stt": round(nanos_to_dollars(stt_nanos), 6),
+                "llm": round(nanos_to_dollars(llm_nanos), 6),
+                "tts": round(nanos_to_dollars(tts_nanos), 6),
+                "total": round(nanos_to_dollars(stt_nanos + llm_nanos + tts_nanos), 6),
+            },
+            "latency_ms": {
+                "end_to_end": merged["end_to_end"].to_dict(),
+                "stages": {stage: merged[stage].to_dict() for stage in STAGES},
+            },
+        }
+
+    def detach(self) -> None:
+        """
+        Release this worker's slot; its counters stay in the totals and
+        pass to the next owner. The last worker to detach unlinks the
+        segment, so a fresh server starts from zero.
+        """
+        words = self._words
+        with _segment_lock(self.name):
+            words[self._base + _SESSIONS_ACTIVE] = 0
+            words[self._base + _STATE] = _SLOT_RELEASED
+            last = not any(
+                _slot_owned(words, _HEADER_FIELDS + slot * SLOT_FIELDS)
+                for slot in range(words[_H_SLOTS])
+            )
+            words.release()
+            self._shm.close()
+            if last:
+                # Re-register so unlink() balances the unregister in attach()
+                resource_tracker.register(self._shm._name, "shared_memory")
+                self._shm.unlink()
+        logger.info("shared_metrics_detached", name=self.name, slot=self.slot, unlinked=last)
+
+
+def attach_from_env() -> Optional[SharedMetricsSlot]:
+    """Attach to METRICS_SHM_NAME if set; returns None when disabled or on error."""
+    name = os.getenv("METRICS_SHM_NAME")
+    if not name:
+        return None
+    try:
+        return SharedMetricsSlot.attach(name)
+    except Exception as e:
+        logger.warning("shared_metrics_unavailable", name=name, error=str(e))
+        return None
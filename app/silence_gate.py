@@ -0,0 +1,215 @@
+"""
+Silence Gate for Voice AI Agent
+
+Sits between inbound audio and the STT stream so only speech is streamed
+(and billed):
+- Driven by the VAD (vad.py): audio is forwarded from SILENCE_GATE_PADDING_MS
+  before a detected speech onset until the VAD declares the end of the
+  utterance, so the trailing padding is the VAD hangover (VAD_HANGOVER_MS)
+- Audio between utterances is held in a short pre-roll buffer and dropped;
+  a client commit with no speech detected forwards the pre-roll instead
+- Forwarded audio is a sequence of segments cut out of the stream; the gate
+  keeps the mapping for the most recent MAX_SEGMENTS segments so STT
+  timestamps (relative to the audio streamed) can be translated back to
+  stream time
+- Raw and forwarded audio are counted, per turn and in total
+
+Environment:
+- SILENCE_GATE_ENABLED:     "true" (default) or "false" (stream everything)
+- SILENCE_GATE_PADDING_MS:  audio forwarded ahead of speech onset (default 200)
+"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import os
+
+from .audio_ingest import SAMPLE_RATE
+from .vad import FRAME_MS, SPEECH_END, SPEECH_START, VADEvent, VoiceActivityDetector
+
+# Segments kept for stream_time(); STT results only refer to recent audio,
+# so older segments are dropped rather than kept for the whole session
+MAX_SEGMENTS = 256
+
+
+class SilenceGate:
+    """
+    Forwards speech plus padding from a PCM 16-bit mono stream.
+
+    Usage:
+        gate = SilenceGate(VoiceActivityDetector())
+        events, pieces = gate.process(pcm_bytes)
+        for piece in pieces:
+            await stt.push(piece)
+        # or, to act on each event where it falls in the audio:
+        for pieces, event in gate.split(pcm_bytes):
+            ...
+        held = gate.flush()      # client end of utterance while closed
+        raw_seconds, forwarded_seconds = gate.take_turn_audio()
+    """
+
+    def __init__(
+        self,
+        vad: VoiceActivityDetector,
+        padding_ms: Optional[int] = None,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.vad = vad
+        self.sample_rate = sample_rate
+        if padding_ms is None:
+            padding_ms = int(os.getenv("SILENCE_GATE_PADDING_MS", "200"))
+        self.padding_ms = padding_ms
+        self._padding_bytes = self._to_bytes(padding_ms)
+        # Onset is reported after the debounce, and VAD frames may straddle
+        # pushes, so the pre-roll reaches further back than the padding
+        self._hold_bytes = self._to_bytes(padding_ms + vad.config.min_speech_ms + 2 * FRAME_MS)
+        self._held = bytearray()
+
+        self.open = False
+        self._stream_pos = 0
+        # (forwarded offset, stream offset) in bytes where each recent segment starts
+        self._segment_forwarded: Deque[int] = deque(maxlen=MAX_SEGMENTS)
+        self._segment_stream: Deque[int] = deque(maxlen=MAX_SEGMENTS)
+        self.segments = 0
+
+        # Counters for metrics
+        self.raw_bytes = 0
+        self.forwarded_bytes = 0
+        self._turn_raw_mark = 0
+        self._turn_forwarded_mark = 0
+
+    def _to_bytes(self, milliseconds: int) -> int:
+        return self.sample_rate * milliseconds // 1000 * 2
+
+    def _seconds(self, size: int) -> float:
+        return size / (self.sample_rate * 2)
+
+    def process(self, pcm) -> Tuple[List[VADEvent], List]:
+        """
+        Feed PCM audio; returns the VAD events and the pieces to forward.
+
+        Pieces are views into `pcm` or copies of held audio, in order.
+        """
+        events, pieces = [], []
+        for step_pieces, event in self.split(pcm):
+            pieces += step_pieces
+            if event is not None:
+                events.append(event)
+        return events, pieces
+
+    def split(self, pcm) -> List[Tuple[List, Optional[VADEvent]]]:
+        """
+        Like process(), but returns (pieces, event) steps in stream order:
+        the pieces forwarded before each event, then the event; the last
+        step holds the pieces after the last event, with no event.
+        """
+        data = memoryview(pcm).cast("B")
+        events = self.vad.process(data)
+        base = self._stream_pos
+        end = base + len(data)
+        self._stream_pos = end
+        self.raw_bytes += len(data)
+
+        steps = []
+        pieces = []
+        cursor = base                     # audio before this is forwarded or dropped
+        available = base - len(self._held)
+        for event in events:
+            position = min(self._to_bytes(event.offset_ms), end)
+            if event.kind == SPEECH_START and not self.open:
+                start = max(position - self._padding_bytes, available)
+                self._add_segment(start)
+                if start < base:
+                    pieces.append(self._held[len(self._held) - (base - start):])
+                    self.forwarded_bytes += base - start
+                self._held.clear()
+                cursor = max(start, base)
+                self.open = True
+            elif event.kind == SPEECH_END and self.open:
+                stop = max(position, cursor)
+                if stop > cursor:
+                    pieces.append(data[cursor - base:stop - base])
+                    self.forwarded_bytes += stop - cursor
+                cursor = available = stop
+                self.open = False
+            steps.append((pieces, event))
+            pieces = []
+
+        if self.open:
+            if end > cursor:
+                pieces.append(data[cursor - base:])
+                self.forwarded_bytes += end - cursor
+        else:
+            held = self._held
+            held += data[cursor - base:]
+            if len(held) > self._hold_bytes:
+                del held[:len(held) - self._hold_bytes]
+        steps.append((pieces, None))
+        return steps
+
+    def flush(self) -> bytes:
+        """
+        Forward the held pre-roll while the gate is closed; returns it.
+
+        For an explicit end of utterance with no speech onset detected, so
+        quiet audio still reaches the STT instead of being dropped.
+        """
+        if self.open or not self._held:
+            return b""
+        held = bytes(self._held)
+        self._held.clear()
+        self._add_segment(self._stream_pos - len(held))
+        self.forwarded_bytes += len(held)
+        return held
+
+    def _add_segment(self, stream_start: int) -> None:
+        """Start a segment at `stream_start`, at the current forwarded offset."""
+        self._segment_forwarded.append(self.forwarded_bytes)
+        self._segment_stream.append(stream_start)
+        self.segments += 1
+
+    def stream_time(self, forwarded_seconds: float) -> float:
+        """
+        Map a time in the forwarded audio (e.g. an STT word timestamp) to stream time.
+
+        Times before the oldest kept segment are mapped through it.
+        """
+        position = round(forwarded_seconds * self.sample_rate) * 2
+        index = bisect_right(self._segment_forwarded, position) - 1
+        if index < 0:
+            if self.segments <= MAX_SEGMENTS:
+                return forwarded_seconds
+            index = 0
+        stream = self._segment_stream[index] + position - self._segment_forwarded[index]
+        return self._seconds(stream)
+
+    def take_turn_audio(self) -> Tuple[float, float]:
+        """(raw, forwarded) audio seconds since the previous call."""
+        raw = self._seconds(self.raw_bytes - self._turn_raw_mark)
+        forwarded = self._seconds(self.forwarded_bytes - self._turn_forwarded_mark)
+        self._turn_raw_mark = self.raw_bytes
+        self._turn_forwarded_mark = self.forwarded_bytes
+        return raw, forwarded
+
+    def get_stats(self) -> Dict:
+        raw = self.raw_bytes
+        return {
+            "open": self.open,
+            "raw_seconds": round(self._seconds(raw), 3),
+            "forwarded_seconds": round(self._seconds(self.forwarded_bytes), 3),
+            "suppressed_ratio": round(1 - self.forwarded_bytes / raw, 3) if raw else None,
+            "segments": self.segments,
+            "padding_ms": self.padding_ms,
+        }
+
+
+def create_silence_gate(
+    vad: Optional[VoiceActivityDetector],
+    sample_rate: int = SAMPLE_RATE,
+) -> Optional[SilenceGate]:
+    """Gate driven by `vad`, or None without a VAD or when SILENCE_GATE_ENABLED is false."""
+    if vad is None:
+        return None
+    if os.getenv("SILENCE_GATE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return SilenceGate(vad, sample_rate=sample_rate)
@@ -0,0 +1,215 @@
+"""
+Rolling Statistics for Voice AI Agent
+
+Bounded-memory aggregates for long-running sessions:
+- LogHistogram: sparse log-bucketed histogram with relative-error quantiles
+- RollingStats: count, sum, min, max and a LogHistogram for percentiles
+
+Both are mergeable, so cross-session percentiles come from merging
+per-session aggregates instead of revisiting individual turns.
+"""
+
+from typing import Dict, Iterable, Optional
+import math
+
+# Percentiles reported by default (p95 is the latency SLO)
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def percentile_key(p: float) -> str:
+    """Summary key for a percentile: 50 -> "p50", 99.9 -> "p999"."""
+    return "p" + f"{p:g}".replace(".", "")
+
+
+class LogHistogram:
+    """
+    Log-bucketed histogram over a fixed value range.
+
+    Bucket boundaries grow geometrically, so any quantile is reported within
+    `relative_accuracy` of the true value. Values outside the range are
+    clamped into the first/last bucket. Only non-empty buckets are stored,
+    so memory and merge cost grow with the spread of the values seen (a few
+    dozen buckets for a session's latencies), not with the layout's `size`.
+
+    Usage:
+        hist = LogHistogram(min_value=1.0, max_value=60_000.0)
+        hist.add(412.5)
+        hist.quantile(0.99)
+    """
+
+    __slots__ = (
+        "min_value",
+        "max_value",
+        "relative_accuracy",
+        "_gamma",
+        "_log_gamma",
+        "_offset",
+        "_size",
+        "_counts",
+        "count",
+    )
+
+    def __init__(
+        self,
+        min_value: float = 0.1,
+        max_value: float = 3_600_000.0,
+        relative_accuracy: float = 0.01,
+    ):
+        if not 0 < min_value < max_value:
+            raise ValueError("require 0 < min_value < max_value")
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.min_value = min_value
+        self.max_value = max_value
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        size = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self._size = size
+        # Non-empty buckets only: index -> count
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+
+    @property
+    def layout(self) -> tuple:
+        """Bucket layout; only histograms with equal layouts can be merged."""
+        return (self.min_value, self.max_value, self.relative_accuracy)
+
+    @property
+    def size(self) -> int:
+        """Number of buckets in the layout."""
+        return self._size
+
+    def bucket_index(self, value: float) -> int:
+        """Bucket a value falls into (for external fixed-layout storage)."""
+        return self._index(value)
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        if value >= self.max_value:
+            return self._size - 1
+        return math.ceil(math.log(value) / self._log_gamma) - self._offset
+
+    def _value(self, index: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(i-1), gamma^i]
+        upper = self._gamma ** (index + self._offset)
+        return 2 * upper / (1 + self._gamma)
+
+    def add(self, value: float, count: int = 1) -> None:
+        counts = self._counts
+        index = self._index(value)
+        counts[index] = counts.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Add another histogram's counts into this one."""
+        if other.layout != self.layout:
+            raise ValueError("cannot merge histograms with different layouts")
+        counts = self._counts
+        for index, bucket_count in other._counts.items():
+            counts[index] = counts.get(index, 0) + bucket_count
+        self.count += other.count
+
+    def add_bucket_counts(self, counts) -> None:
+        """Add raw per-bucket counts laid out like this histogram's buckets."""
+        buckets = self._counts
+        total = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count:
+                buckets[index] = buckets.get(index, 0) + bucket_count
+                total += bucket_count
+        self.count += total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Approximate value at quantile `q` (0..1), or None if empty.
+
+        Nearest rank: the value of the ceil(q * count)-th smallest sample, so
+        with few samples a high quantile is the largest one rather than an
+        interpolation below it.
+        """
+        if not self.count:
+            return None
+        # Tolerance keeps float products like 0.999 * 1000 from rounding up a rank
+        rank = max(1, math.ceil(q * self.count - 1e-9))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return self._value(index)
+        return self._value(self._size - 1)
+
+
+class RollingStats:
+    """
+    Running count/sum/min/max plus a percentile sketch, in constant memory.
+
+    Usage:
+        stats = RollingStats()
+        stats.add(latency_ms)
+        stats.mean, stats.quantile(0.95), stats.to_dict()
+    """
+
+    __slots__ = ("count", "total", "min", "max", "histogram")
+
+    def __init__(
+        self,
+        min_value: float = 0.1,
+        max_value: float = 3_600_000.0,
+        relative_accuracy: float = 0.01,
+    ):
+        self.count = 0
+        self.total = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.histogram = LogHistogram(min_value, max_value, relative_accuracy)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.histogram.add(value)
+
+    def merge(self, other: "RollingStats") -> None:
+        """Fold another RollingStats (with the same histogram layout) into this one."""
+        if not other.count:
+            return
+        self.histogram.merge(other.histogram)
+        self.count += other.count
+        self.total += other.total
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile, clamped to the observed min/max."""
+        value = self.histogram.quantile(q)
+        if value is None:
+            return None
+        return min(max(value, self.min), self.max)
+
+    def to_dict(self, percentiles: Iterable[float] = PERCENTILES, digits: int = 2) -> Dict:
+        def fmt(value):
+            return round(value, digits) if value is not None else None
+
+        result = {
+            "count": self.count,
+            "mean": fmt(self.mean),
+            "min": fmt(self.min),
+            "max": fmt(self.max),
+        }
+        for p in percentiles:
+            result[percentile_key(p)] = fmt(self.quantile(p / 100))
+        return result
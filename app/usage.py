@@ -0,0 +1,137 @@
+"""
+Usage Ledger for Voice AI Agent
+
+Records the provider usage a session actually incurs, in the base units the
+pricing table is expressed in (see pricing.py), so cost is computed from
+measured quantities rather than guesses:
+- STT: microseconds of audio streamed to the provider (after the silence
+  gate), plus the inbound audio it was cut from
+- LLM: input/output tokens as reported by the provider; turns where no usage
+  was reported (e.g. cancelled mid-stream) fall back to an estimate from
+  the text, and the estimated tokens are counted separately
+- TTS: characters sent for synthesis
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, Optional
+
+# Rough characters per token for English text, used only when the provider
+# reports no usage
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(texts: Iterable[str]) -> int:
+    """Token estimate for `texts` when no provider usage is available."""
+    return sum(-(-len(text) // CHARS_PER_TOKEN) for text in texts)
+
+
+@dataclass(slots=True)
+class Usage:
+    """Provider usage in pricing base units."""
+    stt_audio_us: int = 0          # audio streamed to STT (billed)
+    raw_audio_us: int = 0          # inbound audio before silence gating
+    llm_input_tokens: int = 0
+    llm_output_tokens: int = 0
+    llm_estimated_tokens: int = 0  # part of the token counts that was estimated
+    tts_characters: int = 0
+
+    def add(self, other: "Usage") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    def to_dict(self) -> Dict:
+        raw = self.raw_audio_us
+        return {
+            "stt_audio_seconds": round(self.stt_audio_us / 1_000_000, 3),
+            "raw_audio_seconds": round(raw / 1_000_000, 3),
+            "audio_suppressed_ratio": round(1 - self.stt_audio_us / raw, 3) if raw else None,
+            "llm_input_tokens": self.llm_input_tokens,
+            "llm_output_tokens": self.llm_output_tokens,
+            "llm_estimated_tokens": self.llm_estimated_tokens,
+            "tts_characters": self.tts_characters,
+        }
+
+
+class UsageLedger:
+    """
+    Per-session usage, kept per turn and in total.
+
+    Usage:
+        ledger = UsageLedger()
+        ledger.record_stt_audio(1.3, raw_seconds=3.0)
+        ledger.record_llm_tokens(812, 41)
+        ledger.record_tts_characters(120)
+        turn_usage = ledger.finish_turn()
+    """
+
+    def __init__(self):
+        self.current = Usage()
+        self._completed = Usage()
+
+    def record_stt_audio(
+        self,
+        seconds: float,
+        raw_seconds: Optional[float] = None,
+        usage: Optional[Usage] = None,
+    ) -> int:
+        """
+        Record audio streamed to STT; returns it in microseconds.
+
+        `raw_seconds` is the inbound audio it was cut from, defaulting to
+        the streamed audio (no silence gate). `usage` is the turn to record
+        into (default: the current turn), likewise for the methods below.
+        """
+        usage = usage or self.current
+        audio_us = round(seconds * 1_000_000)
+        usage.stt_audio_us += audio_us
+        if raw_seconds is None:
+            usage.raw_audio_us += audio_us
+        else:
+            self.record_raw_audio(raw_seconds, usage)
+        return audio_us
+
+    def record_raw_audio(self, seconds: float, usage: Optional[Usage] = None) -> None:
+        """Record inbound audio whose streamed part is metered separately."""
+        (usage or self.current).raw_audio_us += round(seconds * 1_000_000)
+
+    def record_llm_tokens(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        estimated: bool = False,
+        usage: Optional[Usage] = None,
+    ) -> None:
+        usage = usage or self.current
+        usage.llm_input_tokens += input_tokens
+        usage.llm_output_tokens += output_tokens
+        if estimated:
+            usage.llm_estimated_tokens += input_tokens + output_tokens
+
+    def record_tts_characters(self, characters: int, usage: Optional[Usage] = None) -> None:
+        (usage or self.current).tts_characters += characters
+
+    def finish_turn(self) -> Usage:
+        """Close the current turn's usage and start a new one."""
+        turn = self.current
+        self._completed.add(turn)
+        self.current = Usage()
+        return turn
+
+    def detach_turn(self) -> Usage:
+        """
+        Start a new current turn, leaving the current one open for late
+        writes; it joins the totals when passed to finish_detached().
+        """
+        turn = self.current
+        self.current = Usage()
+        return turn
+
+    def finish_detached(self, turn: Usage) -> None:
+        self._completed.add(turn)
+
+    @property
+    def total(self) -> Usage:
+        total = Usage()
+        total.add(self._completed)
+        total.add(self.current)
+        return total
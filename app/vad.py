@@ -0,0 +1,225 @@
+"""
+Voice Activity Detection and Endpointing for /ws/talk
+
+Energy + spectral VAD over fixed 20 ms frames of PCM 16-bit mono:
+- Features are computed for every complete frame of a pushed buffer at once
+  (NumPy): energy in dBFS, the share of spectral energy in the voice band
+  (80-4000 Hz) and spectral flatness within that band
+- A frame is speech when its energy clears both an absolute floor and an
+  adaptive noise floor by VAD_SNR_DB, its energy is mostly in the voice band
+  (rejects hum and hiss) and its spectrum is peaky rather than flat (rejects
+  broadband noise)
+- Onset needs VAD_MIN_SPEECH_MS of consecutive speech; the end of an
+  utterance is declared after VAD_HANGOVER_MS of silence
+
+Environment:
+- VAD_ENABLED:        "true" (default) or "false" (client commits only)
+- VAD_THRESHOLD_DB:   absolute speech floor in dBFS (default -45)
+- VAD_SNR_DB:         required margin above the noise floor (default 10)
+- VAD_MIN_SPEECH_MS:  speech needed to start an utterance (default 60)
+- VAD_HANGOVER_MS:    silence needed to end an utterance (default 300)
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import os
+
+import numpy as np
+
+from .audio_ingest import SAMPLE_RATE
+
+FRAME_MS = 20
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+
+@dataclass(slots=True)
+class VADEvent:
+    kind: str          # SPEECH_START | SPEECH_END
+    offset_ms: int     # stream time of the event (start of the deciding frame)
+
+
+@dataclass
+class VADConfig:
+    threshold_db: float = -45.0
+    snr_db: float = 10.0
+    min_speech_ms: int = 60
+    hangover_ms: int = 300
+    min_band_ratio: float = 0.5
+    # Geometric / arithmetic mean of the band spectrum; white noise is ~0.56
+    max_flatness: float = 0.4
+    # Noise floor smoothing per non-speech frame (0..1)
+    noise_adapt: float = 0.05
+
+    @classmethod
+    def from_env(cls) -> "VADConfig":
+        return cls(
+            threshold_db=float(os.getenv("VAD_THRESHOLD_DB", "-45")),
+            snr_db=float(os.getenv("VAD_SNR_DB", "10")),
+            min_speech_ms=int(os.getenv("VAD_MIN_SPEECH_MS", "60")),
+            hangover_ms=int(os.getenv("VAD_HANGOVER_MS", "300")),
+        )
+
+
+class VoiceActivityDetector:
+    """
+    Streaming VAD with onset debounce and hangover-based endpointing.
+
+    Usage:
+        vad = VoiceActivityDetector()
+        for event in vad.process(pcm_bytes):
+            if event.kind == SPEECH_START: ...
+            elif event.kind == SPEECH_END: ...
+
+        # or, to act on each event where it falls in the audio:
+        for pieces, event in vad.split(pcm_bytes):
+            ...
+    """
+
+    def __init__(self, config: Optional[VADConfig] = None, sample_rate: int = SAMPLE_RATE):
+        self.config = config or VADConfig.from_env()
+        self.frame_samples = sample_rate * FRAME_MS // 1000
+        self._onset_frames = max(1, self.config.min_speech_ms // FRAME_MS)
+        self._hangover_frames = max(1, self.config.hangover_ms // FRAME_MS)
+
+        # Hann window and voice-band bins for the frame size
+        self._window = np.hanning(self.frame_samples).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_samples, 1 / sample_rate)
+        self._band = (freqs >= 80) & (freqs <= 4000)
+
+        # Samples left over from the previous push (less than one frame)
+        self._carry = np.zeros(self.frame_samples, dtype=np.int16)
+        self._carry_len = 0
+        self._odd_byte = b""
+
+        self.in_speech = False
+        self.noise_floor_db = -60.0
+        self._speech_run = 0
+        self._silence_run = 0
+        self._frames = 0
+
+        # Counters for metrics
+        self.utterances = 0
+        self.speech_frames = 0
+
+    def _features(self, frames: np.ndarray):
+        """(energy_db, band_ratio, flatness) per row of int16 `frames`."""
+        x = frames.astype(np.float32)
+        x *= 1 / 32768
+        power = np.einsum("ij,ij->i", x, x) / frames.shape[1]
+        energy_db = 10 * np.log10(power + 1e-10)
+        spectrum = np.abs(np.fft.rfft(x * self._window, axis=1))
+        spectrum *= spectrum
+        band = spectrum[:, self._band] + 1e-12
+        band_mean = band.mean(axis=1)
+        band_ratio = band.sum(axis=1) / (spectrum.sum(axis=1) + 1e-12)
+        flatness = np.exp(np.log(band).mean(axis=1)) / band_mean
+        return energy_db, band_ratio, flatness
+
+    def _frames_of(self, pcm) -> Optional[np.ndarray]:
+        """Complete frames from the carry plus `pcm`, as a 2-D int16 array."""
+        data = memoryview(pcm).cast("B")
+        if self._odd_byte:
+            data = memoryview(self._odd_byte + bytes(data))
+            self._odd_byte = b""
+        if len(data) % 2:
+            self._odd_byte = bytes(data[-1:])
+            data = data[:-1]
+        samples = np.frombuffer(data, dtype="<i2")
+
+        size = self.frame_samples
+        if self._carry_len:
+            take = min(size - self._carry_len, len(samples))
+            self._carry[self._carry_len:self._carry_len + take] = samples[:take]
+            self._carry_len += take
+            samples = samples[take:]
+            if self._carry_len < size:
+                return None
+            head = self._carry.reshape(1, size).copy()
+            self._carry_len = 0
+        else:
+            head = None
+
+        count = len(samples) // size
+        rest = len(samples) - count * size
+        if rest:
+            self._carry[:rest] = samples[count * size:]
+            self._carry_len = rest
+        body = samples[:count * size].reshape(count, size)
+        if head is None:
+            return body if count else None
+        return np.concatenate((head, body)) if count else head
+
+    def process(self, pcm) -> List[VADEvent]:
+        """Feed PCM 16-bit mono audio; returns speech start/end events."""
+        frames = self._frames_of(pcm)
+        if frames is None:
+            return []
+        energy_db, band_ratio, flatness = self._features(frames)
+        voiced = (band_ratio >= self.config.min_band_ratio) & (flatness <= self.config.max_flatness)
+
+        config = self.config
+        events: List[VADEvent] = []
+        for energy, is_voiced in zip(energy_db.tolist(), voiced.tolist()):
+            threshold = max(config.threshold_db, self.noise_floor_db + config.snr_db)
+            speech = is_voiced and energy >= threshold
+            if speech:
+                self.speech_frames += 1
+                self._speech_run += 1
+                self._silence_run = 0
+                if not self.in_speech and self._speech_run >= self._onset_frames:
+                    self.in_speech = True
+                    self.utterances += 1
+                    onset = self._frames - self._speech_run + 1
+                    events.append(VADEvent(SPEECH_START, onset * FRAME_MS))
+            else:
+                self._speech_run = 0
+                if energy < self.noise_floor_db:
+                    self.noise_floor_db = energy
+                else:
+                    self.noise_floor_db += (energy - self.noise_floor_db) * config.noise_adapt
+                if self.in_speech:
+                    self._silence_run += 1
+                    if self._silence_run >= self._hangover_frames:
+                        self.in_speech = False
+                        events.append(VADEvent(SPEECH_END, self._frames * FRAME_MS))
+            self._frames += 1
+        return events
+
+    def split(self, pcm) -> List[Tuple[List, Optional[VADEvent]]]:
+        """
+        Like process(), but also cuts `pcm` at each event.
+
+        Returns (pieces, event) steps in stream order: the audio before the
+        event, then the event; the last step holds the rest, with no event.
+        """
+        data = memoryview(pcm).cast("B")
+        frame_bytes = self.frame_samples * 2
+        base = self._frames * frame_bytes + self._carry_len * 2 + len(self._odd_byte)
+        steps = []
+        cursor = 0
+        for event in self.process(data):
+            position = event.offset_ms // FRAME_MS * frame_bytes - base
+            position = min(max(position, cursor), len(data))
+            steps.append(([data[cursor:position]] if position > cursor else [], event))
+            cursor = position
+        steps.append(([data[cursor:]] if len(data) > cursor else [], None))
+        return steps
+
+    def get_stats(self) -> Dict:
+        return {
+            "in_speech": self.in_speech,
+            "utterances": self.utterances,
+            "speech_ms": self.speech_frames * FRAME_MS,
+            "audio_ms": self._frames * FRAME_MS,
+            "noise_floor_db": round(self.noise_floor_db, 1),
+            "hangover_ms": self._hangover_frames * FRAME_MS,
+        }
+
+
+def create_vad() -> Optional[VoiceActivityDetector]:
+    """Create a detector for a session, or None when VAD_ENABLED is false."""
+    if os.getenv("VAD_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return VoiceActivityDetector()
@@ -0,0 +1,91 @@
+"""
+Microbenchmark for the in-process audio DSP (app/dsp.py).
+
+Reports throughput as seconds of audio processed per CPU second (higher is
+better; 1.0 is exactly real time) for format conversion, downmix, level
+meters, resampling from common client rates and the full per-session
+AudioConverter, fed in /ws/talk-sized blocks.
+
+Run:
+    python -m benchmarks.bench_dsp [--seconds S] [--frame-ms MS]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.audio_ingest import SAMPLE_RATE
+from app.dsp import (
+    AudioConverter,
+    PolyphaseResampler,
+    downmix,
+    float32_to_pcm16,
+    pcm16_to_float32,
+    peak_dbfs,
+    rms_dbfs,
+)
+
+
+def speech_like(seconds: float, rate: int, channels: int = 1) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 1870 * t)
+    signal += np.random.default_rng(0).normal(0, 0.01, len(t))
+    pcm = np.round(signal * 32767).astype("<i2")
+    return np.repeat(pcm, channels).tobytes()
+
+
+def blocks(data: bytes, rate: int, channels: int, frame_ms: int):
+    size = rate * frame_ms // 1000 * channels * 2
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def realtime_factor(fn, frames, seconds: float) -> float:
+    start = time.process_time()
+    for frame in frames:
+        fn(frame)
+    return seconds / (time.process_time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--frame-ms", type=int, default=20)
+    args = parser.parse_args()
+    seconds, frame_ms = args.seconds, args.frame_ms
+
+    print(f"{seconds:.0f}s of audio in {frame_ms}ms blocks "
+          "(x real time per CPU core)")
+
+    mono = blocks(speech_like(seconds, SAMPLE_RATE), SAMPLE_RATE, 1, frame_ms)
+    floats = [pcm16_to_float32(frame) for frame in mono]
+    out = np.empty(SAMPLE_RATE * frame_ms // 1000, dtype=np.float32)
+    print(f"  int16 -> float32:       {realtime_factor(pcm16_to_float32, mono, seconds):>10,.0f}x")
+    print(f"  int16 -> float32 (out): "
+          f"{realtime_factor(lambda f: pcm16_to_float32(f, out), mono, seconds):>10,.0f}x")
+    print(f"  float32 -> int16:       {realtime_factor(float32_to_pcm16, floats, seconds):>10,.0f}x")
+    print(f"  rms + peak dBFS:        "
+          f"{realtime_factor(lambda f: (rms_dbfs(f), peak_dbfs(f)), floats, seconds):>10,.0f}x")
+
+    stereo = [pcm16_to_float32(frame) for frame in
+              blocks(speech_like(seconds, 48000, 2), 48000, 2, frame_ms)]
+    print(f"  stereo downmix (48k):   "
+          f"{realtime_factor(lambda f: downmix(f, 2), stereo, seconds):>10,.0f}x")
+
+    for rate in (48000, 44100, 22050, 8000):
+        frames = [pcm16_to_float32(frame) for frame in
+                  blocks(speech_like(seconds, rate), rate, 1, frame_ms)]
+        resampler = PolyphaseResampler(rate, SAMPLE_RATE)
+        label = f"resample {rate / 1000:g}k -> 16k:"
+        print(f"  {label:<24}{realtime_factor(resampler.process, frames, seconds):>10,.0f}x"
+              f"  ({resampler.up}/{resampler.down}, {resampler.delay_ms:.2f}ms delay)")
+
+    for rate, channels in ((16000, 1), (48000, 1), (48000, 2), (44100, 2)):
+        frames = blocks(speech_like(seconds, rate, channels), rate, channels, frame_ms)
+        converter = AudioConverter(rate, channels)
+        label = f"converter {rate / 1000:g}k x{channels}:"
+        print(f"  {label:<24}{realtime_factor(converter.process, frames, seconds):>10,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Microbenchmark for /ws/talk wire formats.
+
+Compares per-message encode cost and bytes on the wire of the JSON mode
+(JSON text control messages, raw binary audio) against the negotiated
+binary framing (20-byte header on every message), and measures inbound
+frame parsing with jitter accounting.
+
+Run:
+    python -m benchmarks.bench_framing [--messages N] [--frame-ms MS]
+"""
+
+import argparse
+import time
+
+from app.audio_ingest import ms_to_bytes
+from app.framing import (
+    FRAME_AUDIO,
+    FRAME_CONTROL,
+    HEADER_SIZE,
+    STREAM_CONTROL,
+    STREAM_MIC,
+    STREAM_TTS,
+    BinaryFraming,
+)
+from app.serialization import get_serializer
+
+
+def rate(fn, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--frame-ms", type=int, default=20)
+    args = parser.parse_args()
+
+    serializer = get_serializer()
+    framing = BinaryFraming()
+    message = {"type": "transcript", "text": "what's the weather like in", "is_final": False}
+    audio = bytes(ms_to_bytes(args.frame_ms))
+
+    json_text = serializer.encode_message(message)
+    framed = framing.encode(FRAME_CONTROL, STREAM_CONTROL, json_text.encode())
+    print(f"control message: JSON text {len(json_text.encode())} B, "
+          f"binary frame {len(framed)} B (+{HEADER_SIZE} B header, carries seq + timestamp)")
+    print(f"  JSON text encode:    {rate(lambda: serializer.encode_message(message), args.messages):>12,.0f} msg/s")
+    print(f"  binary frame encode: "
+          f"{rate(lambda: framing.encode(FRAME_CONTROL, STREAM_CONTROL, serializer.encode_message_bytes(message)), args.messages):>12,.0f} msg/s")
+
+    print(f"audio ({args.frame_ms}ms, {len(audio)} B): framing overhead "
+          f"{HEADER_SIZE / len(audio):.1%} of payload")
+    print(f"  binary frame encode: {rate(lambda: framing.encode(FRAME_AUDIO, STREAM_TTS, audio), args.messages):>12,.0f} frames/s")
+
+    client = BinaryFraming()
+    inbound = client.encode(FRAME_AUDIO, STREAM_MIC, audio)
+    print(f"  parse + jitter:      {rate(lambda: framing.receive(inbound), args.messages):>12,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
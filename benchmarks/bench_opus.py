@@ -0,0 +1,65 @@
+"""
+Microbenchmark for the /ws/talk Opus transport (app/opus.py).
+
+Reports encode and decode cost per session-second of audio (CPU ms spent
+per second of audio, and how many real-time sessions one core sustains),
+plus bytes on the wire against raw PCM 16-bit 16 kHz. Needs libopus.
+
+Run:
+    python -m benchmarks.bench_opus [--seconds S] [--bitrate BPS] [--complexity N]
+"""
+
+import argparse
+import sys
+import time
+
+from app.audio_ingest import BYTES_PER_SECOND, SAMPLE_RATE
+from app.opus import OpusDecoder, OpusEncoder, opus_available, opus_version
+from benchmarks.bench_dsp import speech_like
+
+
+def report(label: str, cpu_seconds: float, audio_seconds: float) -> None:
+    per_second_ms = cpu_seconds / audio_seconds * 1000
+    print(f"  {label:<22}{per_second_ms:>8.2f} ms CPU per session-second "
+          f"({audio_seconds / cpu_seconds:>8,.0f} sessions/core)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--bitrate", type=int, default=24000)
+    parser.add_argument("--complexity", type=int, default=5)
+    args = parser.parse_args()
+
+    if not opus_available():
+        sys.exit("libopus not found (install libopus0 or set OPUS_LIBRARY)")
+    print(f"{opus_version()}: {args.seconds:.0f}s of audio, "
+          f"{args.bitrate} bps, complexity {args.complexity}")
+
+    for rate in (SAMPLE_RATE, 22050, 24000):
+        pcm = speech_like(args.seconds, rate)
+        # Same chunking as TTS output: 100 ms per send_audio call
+        step = rate * 2 // 10
+        chunks = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+
+        encoder = OpusEncoder(rate, bitrate=args.bitrate, complexity=args.complexity)
+        start = time.process_time()
+        packets = [packet for chunk in chunks for packet in encoder.encode(chunk)]
+        packets += encoder.flush()
+        report(f"encode {rate / 1000:g}k:", time.process_time() - start, args.seconds)
+
+    decoder = OpusDecoder()
+    start = time.process_time()
+    for packet in packets:
+        decoder.decode(packet)
+    report("decode -> 16k:", time.process_time() - start, args.seconds)
+
+    wire = sum(len(packet) for packet in packets)
+    print(f"  wire: {wire * 8 / args.seconds / 1000:.1f} kbps Opus vs "
+          f"{BYTES_PER_SECOND * 8 / 1000:.0f} kbps PCM "
+          f"({BYTES_PER_SECOND * args.seconds / wire:.1f}x smaller, "
+          f"{len(packets) / args.seconds:.0f} packets/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark of session start cost with and without the shared provider pool.
+
+Starts N concurrent sessions that each either construct their own provider
+set (the old per-session initialization) or borrow one from ProviderPool,
+and reports per-session start latency and resident memory growth.
+
+Run:
+    python -m benchmarks.bench_provider_pool [--sessions N] [--backend fake|livekit]
+
+The backend defaults to livekit when the LiveKit plugins are importable,
+since that is what production sessions use: each per-session set loads the
+Silero VAD model and builds its own HTTP clients. Without them it falls
+back to fake, whose providers are nearly free to build, so those numbers
+only show the pool's own overhead.
+"""
+
+import argparse
+import gc
+import os
+import time
+
+from app.provider_pool import ProviderPool
+from app.providers import create_providers
+
+
+FAKE_BACKEND_CAVEAT = (
+    "note: fake providers cost almost nothing to build; these numbers are not "
+    "representative of production (use --backend livekit with the LiveKit "
+    "plugins installed)"
+)
+
+
+def default_backend() -> str:
+    """livekit when its plugins are importable, else fake."""
+    try:
+        import app.livekit_providers  # noqa: F401
+    except ImportError:
+        return "fake"
+    return "livekit"
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (Linux)."""
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def bench_per_session(backend: str, sessions: int) -> tuple:
+    gc.collect()
+    rss_before = rss_bytes()
+    held = []
+    start = time.perf_counter()
+    for _ in range(sessions):
+        held.append(create_providers(backend))
+    elapsed = time.perf_counter() - start
+    rss_growth = rss_bytes() - rss_before
+    return elapsed, rss_growth
+
+
+def bench_pooled(backend: str, sessions: int) -> tuple:
+    pool = ProviderPool()
+    load_start = time.perf_counter()
+    pool.load(backend)  # done once at startup / worker prewarm
+    load_elapsed = time.perf_counter() - load_start
+
+    gc.collect()
+    rss_before = rss_bytes()
+    held = []
+    start = time.perf_counter()
+    for _ in range(sessions):
+        held.append(pool.acquire(backend))
+    elapsed = time.perf_counter() - start
+    rss_growth = rss_bytes() - rss_before
+    for lease in held:
+        lease.release()
+    return load_elapsed, elapsed, rss_growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--backend", default=None,
+                        help="fake or livekit (default: livekit if installed)")
+    args = parser.parse_args()
+    n = args.sessions
+    backend = args.backend or default_backend()
+
+    print(f"backend: {backend}")
+    if backend == "fake":
+        print(FAKE_BACKEND_CAVEAT)
+
+    elapsed, rss = bench_per_session(backend, n)
+    print(f"per-session init: {elapsed / n * 1e6:10.1f} us/session start, "
+          f"{rss / n / 1024:8.1f} KiB RSS/session")
+
+    load, elapsed, rss = bench_pooled(backend, n)
+    print(f"pooled:           {elapsed / n * 1e6:10.1f} us/session start, "
+          f"{rss / n / 1024:8.1f} KiB RSS/session "
+          f"(one-time load {load * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Microbenchmark for outbound message and metrics JSON encoding.
+
+Compares messages/sec of the old path (Starlette's send_json: json.dumps
+with compact separators) against each Serializer backend, for the hot
+WebSocket messages and a /metrics-sized payload, plus decoding of inbound
+control frames.
+
+Run:
+    python -m benchmarks.bench_serialization [--messages N] [--sessions N]
+"""
+
+import argparse
+import json
+import time
+
+from app.serialization import OrjsonSerializer, Serializer, orjson
+
+
+def starlette_send_json(message) -> str:
+    """What websocket.send_json(message) encoded before."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def sample_messages() -> dict:
+    stages = {
+        stage: {"stage": stage, "time_to_first_result_ms": 182.4, "total_duration_ms": 611.93}
+        for stage in ("stt", "llm", "tts")
+    }
+    return {
+        "transcript (partial)": {"type": "transcript", "text": "what's the weather like in", "is_final": False},
+        "transcript (final)": {"type": "transcript", "text": "what's the weather like in Rome today", "is_final": True},
+        "turn_complete": {
+            "type": "turn_complete",
+            "latency": {
+                "turn_id": 12,
+                "started_at": 1792319115.164,
+                "end_to_end_latency_ms": 356.91,
+                "total_duration_ms": 1675.1,
+                "interrupted": False,
+                "stages": stages,
+            },
+            "cost": {
+                "turn_id": 12, "stt_cost": 1.3e-05, "llm_cost": 2.8e-05, "tts_cost": 0.01416,
+                "total": 0.014201, "total_nanos": 14201103, "interrupted": False,
+            },
+        },
+    }
+
+
+def sample_metrics(sessions: int) -> dict:
+    """A /metrics-shaped payload with per-shard and per-stage sections."""
+    stats = {"count": 1200, "mean": 412.5, "min": 201.3, "max": 1893.2,
+             "p50": 388.1, "p90": 702.4, "p95": 911.0, "p99": 1502.7, "p999": 1850.3}
+    return {
+        "active_sessions": sessions,
+        "total_sessions_created": sessions * 4,
+        "total_turns": sessions * 40,
+        "aggregate_cost": {"total": 51.23, "breakdown": {"stt": 1.2, "llm": 2.3, "tts": 47.73}},
+        "latency_ms": {"end_to_end": stats, "stages": {s: stats for s in ("stt", "llm", "tool", "tts")}},
+        "shards": [
+            {"shard": i, "active": sessions // 16, "peak_active": sessions // 8,
+             "created": sessions // 4, "removed": sessions // 4 - sessions // 16}
+            for i in range(16)
+        ],
+    }
+
+
+def rate(fn, arg, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn(arg)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--sessions", type=int, default=1000)
+    args = parser.parse_args()
+
+    encoders = [("send_json (before)", starlette_send_json)]
+    serializers = [Serializer()] + ([OrjsonSerializer()] if orjson is not None else [])
+    for serializer in serializers:
+        encoders.append((f"{serializer.name} encode_message", serializer.encode_message))
+    if orjson is None:
+        print("orjson not installed; only the stdlib backend is measured")
+
+    for label, message in sample_messages().items():
+        print(f"{label}:")
+        baseline = None
+        for name, encode in encoders:
+            per_sec = rate(encode, message, args.messages)
+            baseline = baseline or per_sec
+            print(f"  {name:<24} {per_sec:>12,.0f} msg/s  ({per_sec / baseline:.1f}x)")
+
+    metrics = sample_metrics(args.sessions)
+    count = max(1, args.messages // 20)
+    print("/metrics response:")
+    baseline = None
+    for name, encode in [("json.dumps (before)", lambda m: json.dumps(m).encode())] + [
+        (f"{s.name} dumps", s.dumps) for s in serializers
+    ]:
+        per_sec = rate(encode, metrics, count)
+        baseline = baseline or per_sec
+        print(f"  {name:<24} {per_sec:>12,.0f} req/s  ({per_sec / baseline:.1f}x)")
+
+    frame = '{"type":"text_input","text":"play a notification sound please"}'
+    print("inbound control frame:")
+    baseline = None
+    for name, decode in [("json.loads (before)", json.loads)] + [
+        (f"{s.name} loads", s.loads) for s in serializers
+    ]:
+        per_sec = rate(decode, frame, args.messages)
+        baseline = baseline or per_sec
+        print(f"  {name:<24} {per_sec:>12,.0f} msg/s  ({per_sec / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
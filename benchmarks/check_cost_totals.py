@@ -0,0 +1,131 @@
+"""
+Equivalence check for CostTracker's running totals (app/cost_tracker.py).
+
+The tracker keeps O(1) running nano-dollar totals instead of summing its
+turns on every read. This drives trackers through randomized turns
+(normal, interrupted, and detached with late writes from their task) and
+checks after every step that the running totals equal the old
+recomputation, sum(t.x for t in turns) + current, exactly, along with the
+interrupted spend, the per-turn histogram count and the usage ledger.
+
+Run:
+    python -m benchmarks.check_cost_totals [--sessions N] [--turns N] [--seed S]
+
+Exits non-zero on the first mismatch.
+"""
+
+from contextvars import copy_context
+from dataclasses import fields
+import argparse
+import random
+import sys
+
+from app.cost_tracker import CostTracker
+from app.usage import Usage
+
+
+def recomputed(tracker: CostTracker) -> dict:
+    turns = list(tracker.turns) + [tracker._current_turn]
+    usage = Usage()
+    for turn in turns:
+        usage.add(turn.usage)
+    return {
+        "stt": sum(t.stt_nanos for t in turns),
+        "llm": sum(t.llm_nanos for t in turns),
+        "tts": sum(t.tts_nanos for t in turns),
+        "interrupted": sum(t.total_nanos for t in tracker.turns if t.interrupted),
+        "histogram": len(tracker.turns),
+        "usage": {f.name: getattr(usage, f.name) for f in fields(Usage)},
+    }
+
+
+def running(tracker: CostTracker) -> dict:
+    total = tracker.ledger.total
+    return {
+        "stt": tracker.total_stt_nanos,
+        "llm": tracker.total_llm_nanos,
+        "tts": tracker.total_tts_nanos,
+        "interrupted": tracker._interrupted_nanos,
+        "histogram": tracker.turn_cost_stats.count,
+        "usage": {f.name: getattr(total, f.name) for f in fields(Usage)},
+    }
+
+
+def add_random_usage(tracker: CostTracker, rng: random.Random) -> None:
+    kind = rng.choice(("stt", "llm", "llm_estimated", "tts"))
+    if kind == "stt":
+        streamed = rng.uniform(0, 8)
+        tracker.add_stt_cost(streamed, raw_audio_seconds=streamed + rng.uniform(0, 4))
+    elif kind == "llm":
+        tracker.add_llm_cost(rng.randrange(4000), rng.randrange(400))
+    elif kind == "llm_estimated":
+        tracker.add_llm_cost(rng.randrange(4000), rng.randrange(400), estimated=True)
+    else:
+        tracker.add_tts_cost(rng.randrange(600))
+
+
+def check_session(rng: random.Random, turns: int) -> int:
+    """Run one tracker through `turns` turns; returns the number of checks."""
+    tracker = CostTracker("check", max_turn_history=0)
+    # Detached turns: (turn, context of the task that kept writing to it)
+    detached = []
+    checks = 0
+
+    def check(step: str) -> None:
+        nonlocal checks
+        expected, actual = recomputed(tracker), running(tracker)
+        if expected != actual:
+            sys.exit(f"mismatch after {step} (turn {tracker.turn_count}):\n"
+                     f"  recomputed {expected}\n  running    {actual}")
+        checks += 1
+
+    for _ in range(turns):
+        for _ in range(rng.randrange(6)):
+            add_random_usage(tracker, rng)
+            check("add")
+
+        outcome = rng.random()
+        if outcome < 0.6:
+            tracker.finish_turn()
+        elif outcome < 0.85:
+            tracker.finish_turn(interrupted=True)
+        else:
+            # A cancelled turn task that outlived the cancel deadline
+            context = copy_context()
+            context.run(tracker.bind_task)
+            detached.append((tracker.detach_turn(), context))
+        check("finish")
+
+        # Stale tasks bill late, then exit at random
+        for turn, context in list(detached):
+            if rng.random() < 0.5:
+                context.run(add_random_usage, tracker, rng)
+            if rng.random() < 0.4:
+                if rng.random() < 0.5:
+                    tracker.finish_detached(turn)
+                else:
+                    context.run(tracker.finish_turn)
+                detached.remove((turn, context))
+            check("late write")
+
+    for turn, _ in detached:
+        tracker.finish_detached(turn)
+    check("drain")
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    checks = sum(check_session(rng, args.turns) for _ in range(args.sessions))
+    print(f"ok: {args.sessions} sessions x {args.turns} turns, "
+          f"{checks:,} checks, running totals match recomputed sums")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,28 +12,13 @@ from dotenv import load_dotenv
 from livekit import agents
 
 from app.agent import create_worker
+from app.logging_config import configure_logging
 
 # Load environment variables
 load_dotenv()
 
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
-    wrapper_class=structlog.stdlib.BoundLogger,
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
-)
+# Configure structured logging (rendered and written off the event loop)
+configure_logging()
 
 logger = structlog.get_logger()
 
@@ -43,11 +28,11 @@ def main():
     logger.info("starting_livekit_worker",
                livekit_url=os.getenv("LIVEKIT_URL", "not_set"))
     
-    # Create the worker
-    worker = create_worker()
+    # Create the worker options (entrypoint + per-process prewarm)
+    worker_options = create_worker()
     
     # Run the worker
-    agents.run_app(worker)
+    agents.cli.run_app(worker_options)
 
 
 if __name__ == "__main__":